@@ -4,12 +4,15 @@ Performance benchmarks for makeParallel
 Compares makeParallel with threading and multiprocessing
 """
 
+import gc
+import random
 import time
+import statistics
 import multiprocessing as mp_std
-import threading
 import sys
 import os
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 sys.path.insert(0, '.')
 
@@ -19,21 +22,57 @@ except ImportError:
     print("Error: makeparallel not installed. Run 'maturin develop' first.")
     sys.exit(1)
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional - fall back to the plain Python kernel
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+
+# Opened once and reused by every suppress_stdout() block
+_devnull = open(os.devnull, 'w')
+
+
+class suppress_stdout:
+    """Suppress stdout temporarily, including Rust-side println! output"""
+    __slots__ = ('old_stdout', 'saved_fd')
 
-@contextmanager
-def suppress_stdout():
-    """Suppress stdout temporarily"""
-    with open(os.devnull, 'w') as devnull:
-        old_stdout = sys.stdout
-        sys.stdout = devnull
-        try:
-            yield
-        finally:
-            sys.stdout = old_stdout
+    def __enter__(self):
+        sys.stdout.flush()
+        self.old_stdout = sys.stdout
+        # Redirect fd 1 as well, so writes that bypass sys.stdout are dropped
+        self.saved_fd = os.dup(1)
+        os.dup2(_devnull.fileno(), 1)
+        sys.stdout = _devnull
+        return self
 
+    def __exit__(self, *exc):
+        sys.stdout = self.old_stdout
+        os.dup2(self.saved_fd, 1)
+        os.close(self.saved_fd)
+        return False
+
+
+def pin_process(num_cores):
+    """Pin this process to a fixed set of cores for reproducible speedups"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+
+    cores = sorted(os.sched_getaffinity(0))[:num_cores]
+    os.sched_setaffinity(0, cores)
+
+    try:
+        os.nice(-5)
+    except (OSError, AttributeError):
+        pass  # Raising priority needs privileges; pinning alone still helps
 
+    return cores
+
+
+@njit(cache=True)
 def cpu_intensive_task(n):
-    """CPU-bound task for benchmarking"""
+    """CPU-bound task for benchmarking (compiled with Numba when available)"""
     result = 0
     for i in range(n):
         result += i * i
@@ -51,18 +90,45 @@ class Benchmark:
         self.name = name
         self.results = {}
 
-    def run(self, func, *args, iterations=1, **kwargs):
-        """Run benchmark and return average time"""
+    def run(self, func, *args, iterations=6, setup=None, **kwargs):
+        """Run benchmark and return median time (nanoseconds)
+
+        The first of ``iterations`` runs is dropped as warmup.
+        ``setup`` is called before every iteration, outside the timed region.
+        """
         times = []
         for _ in range(iterations):
-            start = time.time()
-            result = func(*args, **kwargs)
-            elapsed = time.time() - start
+            if setup is not None:
+                setup()
+
+            # Keep GC pauses out of the measurement
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter_ns()
+                result = func(*args, **kwargs)
+                elapsed = time.perf_counter_ns() - start
+            finally:
+                gc.enable()
             times.append(elapsed)
-        
-        avg_time = sum(times) / len(times)
-        self.results[func.__name__] = avg_time
-        return avg_time
+
+        # Keep the raw distribution; the first run is warmup when we have more
+        if len(times) > 1:
+            times = times[1:]
+        self.results[func.__name__] = times
+        return statistics.median(times)
+
+    @staticmethod
+    def summarize(times):
+        """Return (median, min, IQR) in seconds for a list of ns timings"""
+        median = statistics.median(times) / 1e9
+        mn = min(times) / 1e9
+        if len(times) > 1:
+            q1, _, q3 = statistics.quantiles(times, n=4)
+            iqr = (q3 - q1) / 1e9
+        else:
+            iqr = 0.0
+        return median, mn, iqr
 
     def print_results(self):
         """Print formatted results"""
@@ -76,11 +142,12 @@ class Benchmark:
 
         # Find baseline (usually first result)
         baseline_name = list(self.results.keys())[0]
-        baseline_time = self.results[baseline_name]
+        baseline_time = self.summarize(self.results[baseline_name])[0]
 
-        for name, time_taken in self.results.items():
-            speedup = baseline_time / time_taken if time_taken > 0 else 0
-            print(f"{name:40} {time_taken:8.4f}s  ({speedup:5.2f}x)")
+        for name, times in self.results.items():
+            median, mn, iqr = self.summarize(times)
+            speedup = baseline_time / median if median > 0 else 0
+            print(f"{name:40} med={median*1000:8.3f}ms min={mn*1000:8.3f}ms iqr={iqr*1000:6.3f}ms  ({speedup:5.2f}x)")
 
         print(f"{'='*70}\n")
 
@@ -93,8 +160,8 @@ def benchmark_cpu_intensive():
     iterations = 1_000_000
 
     # Sequential baseline
-    def sequential():
-        results = [cpu_intensive_task(iterations) for _ in range(num_tasks)]
+    def sequential(_task=cpu_intensive_task, _n=num_tasks, _iter=iterations):
+        results = [_task(_iter) for _ in range(_n)]
         return results
 
     # makeParallel @parallel
@@ -102,22 +169,38 @@ def benchmark_cpu_intensive():
     def mp_parallel_task(n):
         return cpu_intensive_task(n)
 
-    def using_makeparallel_parallel():
-        handles = [mp_parallel_task(iterations) for _ in range(num_tasks)]
-        return [h.get() for h in handles]
+    # Preallocated outside the timed region and reused by each run
+    handles = [None] * num_tasks
+    results = [None] * num_tasks
+
+    def using_makeparallel_parallel(_submit=mp_parallel_task, _n=num_tasks, _iter=iterations):
+        for i in range(_n):
+            handles[i] = _submit(_iter)
+        for i in range(_n):
+            results[i] = handles[i].get()
+        return results
+
+    # makeParallel @parallel, all tasks submitted in one call
+    def using_makeparallel_parallel_batched(_submit_batch=mp.submit_batch, _task=mp_parallel_task,
+                                            _args=[iterations] * num_tasks):
+        return [h.get() for h in _submit_batch(_task, _args)]
 
     # makeParallel @parallel_pool
     @mp.parallel_pool
     def mp_pool_task(n):
         return cpu_intensive_task(n)
 
-    def using_makeparallel_pool():
-        handles = [mp_pool_task(iterations) for _ in range(num_tasks)]
-        return [h.get() for h in handles]
+    def using_makeparallel_pool(_submit=mp_pool_task, _n=num_tasks, _iter=iterations):
+        for i in range(_n):
+            handles[i] = _submit(_iter)
+        for i in range(_n):
+            results[i] = handles[i].get()
+        return results
 
     # makeParallel parallel_map
-    def using_makeparallel_map():
-        return mp.parallel_map(cpu_intensive_task, [iterations] * num_tasks)
+    def using_makeparallel_map(_map=mp.parallel_map, _task=cpu_intensive_task,
+                               _args=[iterations] * num_tasks):
+        return _map(_task, _args)
 
     # Python multiprocessing
     def using_multiprocessing():
@@ -125,22 +208,12 @@ def benchmark_cpu_intensive():
             return pool.map(cpu_intensive_task, [iterations] * num_tasks)
 
     # Python threading (won't speed up CPU-bound due to GIL)
-    def using_threading():
-        results = [None] * num_tasks
-        threads = []
-        
-        def worker(index, n):
-            results[index] = cpu_intensive_task(n)
-        
-        for i in range(num_tasks):
-            t = threading.Thread(target=worker, args=(i, iterations))
-            t.start()
-            threads.append(t)
-        
-        for t in threads:
-            t.join()
-        
-        return results
+    # The pool is created outside the timed region, like Rayon's threads
+    executor = ThreadPoolExecutor(max_workers=num_tasks)
+
+    def using_threading(_map=executor.map, _task=cpu_intensive_task,
+                        _args=[iterations] * num_tasks):
+        return list(_map(_task, _args))
 
     print("Running CPU-intensive benchmarks (this may take a minute)...")
 
@@ -152,6 +225,10 @@ def benchmark_cpu_intensive():
     with suppress_stdout():
         bench.run(using_makeparallel_parallel)
 
+    print("  Testing makeParallel @parallel (batched submit)...")
+    with suppress_stdout():
+        bench.run(using_makeparallel_parallel_batched)
+
     print("  Testing makeParallel @parallel_pool...")
     with suppress_stdout():
         bench.run(using_makeparallel_pool)
@@ -167,6 +244,7 @@ def benchmark_cpu_intensive():
     print("  Testing threading...")
     with suppress_stdout():
         bench.run(using_threading)
+    executor.shutdown()
 
     bench.print_results()
 
@@ -192,74 +270,118 @@ def benchmark_decorator_overhead():
     def with_memoize_fast(x):
         return x * 2
 
-    # Reset metrics
-    mp.reset_metrics()
+    @lru_cache(maxsize=128)
+    def with_lru_cache(x):
+        return x * 2
+
+    def reset_state():
+        """Start every variant from cold caches and zeroed counters"""
+        mp.reset_metrics()
+        with_counter.reset()
+        for cached in (with_lru_cache, with_memoize, with_memoize_fast):
+            if hasattr(cached, "cache_clear"):
+                cached.cache_clear()
+
+    # Precompute arguments so the loops only measure the call itself
+    args = [i % 100 for i in range(iterations)]
 
     print("Running decorator overhead benchmarks...")
     print("  (Comparing plain function vs. decorators)")
 
     # Plain function baseline
-    def test_plain():
-        for i in range(iterations):
-            plain_function(i % 100)
+    def test_plain(_f=plain_function, _args=args):
+        for x in _args:
+            _f(x)
+
+    def test_lru_cache(_f=with_lru_cache, _args=args):
+        for x in _args:
+            _f(x)
 
-    def test_counter():
-        for i in range(iterations):
-            with_counter(i % 100)
+    def test_counter(_f=with_counter, _args=args):
+        for x in _args:
+            _f(x)
 
-    def test_memoize():
-        for i in range(iterations):
-            with_memoize(i % 100)  # Will cache 100 unique values
+    def test_memoize(_f=with_memoize, _args=args):
+        for x in _args:
+            _f(x)  # Will cache 100 unique values
 
-    def test_memoize_fast():
-        for i in range(iterations):
-            with_memoize_fast(i % 100)
+    def test_memoize_fast(_f=with_memoize_fast, _args=args):
+        for x in _args:
+            _f(x)
 
     with suppress_stdout():
-        bench.run(test_plain)
-        bench.run(test_counter)
-        bench.run(test_memoize)
-        bench.run(test_memoize_fast)
+        bench.run(test_plain, setup=reset_state)
+        bench.run(test_lru_cache, setup=reset_state)
+        bench.run(test_counter, setup=reset_state)
+        bench.run(test_memoize, setup=reset_state)
+        bench.run(test_memoize_fast, setup=reset_state)
 
     bench.print_results()
 
 
 def benchmark_retry_caching():
     """Benchmark retry with caching decorator"""
-    bench = Benchmark("Retry with Caching (100 successful cached calls)")
+    bench = Benchmark("Retry with Caching (200 calls, Zipf-distributed keys)")
+
+    num_calls = 200
+    num_workers = 8
+
+    # Interleaved hits and misses with a Zipf-like skew, fixed before timing
+    rng = random.Random(42)
+    keys = rng.choices(range(100), weights=[1 / (i + 1) for i in range(100)], k=num_calls)
+    unique_keys = len(set(keys))
 
     call_count = [0]
+    concurrent_call_count = [0]
+
+    def make_cached(counter):
+        @mp.retry_cached(max_attempts=3)
+        def sometimes_fails(x):
+            counter[0] += 1
+            if x < 100:  # All succeed for benchmark
+                return x * 2
+            raise ValueError(f"Failed for {x}")
+
+        return sometimes_fails
+
+    # retry_cached has no cache_clear(), so every iteration gets fresh
+    # functions and starts from a cold cache
+    cached = {}
 
-    @mp.retry_cached(max_attempts=3)
-    def sometimes_fails(x):
-        call_count[0] += 1
-        if x < 100:  # All succeed for benchmark
-            return x * 2
-        raise ValueError(f"Failed for {x}")
-
-    def test_cached_successes():
-        # Call twice - second time should be cached
-        results1 = []
-        results2 = []
-        for i in range(100):
-            results1.append(sometimes_fails(i))
-        for i in range(100):
-            results2.append(sometimes_fails(i))
-        return results1, results2
+    def reset_mixed():
+        call_count[0] = 0
+        cached["mixed"] = make_cached(call_count)
+
+    def reset_concurrent():
+        concurrent_call_count[0] = 0
+        cached["concurrent"] = make_cached(concurrent_call_count)
+
+    def test_cached_mixed(_cached=cached, _keys=keys):
+        _f = _cached["mixed"]
+        return [_f(x) for x in _keys]
+
+    # Same key stream, hammered from several threads at once
+    executor = ThreadPoolExecutor(max_workers=num_workers)
+
+    def test_cached_concurrent(_map=executor.map, _cached=cached, _keys=keys):
+        return list(_map(_cached["concurrent"], _keys))
 
     print("Running retry/caching benchmarks...")
     print("  (Testing caching effectiveness - no errors expected)")
 
     with suppress_stdout():
-        bench.run(test_cached_successes)
+        bench.run(test_cached_mixed, setup=reset_mixed)
+        bench.run(test_cached_concurrent, setup=reset_concurrent)
+    executor.shutdown()
 
     bench.print_results()
 
     print(f"\nCache efficiency:")
     print(f"  Total function calls: {call_count[0]}")
-    print(f"  Expected with caching: 100 (first call of each value)")
-    print(f"  Without caching would be: 200 (100 values × 2 iterations)")
-    print(f"  Cache hit rate: {((200 - call_count[0]) / 200 * 100):.1f}%")
+    print(f"  Expected with caching: {unique_keys} (first call of each distinct key)")
+    print(f"  Without caching would be: {num_calls}")
+    print(f"  Cache hit rate: {((num_calls - call_count[0]) / num_calls * 100):.1f}%")
+    print(f"  Concurrent function calls ({num_workers} threads): {concurrent_call_count[0]}")
 
 
 def main():
@@ -268,6 +390,11 @@ def main():
     print(" makeParallel Performance Benchmarks")
     print("="*70)
 
+    # Match the core set to the widest benchmark (10 tasks)
+    cores = pin_process(10)
+    if cores is not None:
+        print(f"Pinned to cores: {cores}")
+
     try:
         # CPU-intensive benchmark
         benchmark_cpu_intensive()
@@ -15,6 +15,35 @@ from makeParallel import (
     parallel_map,       # Batch processing
 )
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional - fall back to the plain Python kernel
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+# Timing helpers - hot callables are bound as default args (LOAD_FAST lookups)
+def time_submissions(submit, args, handles, results, _perf=time.perf_counter_ns):
+    """Submit one task per arg, collect every result; returns elapsed ns"""
+    start = _perf()
+    for i, arg in enumerate(args):
+        handles[i] = submit(arg)
+    for i, handle in enumerate(handles):
+        results[i] = handle.get()
+    return _perf() - start
+
+def warm_up(submit, arg, count=4):
+    """Run a few untimed tasks to pay one-off init costs (threads, channels)"""
+    for handle in [submit(arg) for _ in range(count)]:
+        handle.get()
+
+def time_calls(func, values, _perf=time.perf_counter_ns):
+    """Call func once per value; returns elapsed ns"""
+    start = _perf()
+    for val in values:
+        func(val)
+    return _perf() - start
+
 print("=" * 80)
 print("PERFORMANCE BENCHMARKS: Original vs Optimized")
 print("=" * 80)
@@ -27,18 +56,29 @@ print("BENCHMARK 1: Channel Performance")
 print("=" * 80)
 
 def cpu_work(n):
-    """CPU-intensive task"""
-    return sum(i**2 for i in range(n))
+    """Sum of squares below n in O(1), so timings measure dispatch overhead"""
+    return n * (n - 1) * (2 * n - 1) // 6
+
+@njit(cache=True)
+def cpu_heavy(n):
+    """CPU-intensive task (compiled with Numba when available)"""
+    result = 0
+    for i in range(n):
+        result += i * i
+    return result
+
+# Compile the Numba kernel now rather than inside the first timed task
+cpu_heavy(1)
 
 # Original - std::mpsc channels
 @parallel
 def task_original(n):
-    return sum(i**2 for i in range(n))
+    return cpu_work(n)
 
 # Optimized - crossbeam channels
 @parallel_fast
 def task_crossbeam(n):
-    return sum(i**2 for i in range(n))
+    return cpu_work(n)
 
 ITERATIONS = 100_000
 NUM_TASKS = 100
@@ -47,30 +87,30 @@ print(f"\nTest: {NUM_TASKS} small tasks ({ITERATIONS:,} iterations each)")
 print("-" * 80)
 
 # Benchmark original
+warm_up(task_original, 1000)
 times_original = []
+args = [ITERATIONS] * NUM_TASKS
+handles = [None] * NUM_TASKS
+results = [None] * NUM_TASKS
 for _ in range(5):
-    start = time.time()
-    handles = [task_original(ITERATIONS) for _ in range(NUM_TASKS)]
-    results = [h.get() for h in handles]
-    elapsed = time.time() - start
-    times_original.append(elapsed)
+    times_original.append(time_submissions(task_original, args, handles, results))
 
-avg_original = statistics.mean(times_original)
-std_original = statistics.stdev(times_original) if len(times_original) > 1 else 0
+avg_original = statistics.mean(times_original) / 1e9
+std_original = statistics.stdev(times_original) / 1e9 if len(times_original) > 1 else 0
 
 print(f"Original (std::mpsc):     {avg_original:.4f}s (±{std_original:.4f}s)")
 
 # Benchmark crossbeam
+warm_up(task_crossbeam, 1000)
 times_crossbeam = []
+args = [ITERATIONS] * NUM_TASKS
+handles = [None] * NUM_TASKS
+results = [None] * NUM_TASKS
 for _ in range(5):
-    start = time.time()
-    handles = [task_crossbeam(ITERATIONS) for _ in range(NUM_TASKS)]
-    results = [h.get() for h in handles]
-    elapsed = time.time() - start
-    times_crossbeam.append(elapsed)
+    times_crossbeam.append(time_submissions(task_crossbeam, args, handles, results))
 
-avg_crossbeam = statistics.mean(times_crossbeam)
-std_crossbeam = statistics.stdev(times_crossbeam) if len(times_crossbeam) > 1 else 0
+avg_crossbeam = statistics.mean(times_crossbeam) / 1e9
+std_crossbeam = statistics.stdev(times_crossbeam) / 1e9 if len(times_crossbeam) > 1 else 0
 
 print(f"Optimized (crossbeam):    {avg_crossbeam:.4f}s (±{std_crossbeam:.4f}s)")
 
@@ -86,11 +126,11 @@ print("=" * 80)
 
 @parallel
 def task_new_thread(n):
-    return sum(i**2 for i in range(n))
+    return cpu_heavy(n)
 
 @parallel_pool
 def task_pool(n):
-    return sum(i**2 for i in range(n))
+    return cpu_heavy(n)
 
 SMALL_TASK_SIZE = 50_000
 NUM_SMALL_TASKS = 200
@@ -100,28 +140,28 @@ print("(Thread pool should excel at many small tasks)")
 print("-" * 80)
 
 # New thread per task
+warm_up(task_new_thread, 1000)
 times_newthread = []
+args = [SMALL_TASK_SIZE] * NUM_SMALL_TASKS
+handles = [None] * NUM_SMALL_TASKS
+results = [None] * NUM_SMALL_TASKS
 for _ in range(3):
-    start = time.time()
-    handles = [task_new_thread(SMALL_TASK_SIZE) for _ in range(NUM_SMALL_TASKS)]
-    results = [h.get() for h in handles]
-    elapsed = time.time() - start
-    times_newthread.append(elapsed)
+    times_newthread.append(time_submissions(task_new_thread, args, handles, results))
 
-avg_newthread = statistics.mean(times_newthread)
+avg_newthread = statistics.mean(times_newthread) / 1e9
 
 print(f"New thread per task:  {avg_newthread:.4f}s")
 
 # Thread pool (rayon)
+warm_up(task_pool, 1000, count=NUM_SMALL_TASKS)
 times_pool = []
+args = [SMALL_TASK_SIZE] * NUM_SMALL_TASKS
+handles = [None] * NUM_SMALL_TASKS
+results = [None] * NUM_SMALL_TASKS
 for _ in range(3):
-    start = time.time()
-    handles = [task_pool(SMALL_TASK_SIZE) for _ in range(NUM_SMALL_TASKS)]
-    results = [h.get() for h in handles]
-    elapsed = time.time() - start
-    times_pool.append(elapsed)
+    times_pool.append(time_submissions(task_pool, args, handles, results))
 
-avg_pool = statistics.mean(times_pool)
+avg_pool = statistics.mean(times_pool) / 1e9
 
 print(f"Thread pool (rayon):  {avg_pool:.4f}s")
 
@@ -137,8 +177,8 @@ print("BENCHMARK 3: Memoize - Lock-Free vs Mutex")
 print("=" * 80)
 
 def expensive_calc(x):
-    """Simulate expensive calculation"""
-    return sum(i**2 for i in range(x))
+    """Pure function with a cheap, stable result"""
+    return cpu_work(x)
 
 @memoize
 def cached_original(x):
@@ -148,28 +188,27 @@ def cached_original(x):
 def cached_dashmap(x):
     return expensive_calc(x)
 
-# Test with repeated calls (high cache hit rate)
-test_values = [1000, 2000, 3000, 1000, 2000, 3000] * 50  # Repeated values
+# Warm both caches outside the timed region so only the hit path is measured
+for val in (1000, 2000, 3000):
+    cached_original(val)
+    cached_dashmap(val)
+
+# Test with repeated calls (100% cache hit rate)
+test_values = [1000, 2000, 3000] * 5000  # Repeated values
 
 print(f"\nTest: {len(test_values)} calls with repeated values")
-print("(High cache hit rate - lock-free should excel)")
+print("(Caches pre-warmed - measures the hit path only)")
 print("-" * 80)
 
 # Original (Arc<Mutex<HashMap>>)
-start = time.time()
-for val in test_values:
-    _ = cached_original(val)
-time_mutex = time.time() - start
+time_mutex = time_calls(cached_original, test_values)
 
-print(f"Original (Mutex):     {time_mutex:.4f}s")
+print(f"Original (Mutex):     {time_mutex / 1e9:.4f}s")
 
 # DashMap (lock-free)
-start = time.time()
-for val in test_values:
-    _ = cached_dashmap(val)
-time_dashmap = time.time() - start
+time_dashmap = time_calls(cached_dashmap, test_values)
 
-print(f"Optimized (DashMap):  {time_dashmap:.4f}s")
+print(f"Optimized (DashMap):  {time_dashmap / 1e9:.4f}s")
 
 speedup_cache = time_mutex / time_dashmap
 print(f"\n✓ Speedup: {speedup_cache:.2f}x faster with lock-free DashMap")
@@ -184,9 +223,10 @@ print("=" * 80)
 
 def process_item(x):
     """Process single item"""
-    return sum(i**2 for i in range(x))
+    return cpu_heavy(x)
 
-items = [50_000] * 100
+# Non-uniform work so the scheduler actually has to balance load
+items = [30_000 + (i * 997) % 40_000 for i in range(100)]
 
 print(f"\nTest: Process {len(items)} items")
 print("-" * 80)
@@ -196,19 +236,20 @@ print("-" * 80)
 def process_parallel(x):
     return process_item(x)
 
-start = time.time()
-handles = [process_parallel(x) for x in items]
-results = [h.get() for h in handles]
-time_individual = time.time() - start
+warm_up(process_parallel, 1000)
+handles = [None] * len(items)
+results = [None] * len(items)
+time_individual = time_submissions(process_parallel, items, handles, results)
 
-print(f"Individual calls:  {time_individual:.4f}s")
+print(f"Individual calls:  {time_individual / 1e9:.4f}s")
 
 # Batch with parallel_map
-start = time.time()
-results = parallel_map(lambda x: process_item(x), items)
-time_batch = time.time() - start
+parallel_map(process_item, [1000] * 4)  # Warm-up
+start = time.perf_counter_ns()
+results = parallel_map(process_item, items)
+time_batch = time.perf_counter_ns() - start
 
-print(f"Batch (parallel_map): {time_batch:.4f}s")
+print(f"Batch (parallel_map): {time_batch / 1e9:.4f}s")
 
 speedup_batch = time_individual / time_batch
 print(f"\n✓ Speedup: {speedup_batch:.2f}x faster with batch processing")
@@ -227,8 +268,8 @@ print(f"""
 ├─────────────────────────────────┼──────────────┼──────────────┼──────────┤
 │ 1. Crossbeam Channels           │ {avg_original:>10.4f}s │ {avg_crossbeam:>10.4f}s │ {speedup:>6.2f}x │
 │ 2. Thread Pool (Rayon)          │ {avg_newthread:>10.4f}s │ {avg_pool:>10.4f}s │ {speedup_pool:>6.2f}x │
-│ 3. Lock-Free Cache (DashMap)    │ {time_mutex:>10.4f}s │ {time_dashmap:>10.4f}s │ {speedup_cache:>6.2f}x │
-│ 4. Batch Processing (par_iter)  │ {time_individual:>10.4f}s │ {time_batch:>10.4f}s │ {speedup_batch:>6.2f}x │
+│ 3. Lock-Free Cache (DashMap)    │ {time_mutex / 1e9:>10.4f}s │ {time_dashmap / 1e9:>10.4f}s │ {speedup_cache:>6.2f}x │
+│ 4. Batch Processing (par_iter)  │ {time_individual / 1e9:>10.4f}s │ {time_batch / 1e9:>10.4f}s │ {speedup_batch:>6.2f}x │
 └─────────────────────────────────┴──────────────┴──────────────┴──────────┘
 
 KEY IMPROVEMENTS:
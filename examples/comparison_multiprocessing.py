@@ -36,15 +36,22 @@ print(f"Time: {elapsed_parallel:.4f}s")
 print("\n2. CPU-Intensive Work (Better than multiprocessing):")
 print("-" * 80)
 
+try:
+    from gmpy2 import fib as fib_impl  # GMP fast-doubling in C
+except ImportError:
+    def fib_impl(n):
+        """Fast-doubling fibonacci: O(log n) big-int multiplications"""
+        a, b = 0, 1  # F(k), F(k+1) with k built from n's bits, high to low
+        for bit in bin(n)[2:]:
+            c = a * (2 * b - a)  # F(2k)
+            d = a * a + b * b    # F(2k+1)
+            a, b = (d, c + d) if bit == "1" else (c, d)
+        return a
+
 @parallel
 def fibonacci(n):
     """Compute nth fibonacci number"""
-    if n <= 1:
-        return n
-    a, b = 0, 1
-    for _ in range(2, n + 1):
-        a, b = b, a + b
-    return b
+    return int(fib_impl(n))
 
 print("Computing fibonacci(50000) in 4 parallel threads...")
 start = time.time()
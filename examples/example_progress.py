@@ -6,9 +6,15 @@ This shows how easy it is now to report progress from within
 a @parallel decorated function.
 """
 
+import sys
 import time
 import makeparallel as mp
 
+BAR_WIDTH = 30
+
+# Every possible progress bar, built once
+_BARS = ["█" * i + "░" * (BAR_WIDTH - i) for i in range(BAR_WIDTH + 1)]
+
 
 @mp.parallel
 def download_file(filename, size_mb):
@@ -41,25 +47,27 @@ def main():
     print("\nMonitoring download progress:")
     print("-" * 60)
 
-    all_done = False
-    while not all_done:
-        all_done = True
-
-        for i, handle in enumerate(downloads):
-            if not handle.is_ready():
-                all_done = False
+    # Names never change, so fetch them once
+    names = [h.get_name() for h in downloads]
 
-            progress = handle.get_progress()
-            name = handle.get_name()
-
-            # Progress bar
-            filled = int(progress * 30)
-            bar = "█" * filled + "░" * (30 - filled)
-            print(f"{name:20s} [{bar}] {progress*100:5.1f}%")
-
-        if not all_done:
-            print("\033[F" * len(downloads), end="")  # Move cursor up
-            time.sleep(0.1)
+    all_done = False
+    while True:
+        # One call returns (is_ready, progress) for every handle
+        lines = [
+            f"\r\033[K{name:20s} [{_BARS[min(BAR_WIDTH, int(progress * BAR_WIDTH))]}] {progress*100:5.1f}%"
+            for name, (_, progress) in zip(names, mp.poll_handles(downloads))
+        ]
+
+        # One write per frame instead of one print() per handle
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        if all_done:
+            break
+
+        # Redraw every 100ms, but wake up as soon as the last download finishes
+        all_done = mp.wait_all(downloads, timeout=0.1)
+        sys.stdout.write("\033[F" * len(downloads))  # Move cursor up
 
     print("\n" + "-" * 60)
 
@@ -7,7 +7,33 @@ by showing near-linear speedup on CPU-bound tasks.
 
 import time
 import os
-from makeParallel import parallel
+from makeParallel import parallel, as_completed
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    # Numba/NumPy are optional - fall back to plain Python kernels
+    np = None
+
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+def pin_process(num_cores):
+    """Pin this process to a fixed set of cores for reproducible speedups"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+
+    cores = sorted(os.sched_getaffinity(0))[:num_cores]
+    os.sched_setaffinity(0, cores)
+
+    try:
+        os.nice(-5)
+    except (OSError, AttributeError):
+        pass  # Raising priority needs privileges; pinning alone still helps
+
+    return cores
+
 
 print("=" * 80)
 print("PROVING TRUE PARALLELISM WITH @parallel DECORATOR")
@@ -16,6 +42,11 @@ print(f"\nSystem Info:")
 print(f"  CPU Cores: {os.cpu_count()}")
 print(f"  Process ID: {os.getpid()}")
 
+# Pin to as many cores as the widest test uses (TEST 4 goes up to 8)
+pinned_cores = pin_process(8)
+if pinned_cores is not None:
+    print(f"  Pinned to cores: {pinned_cores}")
+
 # =============================================================================
 # TEST 1: CPU-Bound Task - Linear Speedup Test
 # =============================================================================
@@ -48,21 +79,21 @@ print(f"  Number of parallel tasks: {NUM_TASKS}")
 
 # Sequential execution (baseline)
 print(f"\n[1/2] Running {NUM_TASKS} tasks SEQUENTIALLY...")
-start = time.time()
+start = time.perf_counter_ns()
 results_sequential = []
 for i in range(NUM_TASKS):
     results_sequential.append(cpu_intensive_pure(ITERATIONS))
-time_sequential = time.time() - start
+time_sequential = (time.perf_counter_ns() - start) / 1e9
 
 print(f"  ✓ Sequential time: {time_sequential:.4f}s")
 print(f"  ✓ Result verification: {results_sequential[0]:,}")
 
 # Parallel execution
 print(f"\n[2/2] Running {NUM_TASKS} tasks IN PARALLEL...")
-start = time.time()
+start = time.perf_counter_ns()
 handles = [cpu_intensive_parallel(ITERATIONS) for i in range(NUM_TASKS)]
 results_parallel = [h.get() for h in handles]
-time_parallel = time.time() - start
+time_parallel = (time.perf_counter_ns() - start) / 1e9
 
 print(f"  ✓ Parallel time: {time_parallel:.4f}s")
 print(f"  ✓ Result verification: {results_parallel[0]:,}")
@@ -95,13 +126,15 @@ print("=" * 80)
 @parallel
 def timed_task(task_id, duration):
     """Task that reports its execution time"""
-    start = time.time()
-    # CPU-intensive work for specified duration
-    end_time = start + duration
+    start = time.perf_counter_ns()
+    # CPU-intensive work for specified duration, reading the clock
+    # once per 64 iterations rather than on every one
+    end_time = start + int(duration * 1e9)
     count = 0
-    while time.time() < end_time:
-        count += 1
-    elapsed = time.time() - start
+    while time.perf_counter_ns() < end_time:
+        for _ in range(64):
+            count += 1
+    elapsed = (time.perf_counter_ns() - start) / 1e9
     return {
         'task_id': task_id,
         'elapsed': elapsed,
@@ -111,22 +144,15 @@ def timed_task(task_id, duration):
 print(f"\nStarting 4 tasks that each take ~1 second...")
 print(f"If truly parallel, total time should be ~1 second (not 4 seconds)")
 
-start_all = time.time()
+start_all = time.perf_counter_ns()
 handles = [timed_task(i, 1.0) for i in range(4)]
 
-# Monitor status in real-time
+# Monitor status in real-time (blocks until each task completes, no polling)
 print("\nMonitoring task completion:")
-last_ready_count = 0
-while True:
-    ready_count = sum(1 for h in handles if h.is_ready())
-    if ready_count > last_ready_count:
-        print(f"  {ready_count}/4 tasks completed...")
-        last_ready_count = ready_count
-    if ready_count == 4:
-        break
-    time.sleep(0.1)
-
-total_time = time.time() - start_all
+for ready_count, _ in enumerate(as_completed(handles), 1):
+    print(f"  {ready_count}/4 tasks completed...")
+
+total_time = (time.perf_counter_ns() - start_all) / 1e9
 results = [h.get() for h in handles]
 
 print(f"\nResults:")
@@ -149,15 +175,26 @@ print("\n" + "=" * 80)
 print("TEST 3: GIL-Free Proof - CPU Competition Test")
 print("=" * 80)
 
+@njit(cache=True, nogil=True)
+def burn_once():
+    """One unit of pure CPU work: sum of squares below 1000"""
+    s = 0
+    for i in range(1000):
+        s += i * i
+    return s
+
 @parallel
 def cpu_burner(burn_time, task_id):
     """Burns CPU for specified time"""
-    start = time.time()
+    deadline = time.monotonic_ns() + int(burn_time * 1e9)
     count = 0
-    while time.time() - start < burn_time:
-        # Pure CPU work
-        _ = sum(i**2 for i in range(1000))
-        count += 1
+    while True:
+        # Pure CPU work; only read the clock every 64 units
+        for _ in range(64):
+            burn_once()
+        count += 64
+        if time.monotonic_ns() >= deadline:
+            break
     return count
 
 print("\nStarting 4 CPU-intensive tasks simultaneously...")
@@ -165,10 +202,11 @@ print("With GIL: tasks would compete for single thread")
 print("Without GIL: tasks run truly parallel on different cores\n")
 
 BURN_TIME = 0.5
-start = time.time()
+burn_once()  # Warm the JIT before timing
+start = time.perf_counter_ns()
 handles = [cpu_burner(BURN_TIME, i) for i in range(4)]
 results = [h.get() for h in handles]
-elapsed = time.time() - start
+elapsed = (time.perf_counter_ns() - start) / 1e9
 
 print("Work done by each task:")
 total_work = 0
@@ -197,22 +235,38 @@ print("\n" + "=" * 80)
 print("TEST 4: Scalability Test - Multiple Core Utilization")
 print("=" * 80)
 
+if np is not None:
+    @njit(cache=True, nogil=True)
+    def count_primes(n):
+        """Sieve of Eratosthenes over odd numbers, compiled with Numba"""
+        if n < 3:
+            return 0
+        sieve = np.ones(n, dtype=np.bool_)
+        sieve[:2] = False
+        sieve[4::2] = False
+        for p in range(3, int(n ** 0.5) + 1, 2):
+            if sieve[p]:
+                sieve[p * p::2 * p] = False
+        return int(sieve.sum())
+else:
+    def count_primes(n):
+        """Sieve of Eratosthenes over odd numbers (pure Python fallback)"""
+        if n < 3:
+            return 0
+        # sieve[i] stands for 2*i + 1, so even numbers are never stored or crossed off
+        sieve = bytearray([1]) * (n // 2)
+        sieve[0] = 0  # 1 is not prime
+        for i in range(1, (int(n ** 0.5) - 1) // 2 + 1):
+            if sieve[i]:
+                p = 2 * i + 1
+                start = p * p // 2
+                sieve[start::p] = bytes(len(range(start, len(sieve), p)))
+        return sieve.count(1) + 1  # + 1 for the prime 2
+
 @parallel
 def compute_primes(n):
-    """Count prime numbers up to n"""
-    def is_prime(num):
-        if num < 2:
-            return False
-        for i in range(2, int(num ** 0.5) + 1):
-            if num % i == 0:
-                return False
-        return True
-
-    count = 0
-    for i in range(2, n):
-        if is_prime(i):
-            count += 1
-    return count
+    """Count prime numbers below n"""
+    return count_primes(n)
 
 # Test with different numbers of parallel tasks
 test_configs = [1, 2, 4]
@@ -221,15 +275,18 @@ if os.cpu_count() and os.cpu_count() >= 8:
 
 PRIME_LIMIT = 10000
 
+# Warm the JIT so compilation is not charged to the first configuration
+count_primes(100)
+
 print(f"\nTesting with different numbers of parallel tasks:")
 print(f"Task: Count primes up to {PRIME_LIMIT:,}\n")
 
 baseline_time = None
 for num_tasks in test_configs:
-    start = time.time()
+    start = time.perf_counter_ns()
     handles = [compute_primes(PRIME_LIMIT) for _ in range(num_tasks)]
     results = [h.get() for h in handles]
-    elapsed = time.time() - start
+    elapsed = (time.perf_counter_ns() - start) / 1e9
 
     if baseline_time is None:
         baseline_time = elapsed
@@ -55,6 +55,7 @@ result1 = expensive_calculation(2, 20)
 print("   Second call (cached):")
 result2 = expensive_calculation(2, 20)
 print(f"   Results match: {result1 == result2}")
+print(f"   Cache stats: {expensive_calculation.cache_info()}")
 
 # Call Counter
 @mp.CallCounter
@@ -86,10 +87,8 @@ start = time.time()
 handles = [cpu_bound_task(i, 0.5) for i in range(4)]
 
 # Monitor progress
-while not all(h.is_ready() for h in handles):
-    ready = sum(1 for h in handles if h.is_ready())
-    print(f"   Progress: {ready}/4 tasks complete", end='\r')
-    time.sleep(0.1)
+while not mp.wait_all(handles, timeout=0.1):
+    print(f"   Progress: {mp.ready_count(handles)}/4 tasks complete", end='\r')
 
 results = [h.get() for h in handles]
 elapsed = time.time() - start
@@ -241,13 +240,12 @@ handles = [ultimate_task(i, 200000) for i in range(6)]
 # Monitor with new cancellation features
 all_ready = False
 while not all_ready:
-    ready_count = sum(1 for h in handles if h.is_ready())
+    ready_count = mp.ready_count(handles)
     if ready_count > 0:
         elapsed = handles[0].elapsed_time()
         print(f"   Progress: {ready_count}/6 tasks, elapsed: {elapsed:.2f}s", end='\r')
 
-    all_ready = all(h.is_ready() for h in handles)
-    time.sleep(0.1)
+    all_ready = mp.wait_all(handles, timeout=0.1)
 
 print("\n   ✓ All tasks completed!")
 
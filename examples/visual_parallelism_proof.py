@@ -4,9 +4,17 @@ Visual Proof of True Parallelism
 Shows real-time progress of parallel tasks running simultaneously
 """
 
+import sys
 import time
-import threading
-from makeParallel import parallel
+from array import array
+from makeParallel import parallel, wait_all, HandleGroup
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional - fall back to the plain Python loop
+    def njit(*args, **kwargs):
+        return lambda f: f
 
 print("=" * 80)
 print("VISUAL PROOF: Watch Tasks Run Simultaneously")
@@ -19,26 +27,36 @@ print("\nTEST: 4 CPU-Intensive Tasks Running in Parallel")
 print("If truly parallel, you'll see all tasks progressing at the same time")
 print("-" * 80)
 
-# Shared progress tracking
-progress = {0: 0, 1: 0, 2: 0, 3: 0}
-progress_lock = threading.Lock()
+# Shared progress tracking - one slot per task, each written by a single
+# worker, so plain item stores are enough and the monitor only reads
+progress = array("i", [0] * 4)
+
+@njit(cache=True, nogil=True)
+def sum_squares(start, stop):
+    """Sum of i**2 for i in [start, stop), compiled to native code when Numba is available"""
+    total = 0
+    for i in range(start, stop):
+        total += i * i
+    return total
+
+# Warm the JIT so compilation is not charged to the timed run
+sum_squares(0, 10)
 
 @parallel
 def cpu_task_with_progress(task_id, total_iterations):
     """CPU task that reports progress"""
-    chunk_size = total_iterations // 10  # Report every 10%
+    # Work in 1% chunks; each chunk's partial sum stays within int64
+    chunk_size = max(total_iterations // 100, 1)
     result = 0
 
-    for i in range(total_iterations):
-        result += i ** 2
+    for start in range(0, total_iterations, chunk_size):
+        stop = min(start + chunk_size, total_iterations)
+        result += sum_squares(start, stop)
 
-        # Update progress every chunk
-        if i % chunk_size == 0:
-            with progress_lock:
-                progress[task_id] = int((i / total_iterations) * 100)
+        # Update progress after every chunk (integer math, no float round-trip)
+        progress[task_id] = stop * 100 // total_iterations
 
-    with progress_lock:
-        progress[task_id] = 100
+    progress[task_id] = 100
 
     return result
 
@@ -46,38 +64,47 @@ def cpu_task_with_progress(task_id, total_iterations):
 ITERATIONS = 5_000_000
 print(f"Starting 4 tasks, each doing {ITERATIONS:,} iterations...\n")
 
-start = time.time()
+start = time.perf_counter_ns()
 handles = [cpu_task_with_progress(i, ITERATIONS) for i in range(4)]
 
 # Monitor progress in real-time
 print("Real-time Progress:")
 print("-" * 80)
 
-while True:
-    with progress_lock:
-        current_progress = dict(progress)
+BAR_LENGTH = 20
+FILLED = "█" * BAR_LENGTH
+EMPTY = "░" * BAR_LENGTH
 
-    # Check if all done
-    all_ready = all(h.is_ready() for h in handles)
+def bar(pct):
+    filled = BAR_LENGTH * pct // 100
+    return FILLED[:filled] + EMPTY[:BAR_LENGTH - filled]
 
-    # Print progress bar for each task
-    print("\r", end="")
-    for task_id in range(4):
-        pct = current_progress[task_id]
-        bar_length = 20
-        filled = int(bar_length * pct / 100)
-        bar = "█" * filled + "░" * (bar_length - filled)
-        print(f"Task {task_id}: [{bar}] {pct:3d}%  ", end="")
+while True:
+    # Block up to one frame; returns as soon as the last task finishes
+    all_ready = wait_all(handles, timeout=0.05)
+    current_progress = list(progress)
+
+    # Render all progress bars as one line, written once per frame
+    line = "".join(
+        f"Task {task_id}: [{bar(pct)}] {pct:3d}%  "
+        for task_id, pct in enumerate(current_progress)
+    )
+    sys.stdout.write("\r" + line)
+    sys.stdout.flush()
 
     if all_ready:
         break
 
-    time.sleep(0.05)
-
-elapsed = time.time() - start
+elapsed = (time.perf_counter_ns() - start) / 1e9
 results = [h.get() for h in handles]
 
+# The loop has a closed form, so the real work is checked in O(1)
+n = ITERATIONS
+expected = n * (n - 1) * (2 * n - 1) // 6
+assert all(r == expected for r in results), "task results do not match n(n-1)(2n-1)/6"
+
 print(f"\n\n✅ All tasks completed in {elapsed:.2f}s")
+print(f"   Every result equals n(n-1)(2n-1)/6 = {expected:,}")
 print(f"\nKEY OBSERVATION:")
 print(f"  All progress bars advanced simultaneously!")
 print(f"  This proves tasks ran in parallel, not sequentially.")
@@ -93,30 +120,30 @@ print("=" * 80)
 def sleep_task(duration):
     """Task that sleeps (simulates I/O or waiting)"""
     import time
-    start = time.time()
+    deadline = time.monotonic_ns() + int(duration * 1_000_000_000)
     # Busy wait to consume CPU
-    while time.time() - start < duration:
-        _ = sum(range(10000))
+    while time.monotonic_ns() < deadline:
+        _ = sum_squares(0, 10000)
     return duration
 
 print(f"\nTesting: 4 tasks that each take 2 seconds")
 print(f"Expected if SEQUENTIAL: 8 seconds (2s × 4)")
 print(f"Expected if PARALLEL:   2 seconds\n")
 
-start = time.time()
+start = time.perf_counter_ns()
 handles = [sleep_task(2.0) for i in range(4)]
+group = HandleGroup(handles)
 
 # Show countdown
 for i in range(20):
-    ready_count = sum(1 for h in handles if h.is_ready())
-    elapsed_now = time.time() - start
-    print(f"\rElapsed: {elapsed_now:.1f}s | Ready: {ready_count}/4", end="", flush=True)
-    if ready_count == 4:
+    all_done = group.wait(timeout=0.1)
+    elapsed_now = (time.perf_counter_ns() - start) / 1e9
+    print(f"\rElapsed: {elapsed_now:.1f}s | Ready: {group.ready_count()}/4", end="", flush=True)
+    if all_done:
         break
-    time.sleep(0.1)
 
 results = [h.get() for h in handles]
-total_time = time.time() - start
+total_time = (time.perf_counter_ns() - start) / 1e9
 
 print(f"\n\nRESULT: Completed in {total_time:.2f}s")
 
@@ -143,10 +170,11 @@ cpu_count = os.cpu_count() or 4
 @parallel
 def cpu_burner(duration):
     """Pure CPU burning"""
-    start = time.time()
+    deadline = time.monotonic_ns() + int(duration * 1_000_000_000)
     count = 0
-    while time.time() - start < duration:
-        count += sum(i**2 for i in range(100))
+    while time.monotonic_ns() < deadline:
+        # One native call per block instead of a 100-step generator
+        count += sum_squares(0, 100)
     return count
 
 print(f"\nSystem has {cpu_count} CPU cores")
@@ -156,10 +184,10 @@ test_sizes = [1, 2, 4, min(8, cpu_count)]
 burn_duration = 0.5
 
 for num_tasks in test_sizes:
-    start = time.time()
+    start = time.perf_counter_ns()
     handles = [cpu_burner(burn_duration) for _ in range(num_tasks)]
     results = [h.get() for h in handles]
-    elapsed = time.time() - start
+    elapsed = (time.perf_counter_ns() - start) / 1e9
 
     # If truly parallel, elapsed should stay around burn_duration
     # regardless of num_tasks (up to CPU core limit)
@@ -174,6 +202,48 @@ for num_tasks in test_sizes:
 
 print(f"\n✅ Tasks utilize multiple CPU cores simultaneously")
 
+# =============================================================================
+# CONTROL: Pure-Python burner, threads vs processes
+# =============================================================================
+print("\n" + "=" * 80)
+print("CONTROL: Pure-Python Burner - @parallel vs ProcessPoolExecutor")
+print("=" * 80)
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+def cpu_burner_py(duration):
+    """Pure-Python CPU burning (no native kernel)"""
+    deadline = time.monotonic_ns() + int(duration * 1_000_000_000)
+    count = 0
+    while time.monotonic_ns() < deadline:
+        count += sum(i**2 for i in range(100))
+    return count
+
+# A fixed-duration burner always takes ~duration of wall time, so compare the
+# total work done: if the GIL serializes the threads, @parallel finishes about
+# 1/N of the work that N processes do.
+num_tasks = min(4, cpu_count)
+print(f"\n{num_tasks} tasks, {burn_duration}s each, counting work completed:\n")
+
+handles = [parallel(cpu_burner_py)(burn_duration) for _ in range(num_tasks)]
+thread_work = sum(h.get() for h in handles)
+print(f"  @parallel threads:    {thread_work:,} blocks")
+
+# fork keeps workers from re-running this script; skip where it is unavailable
+if "fork" in multiprocessing.get_all_start_methods():
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=num_tasks, mp_context=ctx) as ex:
+        futures = [ex.submit(cpu_burner_py, burn_duration) for _ in range(num_tasks)]
+        process_work = sum(f.result() for f in futures)
+    print(f"  ProcessPoolExecutor:  {process_work:,} blocks")
+    print(f"\n  Threads did {thread_work / process_work:.0%} of the process pool's work.")
+    print("  Pure-Python loops only scale across threads on a free-threaded")
+    print("  interpreter; otherwise use processes or a nogil native kernel")
+    print("  like sum_squares above.")
+else:
+    print("  ProcessPoolExecutor:  skipped (fork start method unavailable)")
+
 # =============================================================================
 # FINAL DEMONSTRATION
 # =============================================================================
@@ -1,22 +1,28 @@
 use pyo3::IntoPyObjectExt;
 use pyo3::prelude::*;
-use pyo3::types::{PyCFunction, PyDict, PyTuple};
+use pyo3::intern;
+use pyo3::sync::PyOnceLock;
+use pyo3::exceptions::PyRuntimeWarning;
+use pyo3::types::{PyBytes, PyCFunction, PyDict, PyInt, PyList, PyString, PyTuple, PyType};
 use pyo3::wrap_pyfunction;
 use std::collections::{BinaryHeap, HashMap};
+use std::ffi::CString;
+use std::io::{BufWriter, Write};
 use std::sync::mpsc::{Receiver, Sender, channel};
-use std::sync::Arc;
-use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::sync::{Arc, OnceLock, Weak};
+use std::sync::atomic::{fence, AtomicBool, AtomicU64, AtomicUsize, Ordering};
 use std::thread::{self, JoinHandle};
 use std::time::{Duration, Instant};
-use std::cmp::Ordering as CmpOrdering;
-use std::cell::RefCell;
+use std::cmp::{Ordering as CmpOrdering, Reverse};
+use std::cell::{Cell, RefCell};
 
 // Optimized imports
-use crossbeam::channel::{Receiver as CrossbeamReceiver, Sender as CrossbeamSender, unbounded};
-use dashmap::DashMap;
+use crossbeam::channel::{bounded, Receiver as CrossbeamReceiver, RecvTimeoutError, Sender as CrossbeamSender, unbounded};
+use crossbeam_skiplist::SkipMap;
+use dashmap::{DashMap, DashSet};
 use rayon::prelude::*;
 use once_cell::sync::Lazy;
-use parking_lot::Mutex;  // Faster mutex implementation
+use parking_lot::{Condvar, Mutex};  // Faster mutex implementation
 
 // Logging
 use log::{debug, warn, error};
@@ -30,6 +36,10 @@ use types::TaskError as CustomTaskError;
 
 type TaskError = CustomTaskError;
 
+/// Outcome a worker sends to its AsyncHandle. Failures travel as their
+/// formatted message and only become a Python exception when get() raises.
+type TaskOutcome = Result<Py<PyAny>, String>;
+
 // Callback types
 type CallbackFunc = Arc<Mutex<Option<Py<PyAny>>>>;
 
@@ -48,9 +58,11 @@ static TASK_ERRORS: Lazy<Arc<DashMap<String, String>>> =
 static DEPENDENCY_COUNTS: Lazy<Arc<DashMap<String, usize>>> =
     Lazy::new(|| Arc::new(DashMap::new()));
 
-// Timeout cancellation handles
-static TIMEOUT_HANDLES: Lazy<Arc<Mutex<Vec<(String, Sender<()>)>>>> =
-    Lazy::new(|| Arc::new(Mutex::new(Vec::new())));
+// Pending task timeouts, served by a single timer thread
+static TIMEOUT_QUEUE: Lazy<Mutex<BinaryHeap<TimeoutEntry>>> =
+    Lazy::new(|| Mutex::new(BinaryHeap::new()));
+static TIMEOUT_CONDVAR: Lazy<Condvar> = Lazy::new(Condvar::new);
+static TIMEOUT_THREAD: Lazy<JoinHandle<()>> = Lazy::new(|| thread::spawn(run_timeout_thread));
 
 // System monitor for memory checking
 static SYSTEM_MONITOR: Lazy<Mutex<System>> = Lazy::new(|| Mutex::new(System::new_all()));
@@ -58,8 +70,12 @@ static SYSTEM_MONITOR: Lazy<Mutex<System>> = Lazy::new(|| Mutex::new(System::new
 /// Global shutdown flag
 static SHUTDOWN_FLAG: Lazy<Arc<AtomicBool>> = Lazy::new(|| Arc::new(AtomicBool::new(false)));
 
-/// Active task handles for shutdown
-static ACTIVE_TASKS: Lazy<Arc<Mutex<Vec<String>>>> = Lazy::new(|| Arc::new(Mutex::new(Vec::new())));
+/// Active task handles for shutdown (sharded so concurrent submitters and
+/// finishing workers don't serialize on a single lock)
+static ACTIVE_TASKS: Lazy<Arc<DashSet<String>>> = Lazy::new(|| Arc::new(DashSet::new()));
+
+/// Number of active tasks, kept alongside ACTIVE_TASKS so counting is a single load
+static ACTIVE_TASK_COUNT: AtomicUsize = AtomicUsize::new(0);
 
 /// Task ID counter
 static TASK_ID_COUNTER: Lazy<Arc<AtomicU64>> = Lazy::new(|| Arc::new(AtomicU64::new(0)));
@@ -71,52 +87,87 @@ fn is_shutdown_requested() -> bool {
 
 /// Register a task as active
 fn register_task(task_id: String) {
-    ACTIVE_TASKS.lock().push(task_id);
+    if ACTIVE_TASKS.insert(task_id) {
+        ACTIVE_TASK_COUNT.fetch_add(1, Ordering::AcqRel);
+    }
 }
 
 /// Unregister a task
 fn unregister_task(task_id: &str) {
-    let mut tasks = ACTIVE_TASKS.lock();
-    tasks.retain(|id| id != task_id);
+    if ACTIVE_TASKS.remove(task_id).is_none() {
+        return;
+    }
+    let remaining = ACTIVE_TASK_COUNT.fetch_sub(1, Ordering::AcqRel) - 1;
+
+    // A slot just freed up: wake one submitter blocked on backpressure,
+    // and shutdown() once the last task is gone
+    let _guard = SLOT_LOCK.lock();
+    SLOT_FREED.notify_one();
+    if remaining == 0 {
+        TASKS_IDLE.notify_all();
+    }
 }
 
 /// Get active task count
 #[pyfunction]
 fn get_active_task_count() -> usize {
-    ACTIVE_TASKS.lock().len()
+    ACTIVE_TASK_COUNT.load(Ordering::Acquire)
 }
 
 /// Initiate graceful shutdown
 #[pyfunction]
-fn shutdown(timeout_secs: Option<f64>, cancel_pending: bool) -> PyResult<bool> {
+fn shutdown(py: Python, timeout_secs: Option<f64>, cancel_pending: bool) -> PyResult<bool> {
     println!("Initiating graceful shutdown...");
     SHUTDOWN_FLAG.store(true, Ordering::Release);
+    wake_slot_waiters();
 
-    let start = Instant::now();
     let timeout = timeout_secs.map(Duration::from_secs_f64).unwrap_or(Duration::from_secs(30));
+    let deadline = Instant::now() + timeout;
 
     // Stop priority worker
     let _ = stop_priority_worker();
 
-    // Wait for active tasks
-    loop {
-        let active_count = get_active_task_count();
-        if active_count == 0 {
-            println!("All tasks completed. Shutdown successful.");
-            return Ok(true);
-        }
+    // Wait for active tasks with the GIL released so they can finish
+    let drained = py.detach(|| wait_tasks_idle(Some(deadline)));
 
-        if start.elapsed() >= timeout {
-            println!("Shutdown timeout reached. {} tasks still active.", active_count);
-            if cancel_pending {
-                println!("Cancelling remaining tasks...");
-                // Tasks will check shutdown flag and exit
+    py.detach(flush_log_queue);
+
+    if drained {
+        println!("All tasks completed. Shutdown successful.");
+        return Ok(true);
+    }
+
+    println!("Shutdown timeout reached. {} tasks still active.", get_active_task_count());
+    if cancel_pending {
+        println!("Cancelling remaining tasks...");
+        // Tasks will check shutdown flag and exit
+    }
+    Ok(false)
+}
+
+/// Block until no tasks are active or the deadline passes (call without the GIL).
+/// unregister_task() wakes waiters when the count reaches zero.
+fn wait_tasks_idle(deadline: Option<Instant>) -> bool {
+    let mut guard = SLOT_LOCK.lock();
+    while get_active_task_count() > 0 {
+        match deadline {
+            Some(deadline) => {
+                if TASKS_IDLE.wait_until(&mut guard, deadline).timed_out() {
+                    return get_active_task_count() == 0;
+                }
             }
-            return Ok(false);
+            None => TASKS_IDLE.wait(&mut guard),
         }
-
-        thread::sleep(Duration::from_millis(100));
     }
+    true
+}
+
+/// Block until every active task has finished (returns False on timeout)
+#[pyfunction]
+#[pyo3(signature = (timeout=None))]
+fn wait_idle(py: Python, timeout: Option<f64>) -> bool {
+    let deadline = deadline_from_timeout(timeout);
+    py.detach(|| wait_tasks_idle(deadline))
 }
 
 /// Reset shutdown flag (for testing)
@@ -130,39 +181,56 @@ fn reset_shutdown() -> PyResult<()> {
 static MAX_CONCURRENT_TASKS: Lazy<Arc<Mutex<Option<usize>>>> =
     Lazy::new(|| Arc::new(Mutex::new(None)));
 
+/// Backpressure wait queue: submitters sleep on SLOT_FREED (off the GIL)
+/// until a task unregisters, the limit changes, or shutdown starts.
+/// shutdown() sleeps on TASKS_IDLE until the last active task unregisters.
+static SLOT_LOCK: Lazy<Mutex<()>> = Lazy::new(|| Mutex::new(()));
+static SLOT_FREED: Lazy<Condvar> = Lazy::new(Condvar::new);
+static TASKS_IDLE: Lazy<Condvar> = Lazy::new(Condvar::new);
+
 /// Set maximum concurrent tasks
 #[pyfunction]
 fn set_max_concurrent_tasks(max_tasks: usize) -> PyResult<()> {
     *MAX_CONCURRENT_TASKS.lock() = Some(max_tasks);
+    wake_slot_waiters();
     Ok(())
 }
 
-/// Wait for available slot (backpressure)
-fn wait_for_slot() {
-    if let Some(max) = *MAX_CONCURRENT_TASKS.lock() {
-        let start = Instant::now();
-        let timeout = Duration::from_secs(300); // 5 minute timeout
-        let mut backoff = Duration::from_millis(10);
+/// Wake every submitter blocked in acquire_slot so it re-checks its condition
+fn wake_slot_waiters() {
+    let _guard = SLOT_LOCK.lock();
+    SLOT_FREED.notify_all();
+}
+
+/// Wait for an available slot (backpressure), then register the task as active.
+/// The wait happens with the GIL released, and the limit check and registration
+/// share one lock so concurrent submitters can't overshoot the limit.
+fn acquire_slot(py: Python, task_id: &str) {
+    py.detach(|| {
+        let mut guard = SLOT_LOCK.lock();
+        let deadline = Instant::now() + Duration::from_secs(300); // 5 minute timeout
+
+        loop {
+            match *MAX_CONCURRENT_TASKS.lock() {
+                Some(max) if get_active_task_count() >= max => {}
+                _ => break,
+            }
 
-        while get_active_task_count() >= max {
             // CRITICAL FIX: Check shutdown
             if is_shutdown_requested() {
-                warn!("wait_for_slot cancelled: shutdown in progress");
-                return;
+                warn!("acquire_slot cancelled: shutdown in progress");
+                break;
             }
 
             // CRITICAL FIX: Add timeout
-            if start.elapsed() > timeout {
-                error!("wait_for_slot timed out after 5 minutes");
-                return;
+            if SLOT_FREED.wait_until(&mut guard, deadline).timed_out() {
+                error!("acquire_slot timed out after 5 minutes");
+                break;
             }
-
-            thread::sleep(backoff);
-
-            // CRITICAL FIX: Exponential backoff
-            backoff = (backoff * 2).min(Duration::from_secs(1));
         }
-    }
+
+        register_task(task_id.to_string());
+    });
 }
 
 // =============================================================================
@@ -176,12 +244,33 @@ static MEMORY_LIMIT_PERCENT: Lazy<Arc<Mutex<Option<f64>>>> =
 /// Configure memory limit
 #[pyfunction]
 fn configure_memory_limit(max_memory_percent: f64) -> PyResult<()> {
+    check_memory_percent(max_memory_percent)?;
+    *MEMORY_LIMIT_PERCENT.lock() = Some(max_memory_percent);
+    Ok(())
+}
+
+fn check_memory_percent(max_memory_percent: f64) -> PyResult<()> {
     if max_memory_percent <= 0.0 || max_memory_percent > 100.0 {
         return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
             "max_memory_percent must be between 0 and 100"
         ));
     }
-    *MEMORY_LIMIT_PERCENT.lock() = Some(max_memory_percent);
+    Ok(())
+}
+
+/// Apply several limits in one call. Every value is checked before any is
+/// applied, and blocked submitters are woken at most once.
+#[pyfunction]
+#[pyo3(signature = (*, max_concurrent_tasks=None, max_memory_percent=None))]
+fn configure(max_concurrent_tasks: Option<usize>, max_memory_percent: Option<f64>) -> PyResult<()> {
+    if let Some(percent) = max_memory_percent {
+        check_memory_percent(percent)?;
+        *MEMORY_LIMIT_PERCENT.lock() = Some(percent);
+    }
+    if let Some(max_tasks) = max_concurrent_tasks {
+        *MAX_CONCURRENT_TASKS.lock() = Some(max_tasks);
+        wake_slot_waiters();
+    }
     Ok(())
 }
 
@@ -223,6 +312,8 @@ static TASK_PROGRESS_MAP: Lazy<Arc<DashMap<String, f64>>> =
 // Thread-local storage for current task ID
 thread_local! {
     static CURRENT_TASK_ID: RefCell<Option<String>> = RefCell::new(None);
+    /// Whether anyone watches the running task's progress (None: assume so)
+    static PROGRESS_WATCHED: RefCell<Option<Arc<AtomicBool>>> = RefCell::new(None);
 }
 
 /// Set the current task ID for this thread (internal use)
@@ -232,12 +323,83 @@ fn set_current_task_id(task_id: Option<String>) {
     });
 }
 
+/// Set the running task's progress-watched flag for this thread (internal use)
+fn set_progress_watched(flag: Option<Arc<AtomicBool>>) {
+    PROGRESS_WATCHED.with(|watched| {
+        *watched.borrow_mut() = flag;
+    });
+}
+
+/// True when the task running on this thread has a handle nobody has asked
+/// for progress yet, so reporting it can be skipped
+fn progress_unwatched() -> bool {
+    PROGRESS_WATCHED.with(|watched| {
+        watched
+            .borrow()
+            .as_ref()
+            .is_some_and(|flag| !flag.load(Ordering::Relaxed))
+    })
+}
+
 /// Get the current task ID for this thread
 #[pyfunction]
 fn get_current_task_id() -> PyResult<Option<String>> {
     Ok(CURRENT_TASK_ID.with(|id| id.borrow().clone()))
 }
 
+/// Progress coalescing: a report for the same task that is both within
+/// min_interval of the last published one and closer than min_delta to it is
+/// dropped. Stored as f64 bits / nanoseconds.
+static PROGRESS_MIN_DELTA: AtomicU64 = AtomicU64::new(0x3F84_7AE1_47AE_147B); // 0.01
+static PROGRESS_MIN_INTERVAL_NS: AtomicU64 = AtomicU64::new(10_000_000); // 10ms
+
+thread_local! {
+    /// (task_id, progress, when) last published by report_progress on this thread
+    static LAST_PUBLISHED_PROGRESS: RefCell<Option<(String, f64, Instant)>> = RefCell::new(None);
+}
+
+/// Decide whether a progress report is worth publishing (internal).
+/// Completion (1.0) is always published, so observers see the final value.
+fn should_publish_progress(task_id: &str, progress: f64) -> bool {
+    let min_delta = f64::from_bits(PROGRESS_MIN_DELTA.load(Ordering::Relaxed));
+    let min_interval = Duration::from_nanos(PROGRESS_MIN_INTERVAL_NS.load(Ordering::Relaxed));
+    let now = Instant::now();
+    LAST_PUBLISHED_PROGRESS.with(|last| {
+        let mut last = last.borrow_mut();
+        match last.as_mut() {
+            Some((id, value, at)) if id.as_str() == task_id => {
+                if progress < 1.0
+                    && (progress - *value).abs() < min_delta
+                    && now.duration_since(*at) < min_interval
+                {
+                    return false;
+                }
+                *value = progress;
+                *at = now;
+            }
+            _ => *last = Some((task_id.to_string(), progress, now)),
+        }
+        true
+    })
+}
+
+/// Configure how report_progress coalesces chatty updates.
+/// A report is dropped when it is within min_interval_ms of the last published
+/// value for the task and differs from it by less than min_delta; pass 0 for
+/// either to publish every report.
+#[pyfunction]
+#[pyo3(signature = (min_delta=0.01, min_interval_ms=10.0))]
+fn set_progress_coalescing(min_delta: f64, min_interval_ms: f64) -> PyResult<()> {
+    if !min_delta.is_finite() || min_delta < 0.0 || !min_interval_ms.is_finite() || min_interval_ms < 0.0 {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "min_delta and min_interval_ms must be finite and non-negative"
+        ));
+    }
+    PROGRESS_MIN_DELTA.store(min_delta.to_bits(), Ordering::Relaxed);
+    PROGRESS_MIN_INTERVAL_NS.store((min_interval_ms * 1_000_000.0) as u64, Ordering::Relaxed);
+    Ok(())
+}
+
 /// Report progress from within a task (with explicit task_id)
 #[pyfunction]
 #[pyo3(signature = (progress, task_id=None))]
@@ -255,49 +417,148 @@ fn report_progress(progress: f64, task_id: Option<String>) -> PyResult<()> {
         ));
     }
 
-    // Use provided task_id or get from thread-local storage
-    let actual_task_id = if let Some(tid) = task_id {
-        tid
-    } else {
-        CURRENT_TASK_ID.with(|id| {
-            id.borrow().clone().ok_or_else(|| {
-                PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                    "No task_id found. report_progress must be called from within a @parallel decorated function, or you must provide task_id explicitly."
-                )
-            })
-        })?
-    };
+    // Use provided task_id or borrow the one in thread-local storage, so the
+    // common implicit case doesn't clone the id on every call
+    match task_id {
+        Some(tid) => publish_progress(&tid, progress),
+        None => CURRENT_TASK_ID.with(|id| match id.borrow().as_deref() {
+            // Nobody is watching this task's progress yet; completion is
+            // still published so a late observer sees the final value
+            Some(_) if progress < 1.0 && progress_unwatched() => Ok(()),
+            Some(tid) => {
+                publish_progress(tid, progress);
+                Ok(())
+            }
+            None => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                "No task_id found. report_progress must be called from within a @parallel decorated function, or you must provide task_id explicitly."
+            )),
+        })?,
+    }
+
+    Ok(())
+}
+
+/// Record a validated progress value for a task (internal)
+fn publish_progress(task_id: &str, progress: f64) {
+    if !should_publish_progress(task_id, progress) {
+        return;
+    }
+
+    // Only record the latest value here; the progress dispatcher coalesces
+    // updates so a tight loop doesn't queue one callback per call.
+    if let Some(listener) = TASK_PROGRESS_CALLBACKS.get(task_id) {
+        listener.update(progress);
+    }
+    // Update in place after the first report instead of allocating a new key
+    match TASK_PROGRESS_MAP.get_mut(task_id) {
+        Some(mut entry) => *entry = progress,
+        None => {
+            TASK_PROGRESS_MAP.insert(task_id.to_string(), progress);
+        }
+    }
+    notify_progress_waiters();
+}
+
+/// Minimum gap between two progress callbacks for the same task (~60Hz)
+const PROGRESS_INTERVAL: Duration = Duration::from_millis(16);
+
+/// An on_progress callback plus the latest value it hasn't been sent yet
+struct ProgressListener {
+    task_id: String,
+    callback: Py<PyAny>,
+    latest: AtomicU64,
+    dirty: AtomicBool,
+    lane: usize,
+    queued: AtomicU64,
+    finished: AtomicU64,
+}
 
-    TASK_PROGRESS_MAP.insert(actual_task_id.clone(), progress);
+impl ProgressListener {
+    /// Record a new value; queue the listener for the dispatcher if it was clean
+    fn update(self: &Arc<Self>, progress: f64) {
+        self.latest.store(progress.to_bits(), Ordering::Release);
+        if !self.dirty.swap(true, Ordering::AcqRel) {
+            PROGRESS_DIRTY.lock().push(self.clone());
+            PROGRESS_WAKE.notify_one();
+        }
+    }
 
-    // CRITICAL FIX: Non-blocking callback with error handling
-    if let Some(callback) = TASK_PROGRESS_CALLBACKS.get(&actual_task_id) {
-        Python::attach(|py| {
+    /// Hand the pending value (if any) to this listener's callback lane
+    fn deliver(self: &Arc<Self>) {
+        if !self.dirty.swap(false, Ordering::AcqRel) {
+            return;
+        }
+        let progress = f64::from_bits(self.latest.load(Ordering::Acquire));
+        let listener = self.clone();
+        self.queued.fetch_add(1, Ordering::AcqRel);
+        let sent = dispatch_callback(self.lane, Box::new(move |py| {
             // Execute callback with error handling
-            match callback.bind(py).call1((progress,)) {
-                Ok(_) => {},
-                Err(e) => {
-                    warn!("Progress callback failed for task {}: {}", actual_task_id, e);
-                }
+            if let Err(e) = listener.callback.bind(py).call1((progress,)) {
+                warn!("Progress callback failed for task {}: {}", listener.task_id, e);
             }
-        });
+            listener.finished.fetch_add(1, Ordering::Release);
+        }));
+        if !sent {
+            self.finished.fetch_add(1, Ordering::Release);
+        }
     }
 
-    Ok(())
+    /// Block until every value handed to the lane so far has been delivered.
+    /// Only this task's callbacks are waited for, not other tasks' slow ones.
+    fn flush(&self, py: Python) {
+        let target = self.queued.load(Ordering::Acquire);
+        wait_for_callbacks(py, || self.finished.load(Ordering::Acquire) >= target);
+    }
 }
 
 /// Global map for progress callbacks
-static TASK_PROGRESS_CALLBACKS: Lazy<Arc<DashMap<String, Py<PyAny>>>> =
+static TASK_PROGRESS_CALLBACKS: Lazy<Arc<DashMap<String, Arc<ProgressListener>>>> =
     Lazy::new(|| Arc::new(DashMap::new()));
 
+/// Listeners with an undelivered value, drained by the progress dispatcher
+static PROGRESS_DIRTY: Lazy<Mutex<Vec<Arc<ProgressListener>>>> =
+    Lazy::new(|| Mutex::new(Vec::new()));
+static PROGRESS_WAKE: Lazy<Condvar> = Lazy::new(Condvar::new);
+
+/// Progress dispatcher: forwards the latest value of every dirty listener,
+/// then sleeps PROGRESS_INTERVAL so bursts collapse into one callback.
+static PROGRESS_DISPATCHER: Lazy<()> = Lazy::new(|| {
+    thread::spawn(|| loop {
+        let batch = {
+            let mut dirty = PROGRESS_DIRTY.lock();
+            while dirty.is_empty() {
+                PROGRESS_WAKE.wait(&mut dirty);
+            }
+            std::mem::take(&mut *dirty)
+        };
+        for listener in &batch {
+            listener.deliver();
+        }
+        thread::sleep(PROGRESS_INTERVAL);
+    });
+});
+
 /// Register progress callback for a task (internal)
-fn register_progress_callback(task_id: String, callback: Py<PyAny>) {
-    TASK_PROGRESS_CALLBACKS.insert(task_id, callback);
+fn register_progress_callback(task_id: String, callback: Py<PyAny>) -> Arc<ProgressListener> {
+    Lazy::force(&PROGRESS_DISPATCHER);
+    let listener = Arc::new(ProgressListener {
+        task_id: task_id.clone(),
+        callback,
+        latest: AtomicU64::new(0),
+        dirty: AtomicBool::new(false),
+        lane: next_callback_lane(),
+        queued: AtomicU64::new(0),
+        finished: AtomicU64::new(0),
+    });
+    TASK_PROGRESS_CALLBACKS.insert(task_id, listener.clone());
+    listener
 }
 
-/// Unregister progress callback (internal)
+/// Unregister progress callback, delivering its last value first (internal)
 fn unregister_progress_callback(task_id: &str) {
-    TASK_PROGRESS_CALLBACKS.remove(task_id);
+    if let Some((_, listener)) = TASK_PROGRESS_CALLBACKS.remove(task_id) {
+        listener.deliver();
+    }
 }
 
 /// Clear progress for a completed task (internal cleanup)
@@ -306,14 +567,390 @@ fn clear_task_progress(task_id: &str) {
     unregister_progress_callback(task_id);
 }
 
+// =============================================================================
+// BUFFERED LOGGING
+// =============================================================================
+
+/// How long logged lines may sit in the buffer before they are written out
+const LOG_FLUSH_INTERVAL: Duration = Duration::from_millis(10);
+
+enum LogMessage {
+    Line(String),
+    Flush(CrossbeamSender<()>),
+}
+
+/// Lines queued by log(). A single writer thread owns a buffered stdout, so
+/// tasks logging concurrently never contend on the stdout lock.
+static LOG_QUEUE: Lazy<CrossbeamSender<LogMessage>> = Lazy::new(|| {
+    let (sender, receiver) = unbounded::<LogMessage>();
+    thread::spawn(move || {
+        let mut out = BufWriter::new(std::io::stdout());
+        let mut pending_since: Option<Instant> = None;
+        loop {
+            let message = match pending_since {
+                Some(since) => match receiver.recv_deadline(since + LOG_FLUSH_INTERVAL) {
+                    Ok(message) => message,
+                    Err(RecvTimeoutError::Timeout) => {
+                        let _ = out.flush();
+                        pending_since = None;
+                        continue;
+                    }
+                    Err(RecvTimeoutError::Disconnected) => break,
+                },
+                None => match receiver.recv() {
+                    Ok(message) => message,
+                    Err(_) => break,
+                },
+            };
+            match message {
+                LogMessage::Line(line) => {
+                    let _ = writeln!(out, "{}", line);
+                    pending_since.get_or_insert_with(Instant::now);
+                }
+                LogMessage::Flush(done) => {
+                    let _ = out.flush();
+                    pending_since = None;
+                    let _ = done.send(());
+                }
+            }
+        }
+        let _ = out.flush();
+    });
+    sender
+});
+
+/// Write everything logged so far (call without the GIL)
+fn flush_log_queue() {
+    if let Some(queue) = Lazy::get(&LOG_QUEUE) {
+        let (done, flushed) = bounded(1);
+        if queue.send(LogMessage::Flush(done)).is_ok() {
+            let _ = flushed.recv();
+        }
+    }
+}
+
+/// Print a line to stdout from a background writer thread.
+/// Lines are buffered and flushed every 10ms, so logging from tasks costs a
+/// str() and a queue push instead of a locked, unbuffered write.
+/// (Exposed to Python as `log`; the Rust name avoids the `log` crate.)
+#[pyfunction]
+#[pyo3(name = "log")]
+fn log_line(msg: &Bound<'_, PyAny>) -> PyResult<()> {
+    let line = msg.str()?.to_string();
+    let _ = LOG_QUEUE.send(LogMessage::Line(line));
+    Ok(())
+}
+
+/// Block until every line passed to log() has been written
+#[pyfunction]
+fn flush_log(py: Python) {
+    py.detach(flush_log_queue);
+}
+
+// =============================================================================
+// TASK TIMEOUTS
+// =============================================================================
+
+/// A task's cancel token and the moment it should be tripped
+struct TimeoutEntry {
+    deadline: Instant,
+    token: Weak<AtomicBool>,
+}
+
+impl Eq for TimeoutEntry {}
+
+impl PartialEq for TimeoutEntry {
+    fn eq(&self, other: &Self) -> bool {
+        self.deadline == other.deadline
+    }
+}
+
+impl PartialOrd for TimeoutEntry {
+    fn partial_cmp(&self, other: &Self) -> Option<CmpOrdering> {
+        Some(self.cmp(other))
+    }
+}
+
+impl Ord for TimeoutEntry {
+    fn cmp(&self, other: &Self) -> CmpOrdering {
+        // Earliest deadline comes first
+        other.deadline.cmp(&self.deadline)
+    }
+}
+
+/// Trip `token` after `timeout_secs` (one shared timer thread instead of a
+/// sleeping thread per task; tokens of dropped tasks are simply skipped)
+fn schedule_timeout(token: &Arc<AtomicBool>, timeout_secs: f64) {
+    Lazy::force(&TIMEOUT_THREAD);
+    let deadline = Instant::now() + Duration::from_secs_f64(timeout_secs.max(0.0));
+    TIMEOUT_QUEUE.lock().push(TimeoutEntry {
+        deadline,
+        token: Arc::downgrade(token),
+    });
+    TIMEOUT_CONDVAR.notify_one();
+}
+
+/// Timer thread: sleep until the earliest deadline, then trip expired tokens
+fn run_timeout_thread() {
+    let mut queue = TIMEOUT_QUEUE.lock();
+    loop {
+        let now = Instant::now();
+        while queue.peek().is_some_and(|entry| entry.deadline <= now) {
+            if let Some(token) = queue.pop().and_then(|entry| entry.token.upgrade()) {
+                token.store(true, Ordering::Release);
+            }
+        }
+
+        match queue.peek().map(|entry| entry.deadline) {
+            Some(deadline) => {
+                TIMEOUT_CONDVAR.wait_until(&mut queue, deadline);
+            }
+            None => TIMEOUT_CONDVAR.wait(&mut queue),
+        }
+    }
+}
+
+// =============================================================================
+// COMPLETION NOTIFICATION
+// =============================================================================
+
+/// Generation counter bumped whenever any task completes
+static COMPLETION_EPOCH: Lazy<Mutex<u64>> = Lazy::new(|| Mutex::new(0));
+
+/// Signalled alongside COMPLETION_EPOCH so waiters can block instead of polling
+static COMPLETION_CONDVAR: Lazy<Condvar> = Lazy::new(Condvar::new);
+
+/// Threads parked (or about to park) in wait_for_completion. Completions
+/// only take the lock to wake waiters when there are some.
+static COMPLETION_WAITERS: AtomicUsize = AtomicUsize::new(0);
+
+/// Mark a task as complete and wake any waiters (internal)
+fn mark_complete(is_complete: &AtomicBool) {
+    is_complete.store(true, Ordering::Release);
+    // Pairs with the fence in wait_for_completion: either the waiter sees
+    // the flag or this sees the waiter
+    fence(Ordering::SeqCst);
+    if COMPLETION_WAITERS.load(Ordering::SeqCst) > 0 {
+        *COMPLETION_EPOCH.lock() += 1;
+        COMPLETION_CONDVAR.notify_all();
+    }
+}
+
+/// Handles blocked in wait_state_change(). Progress reports only take the
+/// completion lock to wake waiters when there are some.
+static PROGRESS_WAITERS: AtomicUsize = AtomicUsize::new(0);
+
+/// Wake wait_state_change() callers after a progress update (internal)
+fn notify_progress_waiters() {
+    // Pairs with the fence in wait_state_change: either the waiter sees the
+    // new progress or this sees the waiter
+    fence(Ordering::SeqCst);
+    if PROGRESS_WAITERS.load(Ordering::SeqCst) > 0 {
+        *COMPLETION_EPOCH.lock() += 1;
+        COMPLETION_CONDVAR.notify_all();
+    }
+}
+
+/// Block until any of the (completion flag, task id) tasks finishes or
+/// reports new progress, or the deadline passes (call without the GIL)
+fn wait_for_state_change(tasks: &[(Arc<AtomicBool>, String)], deadline: Option<Instant>) {
+    let progress = |task_id: &String| TASK_PROGRESS_MAP.get(task_id).map(|p| *p);
+    let seen: Vec<_> = tasks.iter().map(|(_, task_id)| progress(task_id)).collect();
+
+    PROGRESS_WAITERS.fetch_add(1, Ordering::SeqCst);
+    fence(Ordering::SeqCst);
+    wait_for_completion(
+        || {
+            tasks.iter().zip(&seen).any(|((is_complete, task_id), seen)| {
+                is_complete.load(Ordering::Acquire) || progress(task_id) != *seen
+            })
+        },
+        deadline,
+    );
+    PROGRESS_WAITERS.fetch_sub(1, Ordering::SeqCst);
+}
+
+/// Spins on the ready check before a waiter parks on the condvar
+const COMPLETION_SPINS: u32 = 200;
+
+/// Block until `ready` returns true or the deadline passes (call without the GIL).
+/// Spins briefly first, so a task that finishes within a few microseconds is
+/// picked up without taking the lock or sleeping; after that the waiter parks
+/// until mark_complete wakes it, so there is no polling interval to pay.
+fn wait_for_completion<F: FnMut() -> bool>(mut ready: F, deadline: Option<Instant>) -> bool {
+    for _ in 0..COMPLETION_SPINS {
+        if ready() {
+            return true;
+        }
+        std::hint::spin_loop();
+    }
+
+    COMPLETION_WAITERS.fetch_add(1, Ordering::SeqCst);
+    fence(Ordering::SeqCst);
+    let mut epoch = COMPLETION_EPOCH.lock();
+    let done = loop {
+        if ready() {
+            break true;
+        }
+
+        match deadline {
+            Some(deadline) => {
+                let now = Instant::now();
+                if now >= deadline {
+                    break false;
+                }
+                COMPLETION_CONDVAR.wait_for(&mut epoch, deadline - now);
+            }
+            None => COMPLETION_CONDVAR.wait(&mut epoch),
+        }
+    };
+    drop(epoch);
+    COMPLETION_WAITERS.fetch_sub(1, Ordering::SeqCst);
+    done
+}
+
+/// Convert an optional timeout in seconds into a deadline
+fn deadline_from_timeout(timeout_secs: Option<f64>) -> Option<Instant> {
+    timeout_secs.map(|secs| Instant::now() + Duration::from_secs_f64(secs.max(0.0)))
+}
+
+// =============================================================================
+// CALLBACK DISPATCH
+// =============================================================================
+
+/// A Python callback invocation, run on a callback lane
+type CallbackJob = Box<dyn FnOnce(Python<'_>) + Send>;
+
+/// Maximum callbacks run per GIL acquisition on a callback lane
+const CALLBACK_BATCH: usize = 64;
+
+thread_local! {
+    static IS_CALLBACK_THREAD: Cell<bool> = Cell::new(false);
+}
+
+/// Signalled after every batch a lane runs, so callers can wait for theirs
+static CALLBACKS_LOCK: Lazy<Mutex<()>> = Lazy::new(|| Mutex::new(()));
+static CALLBACKS_DRAINED: Lazy<Condvar> = Lazy::new(Condvar::new);
+
+/// Callback lanes, about one per two cores. Each lane is a thread running its
+/// queue in order under a single GIL acquisition per batch. A task's callbacks
+/// always go to the same lane so they stay ordered, and a slow callback only
+/// holds up the tasks sharing its lane.
+static CALLBACK_LANES: Lazy<Vec<CrossbeamSender<CallbackJob>>> = Lazy::new(|| {
+    let lanes = thread::available_parallelism()
+        .map(|n| n.get() / 2)
+        .unwrap_or(1)
+        .max(1);
+    (0..lanes).map(|_| spawn_callback_lane()).collect()
+});
+
+static NEXT_CALLBACK_LANE: AtomicUsize = AtomicUsize::new(0);
+
+/// Start one callback lane; workers only enqueue, the lane runs everything
+/// pending under a single GIL acquisition
+fn spawn_callback_lane() -> CrossbeamSender<CallbackJob> {
+    let (sender, receiver) = unbounded::<CallbackJob>();
+    thread::spawn(move || {
+        IS_CALLBACK_THREAD.with(|flag| flag.set(true));
+        while let Ok(first) = receiver.recv() {
+            Python::attach(|py| {
+                first(py);
+                for job in receiver.try_iter().take(CALLBACK_BATCH - 1) {
+                    job(py);
+                }
+            });
+            let _guard = CALLBACKS_LOCK.lock();
+            CALLBACKS_DRAINED.notify_all();
+        }
+    });
+    sender
+}
+
+/// Pick the lane for a new callback owner (round-robin)
+fn next_callback_lane() -> usize {
+    NEXT_CALLBACK_LANE.fetch_add(1, Ordering::Relaxed) % CALLBACK_LANES.len()
+}
+
+/// Hand a callback to a lane (internal); false if it had to be dropped
+fn dispatch_callback(lane: usize, job: CallbackJob) -> bool {
+    if CALLBACK_LANES[lane].send(job).is_err() {
+        error!("Callback thread is gone; dropping callback");
+        return false;
+    }
+    true
+}
+
+/// Block until `done` holds, re-checking after every callback batch (releases the GIL)
+fn wait_for_callbacks<F: Fn() -> bool + Sync>(py: Python, done: F) {
+    // A callback waiting on a callback lane could wait on itself
+    if IS_CALLBACK_THREAD.with(|flag| flag.get()) || done() {
+        return;
+    }
+
+    py.detach(|| {
+        let mut guard = CALLBACKS_LOCK.lock();
+        while !done() {
+            CALLBACKS_DRAINED.wait(&mut guard);
+        }
+    });
+}
+
+// =============================================================================
+// TASK THREADS
+// =============================================================================
+
+/// A task body run on a task thread
+type TaskJob = Box<dyn FnOnce() + Send>;
+
+/// How long an idle task thread waits for another task before exiting
+const TASK_THREAD_KEEPALIVE: Duration = Duration::from_secs(30);
+
+/// Hand-off to idle task threads. Zero capacity: a send only succeeds when a
+/// thread is parked waiting for work, so tasks are never queued behind others.
+static IDLE_TASK_THREADS: Lazy<(CrossbeamSender<TaskJob>, CrossbeamReceiver<TaskJob>)> =
+    Lazy::new(|| bounded(0));
+
+/// Run a task on an idle task thread, or on a new one if none is free.
+/// Every task still starts immediately, as with a thread per call, but
+/// back-to-back calls reuse threads instead of creating one each time.
+fn spawn_task_thread(job: TaskJob) {
+    let job = match IDLE_TASK_THREADS.0.try_send(job) {
+        Ok(()) => return,
+        Err(e) => e.into_inner(),
+    };
+    let idle = IDLE_TASK_THREADS.1.clone();
+    thread::spawn(move || {
+        job();
+        while let Ok(job) = idle.recv_timeout(TASK_THREAD_KEEPALIVE) {
+            job();
+        }
+    });
+}
+
 // =============================================================================
 // THREAD POOL CONFIGURATION
 // =============================================================================
 
 /// Global thread pool configuration
-static CUSTOM_THREAD_POOL: Lazy<Arc<Mutex<Option<rayon::ThreadPool>>>> =
+static CUSTOM_THREAD_POOL: Lazy<Arc<Mutex<Option<Arc<rayon::ThreadPool>>>>> =
     Lazy::new(|| Arc::new(Mutex::new(None)));
 
+/// The pool configured via configure_thread_pool, if any
+fn configured_pool() -> Option<Arc<rayon::ThreadPool>> {
+    CUSTOM_THREAD_POOL.lock().clone()
+}
+
+/// Spawn a job on the configured pool (or rayon's global pool).
+/// Each rayon worker owns a work-stealing deque: jobs spawned from inside a
+/// task go to that worker's local deque and idle workers steal from the rest,
+/// so submissions don't all contend on one shared queue.
+fn spawn_on_pool<F: FnOnce() + Send + 'static>(job: F) {
+    match configured_pool() {
+        Some(pool) => pool.spawn(job),
+        None => rayon::spawn(job),
+    }
+}
+
 /// Configure the global thread pool size
 #[pyfunction]
 #[pyo3(signature = (num_threads=None, stack_size=None))]
@@ -333,7 +970,7 @@ fn configure_thread_pool(py: Python, num_threads: Option<usize>, stack_size: Opt
             PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("Failed to build thread pool: {}", e))
         })?;
 
-        *CUSTOM_THREAD_POOL.lock() = Some(pool);
+        *CUSTOM_THREAD_POOL.lock() = Some(Arc::new(pool));
         Ok(())
     })
 }
@@ -361,37 +998,34 @@ fn get_thread_pool_info(py: Python) -> PyResult<Py<PyDict>> {
 
 /// Priority task wrapper
 struct PriorityTask {
-    priority: i32,
     func: Py<PyAny>,
     args: Py<PyTuple>,
     kwargs: Option<Py<PyDict>>,
-    sender: CrossbeamSender<PyResult<Py<PyAny>>>,
+    sender: CrossbeamSender<TaskOutcome>,
 }
 
-impl Eq for PriorityTask {}
+/// Queue order: higher priority values first, FIFO (by submission sequence)
+/// within the same priority
+type PriorityKey = (Reverse<i32>, u64);
 
-impl PartialEq for PriorityTask {
-    fn eq(&self, other: &Self) -> bool {
-        self.priority == other.priority
-    }
-}
+/// Global priority queue. A lock-free skiplist, so submitters never contend
+/// with each other or with the worker on a queue lock.
+static PRIORITY_QUEUE: Lazy<SkipMap<PriorityKey, PriorityTask>> = Lazy::new(SkipMap::new);
 
-impl PartialOrd for PriorityTask {
-    fn partial_cmp(&self, other: &Self) -> Option<CmpOrdering> {
-        Some(self.cmp(other))
-    }
-}
+/// One token per push (and per stop), so the worker sleeps while the queue
+/// is empty instead of polling it
+static PRIORITY_DOORBELL: Lazy<(CrossbeamSender<()>, CrossbeamReceiver<()>)> =
+    Lazy::new(unbounded);
 
-impl Ord for PriorityTask {
-    fn cmp(&self, other: &Self) -> CmpOrdering {
-        // Higher priority values come first
-        self.priority.cmp(&other.priority)
-    }
-}
+/// Submission order, used to keep equal-priority tasks FIFO
+static PRIORITY_SEQ: AtomicU64 = AtomicU64::new(0);
 
-/// Global priority queue
-static PRIORITY_QUEUE: Lazy<Arc<Mutex<BinaryHeap<PriorityTask>>>> =
-    Lazy::new(|| Arc::new(Mutex::new(BinaryHeap::new())));
+/// Push a task and wake the worker
+fn push_priority_task(priority: i32, task: PriorityTask) {
+    let seq = PRIORITY_SEQ.fetch_add(1, Ordering::Relaxed);
+    PRIORITY_QUEUE.insert((Reverse(priority), seq), task);
+    let _ = PRIORITY_DOORBELL.0.send(());
+}
 
 /// Worker thread flag
 static PRIORITY_WORKER_RUNNING: Lazy<Arc<AtomicBool>> =
@@ -409,13 +1043,18 @@ fn start_priority_worker(py: Python) -> PyResult<()> {
     py.detach(|| {
         thread::spawn(move || {
             while PRIORITY_WORKER_RUNNING.load(Ordering::Acquire) {
-                let task_opt = {
-                    let mut queue = PRIORITY_QUEUE.lock();
-                    queue.pop()
-                };
+                if PRIORITY_DOORBELL.1.recv().is_err() {
+                    break;
+                }
+                if !PRIORITY_WORKER_RUNNING.load(Ordering::Acquire) {
+                    // Stopped: leave the token for whoever restarts the worker
+                    let _ = PRIORITY_DOORBELL.0.send(());
+                    break;
+                }
 
-                if let Some(task) = task_opt {
+                if let Some(entry) = PRIORITY_QUEUE.pop_front() {
                     Python::attach(|py| {
+                        let task = entry.value();
                         let exec_start = Instant::now();
 
                         // Get function name for profiling
@@ -439,7 +1078,7 @@ fn start_priority_worker(py: Python) -> PyResult<()> {
                             }
                             Err(e) => {
                                 record_task_execution(&func_name, exec_time, false);
-                                Err(e)
+                                Err(e.to_string())
                             }
                         };
 
@@ -448,8 +1087,6 @@ fn start_priority_worker(py: Python) -> PyResult<()> {
                             error!("Failed to send priority task result: {}", e);
                         }
                     });
-                } else {
-                    thread::sleep(Duration::from_millis(10));
                 }
             }
         })
@@ -462,6 +1099,9 @@ fn start_priority_worker(py: Python) -> PyResult<()> {
 #[pyfunction]
 fn stop_priority_worker() -> PyResult<()> {
     PRIORITY_WORKER_RUNNING.store(false, Ordering::Release);
+
+    // Wake the worker if it is waiting on an empty queue
+    let _ = PRIORITY_DOORBELL.0.send(());
     Ok(())
 }
 
@@ -485,9 +1125,38 @@ struct PerformanceMetrics {
     average_execution_time_ms: f64,
 }
 
-/// Global metrics tracker
-static METRICS: Lazy<Arc<Mutex<HashMap<String, PerformanceMetrics>>>> =
-    Lazy::new(|| Arc::new(Mutex::new(HashMap::new())));
+/// Per-function counters, updated with relaxed atomic adds on the hot path
+#[derive(Default)]
+struct FnStats {
+    total_tasks: AtomicU64,
+    completed_tasks: AtomicU64,
+    failed_tasks: AtomicU64,
+    total_execution_ns: AtomicU64,
+    /// The function name as an interned Python string, made on first report
+    py_name: OnceLock<Py<PyString>>,
+}
+
+impl FnStats {
+    /// Build a PerformanceMetrics view (averages are computed on read)
+    fn snapshot(&self) -> PerformanceMetrics {
+        let total_tasks = self.total_tasks.load(Ordering::Relaxed);
+        let total_execution_time_ms = self.total_execution_ns.load(Ordering::Relaxed) as f64 / 1e6;
+        PerformanceMetrics {
+            total_tasks,
+            completed_tasks: self.completed_tasks.load(Ordering::Relaxed),
+            failed_tasks: self.failed_tasks.load(Ordering::Relaxed),
+            total_execution_time_ms,
+            average_execution_time_ms: if total_tasks > 0 {
+                total_execution_time_ms / total_tasks as f64
+            } else {
+                0.0
+            },
+        }
+    }
+}
+
+/// Global metrics tracker (the map is only written when a new function name appears)
+static METRICS: Lazy<Arc<DashMap<String, FnStats>>> = Lazy::new(|| Arc::new(DashMap::new()));
 
 static TASK_COUNTER: Lazy<Arc<AtomicU64>> = Lazy::new(|| Arc::new(AtomicU64::new(0)));
 static COMPLETED_COUNTER: Lazy<Arc<AtomicU64>> = Lazy::new(|| Arc::new(AtomicU64::new(0)));
@@ -503,51 +1172,55 @@ fn record_task_execution(name: &str, duration_ms: f64, success: bool) {
         FAILED_COUNTER.fetch_add(1, Ordering::Relaxed);
     }
 
-    let mut metrics = METRICS.lock();
-    let entry = metrics.entry(name.to_string()).or_insert(PerformanceMetrics {
-        total_tasks: 0,
-        completed_tasks: 0,
-        failed_tasks: 0,
-        total_execution_time_ms: 0.0,
-        average_execution_time_ms: 0.0,
-    });
+    let update = |stats: &FnStats| {
+        stats.total_tasks.fetch_add(1, Ordering::Relaxed);
+        if success {
+            stats.completed_tasks.fetch_add(1, Ordering::Relaxed);
+        } else {
+            stats.failed_tasks.fetch_add(1, Ordering::Relaxed);
+        }
+        stats
+            .total_execution_ns
+            .fetch_add((duration_ms * 1e6) as u64, Ordering::Relaxed);
+    };
 
-    entry.total_tasks += 1;
-    if success {
-        entry.completed_tasks += 1;
-    } else {
-        entry.failed_tasks += 1;
+    // Known names only take a shared shard lock
+    match METRICS.get(name) {
+        Some(stats) => update(&stats),
+        None => update(&METRICS.entry(name.to_string()).or_default()),
     }
-    entry.total_execution_time_ms += duration_ms;
-    entry.average_execution_time_ms = entry.total_execution_time_ms / entry.total_tasks as f64;
 }
 
 /// Get performance metrics for a specific function
 #[pyfunction]
 fn get_metrics(name: String) -> PyResult<Option<PerformanceMetrics>> {
-    let metrics = METRICS.lock();
-    Ok(metrics.get(&name).cloned())
+    Ok(METRICS.get(&name).map(|stats| stats.snapshot()))
 }
 
 /// Get all performance metrics
 #[pyfunction]
 fn get_all_metrics(py: Python) -> PyResult<Py<PyDict>> {
     let dict = PyDict::new(py);
-    let metrics = METRICS.lock();
 
-    for (name, metric) in metrics.iter() {
+    // Keys are interned once and reused, so a report allocates no key strings
+    for entry in METRICS.iter() {
+        let (stats, metric) = (entry.value(), entry.value().snapshot());
+        let name = stats
+            .py_name
+            .get_or_init(|| PyString::intern(py, entry.key()).unbind())
+            .bind(py);
         let metric_dict = PyDict::new(py);
-        metric_dict.set_item("total_tasks", metric.total_tasks)?;
-        metric_dict.set_item("completed_tasks", metric.completed_tasks)?;
-        metric_dict.set_item("failed_tasks", metric.failed_tasks)?;
-        metric_dict.set_item("total_execution_time_ms", metric.total_execution_time_ms)?;
-        metric_dict.set_item("average_execution_time_ms", metric.average_execution_time_ms)?;
-        dict.set_item(name.as_str(), metric_dict)?;
+        metric_dict.set_item(intern!(py, "total_tasks"), metric.total_tasks)?;
+        metric_dict.set_item(intern!(py, "completed_tasks"), metric.completed_tasks)?;
+        metric_dict.set_item(intern!(py, "failed_tasks"), metric.failed_tasks)?;
+        metric_dict.set_item(intern!(py, "total_execution_time_ms"), metric.total_execution_time_ms)?;
+        metric_dict.set_item(intern!(py, "average_execution_time_ms"), metric.average_execution_time_ms)?;
+        dict.set_item(name, metric_dict)?;
     }
 
-    dict.set_item("_global_total", TASK_COUNTER.load(Ordering::SeqCst))?;
-    dict.set_item("_global_completed", COMPLETED_COUNTER.load(Ordering::SeqCst))?;
-    dict.set_item("_global_failed", FAILED_COUNTER.load(Ordering::SeqCst))?;
+    dict.set_item(intern!(py, "_global_total"), TASK_COUNTER.load(Ordering::SeqCst))?;
+    dict.set_item(intern!(py, "_global_completed"), COMPLETED_COUNTER.load(Ordering::SeqCst))?;
+    dict.set_item(intern!(py, "_global_failed"), FAILED_COUNTER.load(Ordering::SeqCst))?;
 
     Ok(dict.unbind())
 }
@@ -555,13 +1228,20 @@ fn get_all_metrics(py: Python) -> PyResult<Py<PyDict>> {
 /// Reset all metrics
 #[pyfunction]
 fn reset_metrics() -> PyResult<()> {
-    METRICS.lock().clear();
+    METRICS.clear();
     TASK_COUNTER.store(0, Ordering::SeqCst);
     COMPLETED_COUNTER.store(0, Ordering::SeqCst);
     FAILED_COUNTER.store(0, Ordering::SeqCst);
     Ok(())
 }
 
+/// `functools.partial`, resolved once; every bound-method access of a
+/// decorated method goes through it.
+fn functools_partial(py: Python<'_>) -> PyResult<&Bound<'_, PyType>> {
+    static PARTIAL: PyOnceLock<Py<PyType>> = PyOnceLock::new();
+    PARTIAL.import(py, "functools", "partial")
+}
+
 // Helper wrapper that supports the descriptor protocol for methods
 #[pyclass]
 struct MethodWrapper {
@@ -594,8 +1274,7 @@ impl MethodWrapper {
         }
 
         // Bound method access, create a partial with obj as first argument
-        let functools = py.import("functools")?;
-        let partial = functools.getattr("partial")?;
+        let partial = functools_partial(py)?;
         partial
             .call1((self.wrapper.bind(py), obj))
             .map(|r| r.unbind())
@@ -633,7 +1312,7 @@ fn timer(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
 #[pyclass(name = "CallCounter")]
 struct CallCounter {
     func: Py<PyAny>,
-    call_count: Arc<Mutex<i32>>,
+    call_count: Arc<AtomicU64>,
 }
 
 #[pymethods]
@@ -642,7 +1321,7 @@ impl CallCounter {
     fn new(func: Py<PyAny>) -> Self {
         CallCounter {
             func,
-            call_count: Arc::new(Mutex::new(0)),
+            call_count: Arc::new(AtomicU64::new(0)),
         }
     }
 
@@ -653,18 +1332,18 @@ impl CallCounter {
         args: &Bound<'_, PyTuple>,
         kwargs: Option<&Bound<'_, PyDict>>,
     ) -> PyResult<Py<PyAny>> {
-        let mut count = self.call_count.lock();
-        *count += 1;
+        // Counted before the call; no lock is held while the function runs
+        self.call_count.fetch_add(1, Ordering::Relaxed);
         Ok(self.func.bind(py).call(args, kwargs)?.unbind())
     }
 
     #[getter]
-    fn get_call_count(&self) -> PyResult<i32> {
-        Ok(*self.call_count.lock())
+    fn get_call_count(&self) -> PyResult<u64> {
+        Ok(self.call_count.load(Ordering::Relaxed))
     }
 
     fn reset(&self) -> PyResult<()> {
-        *self.call_count.lock() = 0;
+        self.call_count.store(0, Ordering::Relaxed);
         Ok(())
     }
 
@@ -700,7 +1379,7 @@ impl CallCounter {
 struct BoundMethod {
     obj: Py<PyAny>,
     decorator: Py<PyAny>,
-    call_count: Arc<Mutex<i32>>,
+    call_count: Arc<AtomicU64>,
 }
 
 #[pymethods]
@@ -725,8 +1404,8 @@ impl BoundMethod {
     }
 
     #[getter]
-    fn get_call_count(&self) -> PyResult<i32> {
-        Ok(*self.call_count.lock())
+    fn get_call_count(&self) -> PyResult<u64> {
+        Ok(self.call_count.load(Ordering::Relaxed))
     }
 }
 
@@ -746,7 +1425,7 @@ fn retry(_py: Python<'_>, max_retries: usize) -> PyResult<Py<PyAny>> {
                     Err(e) => {
                         println!("Attempt {} failed: {:?}", attempt + 1, e.to_string());
                         last_err = Some(e);
-                        thread::sleep(Duration::from_millis(50)); // Small delay
+                        py.detach(|| thread::sleep(Duration::from_millis(50))); // Small delay
                     }
                 }
             }
@@ -771,84 +1450,285 @@ fn retry(_py: Python<'_>, max_retries: usize) -> PyResult<Py<PyAny>> {
 }
 
 // 5. Memoize Decorator
-#[pyfunction]
-fn memoize(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
-    let cache: Arc<Mutex<HashMap<String, Py<PyAny>>>> = Arc::new(Mutex::new(HashMap::new()));
+/// Separates positional arguments from keyword items in a memoize key,
+/// like functools' kwd_mark
+fn memo_kwd_mark(py: Python<'_>) -> PyResult<&Bound<'_, PyAny>> {
+    static KWD_MARK: PyOnceLock<Py<PyAny>> = PyOnceLock::new();
+    KWD_MARK
+        .get_or_try_init(py, || Ok::<_, PyErr>(py.import("builtins")?.getattr("object")?.call0()?.unbind()))
+        .map(|mark| mark.bind(py))
+}
 
-    let wrapper = move |args: &Bound<'_, PyTuple>,
-                        kwargs: Option<&Bound<'_, PyDict>>|
-          -> PyResult<Py<PyAny>> {
-        let py = args.py();
+// Build the cache key for a call, as functools._make_key(typed=True) does:
+// the arguments, a marker, the keyword items, then the type of every value,
+// so f(1), f(1.0) and f(True) are cached apart. Lookups are a single dict
+// probe. A lone exact int argument is its own key, skipping the tuple hash;
+// no tuple key can equal it. The key may be unhashable; the caller then
+// falls back to memo_repr_key.
+fn memo_key<'py>(
+    args: &Bound<'py, PyTuple>,
+    kwargs: Option<&Bound<'py, PyDict>>,
+) -> PyResult<Bound<'py, PyAny>> {
+    let py = args.py();
+    let kwargs = kwargs.filter(|k| !k.is_empty());
+    if kwargs.is_none() && args.len() == 1 {
+        let arg = args.get_item(0)?;
+        if arg.is_exact_instance_of::<PyInt>() {
+            return Ok(arg);
+        }
+    }
 
-        // Create a cache key from arguments
-        let mut key_parts: Vec<String> = vec![];
-        for arg in args.iter() {
-            key_parts.push(arg.repr()?.to_str()?.to_string());
+    let mut parts: Vec<Bound<'py, PyAny>> = args.iter().collect();
+    let mut types: Vec<Bound<'py, PyAny>> = args.iter().map(|arg| arg.get_type().into_any()).collect();
+    if let Some(kwargs_dict) = kwargs {
+        parts.push(memo_kwd_mark(py)?.clone());
+        for (key, val) in kwargs_dict.iter() {
+            types.push(val.get_type().into_any());
+            parts.push(key);
+            parts.push(val);
         }
-        if let Some(kwargs_dict) = kwargs {
-            for (key, val) in kwargs_dict.iter() {
-                key_parts.push(format!("{}={}", key, val.repr()?.to_str()?));
-            }
+    }
+    parts.extend(types);
+    Ok(PyTuple::new(py, parts)?.into_any())
+}
+
+// Key for unhashable arguments (lists, dicts, ...): built from their reprs
+fn memo_repr_key<'py>(
+    args: &Bound<'py, PyTuple>,
+    kwargs: Option<&Bound<'py, PyDict>>,
+) -> PyResult<Bound<'py, PyAny>> {
+    let py = args.py();
+    let mut key_parts: Vec<String> = vec![];
+    for arg in args.iter() {
+        key_parts.push(arg.repr()?.to_str()?.to_string());
+    }
+    if let Some(kwargs_dict) = kwargs {
+        for (key, val) in kwargs_dict.iter() {
+            key_parts.push(format!("{}={}", key, val.repr()?.to_str()?));
         }
-        let key = key_parts.join(",");
+    }
+    key_parts.join(",").into_bound_py_any(py)
+}
 
-        let mut cache_lock = cache.lock();
+#[pyclass(name = "Memoized")]
+struct Memoized {
+    func: Py<PyAny>,
+    cache: Py<PyDict>,
+    hits: AtomicU64,
+    misses: AtomicU64,
+}
 
-        // Check if result is in cache
-        if let Some(cached_result) = cache_lock.get(&key) {
-            println!("Cache hit for key: {}", key);
-            return Ok(cached_result.clone_ref(py));
+#[pymethods]
+impl Memoized {
+    #[pyo3(signature = (*args, **kwargs))]
+    fn __call__(
+        &self,
+        py: Python,
+        args: &Bound<'_, PyTuple>,
+        kwargs: Option<&Bound<'_, PyDict>>,
+    ) -> PyResult<Py<PyAny>> {
+        let cache = self.cache.bind(py);
+
+        // Check if result is in cache; the lookup itself tells us whether
+        // the key is hashable, so it is only hashed once on a hit
+        let key = memo_key(args, kwargs)?;
+        let (key, cached) = match cache.get_item(&key) {
+            Ok(cached) => (key, cached),
+            // Errors raised by an argument's own __hash__ or __eq__ propagate
+            Err(e) if !e.is_instance_of::<pyo3::exceptions::PyTypeError>(py) => return Err(e),
+            Err(_) => {
+                let key = memo_repr_key(args, kwargs)?;
+                let cached = cache.get_item(&key)?;
+                (key, cached)
+            }
+        };
+        if let Some(cached_result) = cached {
+            self.hits.fetch_add(1, Ordering::Relaxed);
+            return Ok(cached_result.unbind());
         }
 
         // If not, call the function and store the result
-        println!("Cache miss for key: {}", key);
-        let result = func.bind(py).call(args, kwargs)?;
-        let result_unbound = result.unbind();
-        cache_lock.insert(key, result_unbound.clone_ref(py));
-        Ok(result_unbound)
-    };
+        self.misses.fetch_add(1, Ordering::Relaxed);
+        debug!("Cache miss for key: {}", key);
+        let result = self.func.bind(py).call(args, kwargs)?;
+        cache.set_item(key, &result)?;
+        Ok(result.unbind())
+    }
 
-    let wrapped = PyCFunction::new_closure(py, None, None, wrapper)?;
-    Ok(wrapped.into())
+    /// Return cache statistics: hits, misses and current size
+    fn cache_info(&self, py: Python) -> PyResult<Py<PyDict>> {
+        let info = PyDict::new(py);
+        info.set_item("hits", self.hits.load(Ordering::Relaxed))?;
+        info.set_item("misses", self.misses.load(Ordering::Relaxed))?;
+        info.set_item("currsize", self.cache.bind(py).len())?;
+        Ok(info.unbind())
+    }
+
+    /// Drop all cached results and reset the statistics
+    fn cache_clear(&self, py: Python) {
+        self.cache.bind(py).clear();
+        self.hits.store(0, Ordering::Relaxed);
+        self.misses.store(0, Ordering::Relaxed);
+    }
+
+    fn __get__(
+        slf: PyRef<'_, Self>,
+        obj: &Bound<'_, PyAny>,
+        _objtype: Option<&Bound<'_, PyAny>>,
+    ) -> PyResult<Py<PyAny>> {
+        let py = slf.py();
+        if obj.is_none() {
+            // Unbound method access, return self
+            return Ok(slf.into_bound_py_any(py)?.unbind());
+        }
+
+        // Bound method access, create a partial with obj as first argument
+        let partial = functools_partial(py)?;
+        partial
+            .call1((slf.into_bound_py_any(py)?, obj))
+            .map(|r| r.unbind())
+    }
+}
+
+#[pyfunction]
+fn memoize(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
+    let memoized = Py::new(
+        py,
+        Memoized {
+            func,
+            cache: PyDict::new(py).unbind(),
+            hits: AtomicU64::new(0),
+            misses: AtomicU64::new(0),
+        },
+    )?;
+    Ok(memoized.into())
 }
 
 // 6. Parallel Decorator - Run functions in Rust threads without GIL
 
+/// on_complete / on_error callbacks shared between a handle and its worker.
+/// The worker runs them before signalling completion, so get() returns only
+/// after they have fired; callbacks registered after the task finished run
+/// immediately on the registering thread.
+#[derive(Default)]
+struct TerminalCallbacks {
+    on_complete: Option<Py<PyAny>>,
+    on_error: Option<Py<PyAny>>,
+    outcome: Option<TaskOutcome>,
+}
+
+type SharedCallbacks = Arc<Mutex<TerminalCallbacks>>;
+
+/// Callbacks given to a decorator, e.g. @parallel(on_complete=...). They are
+/// attached to each task before it starts, so no outcome or progress update
+/// can slip past them.
+#[derive(Default)]
+struct TaskHooks {
+    on_complete: Option<Py<PyAny>>,
+    on_error: Option<Py<PyAny>>,
+    on_progress: Option<Py<PyAny>>,
+}
+
+impl TaskHooks {
+    fn is_empty(&self) -> bool {
+        self.on_complete.is_none() && self.on_error.is_none() && self.on_progress.is_none()
+    }
+}
+
+/// Reject a @parallel function with decorator callbacks where its calls
+/// don't get a handle of their own, so the callbacks would never fire
+fn reject_decorator_hooks(py: Python, func: &Py<PyAny>, context: &str) -> PyResult<()> {
+    let has_hooks = func
+        .bind(py)
+        .extract::<PyRef<'_, ParallelWrapper>>()
+        .is_ok_and(|wrapper| !wrapper.hooks.is_empty());
+    if has_hooks {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+            "{} can't run @parallel decorator callbacks (on_complete, on_error, on_progress); \
+             pass the undecorated function or attach callbacks to each handle",
+            context
+        )));
+    }
+    Ok(())
+}
+
+/// Invoke a terminal callback for an outcome, logging (not raising) failures
+fn invoke_terminal_callback(py: Python, callback: &Py<PyAny>, outcome: &TaskOutcome) {
+    let (name, result) = match outcome {
+        Ok(val) => ("on_complete", callback.bind(py).call1((val.bind(py),))),
+        Err(msg) => ("on_error", callback.bind(py).call1((msg.clone(),))),
+    };
+    if let Err(e) = result {
+        // Don't propagate callback errors to task result
+        error!("{} callback failed: {}", name, e);
+    }
+}
+
+/// Record a task's outcome and run its terminal callback (worker side, GIL held)
+fn fire_terminal_callbacks(py: Python, callbacks: &Mutex<TerminalCallbacks>, outcome: &TaskOutcome) {
+    let callback = {
+        let mut state = callbacks.lock();
+        state.outcome = Some(match outcome {
+            Ok(val) => Ok(val.clone_ref(py)),
+            Err(msg) => Err(msg.clone()),
+        });
+        let on_complete = state.on_complete.take();
+        let on_error = state.on_error.take();
+        if outcome.is_ok() { on_complete } else { on_error }
+    };
+
+    if let Some(callback) = callback {
+        invoke_terminal_callback(py, &callback, outcome);
+    }
+}
+
 /// AsyncHandle - Handle for async operations with pipe communication
-#[pyclass]
+///
+/// Frozen: all state uses interior mutability, so method calls skip
+/// PyO3's borrow checking. The freelist reuses the objects of finished
+/// handles across fan-outs of many small tasks.
+#[pyclass(frozen, freelist = 256)]
 struct AsyncHandle {
-    receiver: Arc<Mutex<Receiver<PyResult<Py<PyAny>>>>>,
-    thread_handle: Arc<Mutex<Option<JoinHandle<()>>>>,
-    is_complete: Arc<Mutex<bool>>,
-    result_cache: Arc<Mutex<Option<PyResult<Py<PyAny>>>>>,
+    receiver: Mutex<Receiver<TaskOutcome>>,
+    worker_exited: Arc<AtomicBool>,
+    is_complete: Arc<AtomicBool>,
+    result_cache: Mutex<Option<TaskOutcome>>,
     cancel_token: Arc<AtomicBool>,
     func_name: String,
     start_time: Instant,
     task_id: String,
-    metadata: Arc<Mutex<HashMap<String, String>>>,
+    metadata: Mutex<HashMap<String, String>>,
     timeout: Option<f64>,
-    on_complete: Arc<Mutex<Option<Py<PyAny>>>>,
-    on_error: Arc<Mutex<Option<Py<PyAny>>>>,
-    on_progress: Arc<Mutex<Option<Py<PyAny>>>>,
+    callbacks: SharedCallbacks,
+    on_progress: Mutex<Option<Arc<ProgressListener>>>,
+    /// Set once progress is observed (on_progress, get_progress, ...); until
+    /// then the task's implicit report_progress calls are skipped
+    progress_watched: Arc<AtomicBool>,
 }
 
 #[pymethods]
 impl AsyncHandle {
     /// Check if the result is ready (non-blocking)
     fn is_ready(&self) -> PyResult<bool> {
-        Ok(*self.is_complete.lock())
+        Ok(self.is_complete.load(Ordering::Acquire))
     }
 
     /// Try to get the result without blocking (returns None if not ready)
     fn try_get(&self, py: Python) -> PyResult<Option<Py<PyAny>>> {
+        // Unfinished tasks are answered from the completion flag alone,
+        // without touching the cache or channel locks
+        if !self.is_complete.load(Ordering::Acquire) {
+            return Ok(None);
+        }
+
         // Check cache first
         let mut cache = self.result_cache.lock();
         if let Some(ref cached) = *cache {
             return match cached {
                 Ok(val) => Ok(Some(val.clone_ref(py))),
-                Err(e) => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
+                Err(msg) => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
                     "Cached error: {}",
-                    e
+                    msg
                 ))),
             };
         }
@@ -857,17 +1737,15 @@ impl AsyncHandle {
         let receiver = self.receiver.lock();
         match receiver.try_recv() {
             Ok(result) => {
-                *self.is_complete.lock() = true;
+                self.is_complete.store(true, Ordering::Release);
                 match result {
                     Ok(val) => {
                         *cache = Some(Ok(val.clone_ref(py)));
                         Ok(Some(val))
                     }
-                    Err(e) => {
-                        *cache = Some(Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                            e.to_string(),
-                        )));
-                        Err(e)
+                    Err(msg) => {
+                        *cache = Some(Err(msg.clone()));
+                        Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(msg))
                     }
                 }
             }
@@ -882,9 +1760,9 @@ impl AsyncHandle {
         if let Some(ref cached) = *cache {
             return match cached {
                 Ok(val) => Ok(val.clone_ref(py)),
-                Err(e) => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
+                Err(msg) => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
                     "Cached error: {}",
-                    e
+                    msg
                 ))),
             };
         }
@@ -898,63 +1776,62 @@ impl AsyncHandle {
             })
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
 
-        *self.is_complete.lock() = true;
+        self.is_complete.store(true, Ordering::Release);
+
+        // Deliver any progress updates still queued before returning. The
+        // lock is released first: flush() waits on a callback lane without
+        // the GIL, and a thread in on_progress() would hold the GIL while
+        // blocked on the lock
+        let listener = self.on_progress.lock().clone();
+        if let Some(listener) = listener {
+            listener.deliver();
+            listener.flush(py);
+        }
 
-        // Cache the result and trigger callbacks
+        // Cache the result (terminal callbacks already ran on the worker)
         let mut cache = self.result_cache.lock();
         match result {
-            Ok(ref val) => {
+            Ok(val) => {
                 *cache = Some(Ok(val.clone_ref(py)));
-
-                // CRITICAL FIX: Proper callback error handling
-                if let Some(ref callback) = *self.on_complete.lock() {
-                    match callback.bind(py).call1((val.bind(py),)) {
-                        Ok(_) => {},
-                        Err(e) => {
-                            error!("on_complete callback failed: {}", e);
-                            // Don't propagate callback errors to task result
-                        }
-                    }
-                }
-
-                Ok(val.clone_ref(py))
+                Ok(val)
             }
-            Err(e) => {
-                let err_str = e.to_string();
-                *cache = Some(Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                    err_str.clone(),
-                )));
-
-                // CRITICAL FIX: Proper error callback handling
-                if let Some(ref callback) = *self.on_error.lock() {
-                    match callback.bind(py).call1((err_str.clone(),)) {
-                        Ok(_) => {},
-                        Err(e) => {
-                            error!("on_error callback failed: {}", e);
-                        }
-                    }
-                }
-
+            Err(err_str) => {
+                *cache = Some(Err(err_str.clone()));
                 Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(err_str))
             }
         }
     }
 
-    /// Wait for completion with timeout (in seconds)
-    fn wait(&self, timeout_secs: Option<f64>) -> PyResult<bool> {
-        if *self.is_complete.lock() {
+    /// Wait for completion with timeout (in seconds).
+    /// Sleeps on the completion condvar with the GIL released and returns as
+    /// soon as the task finishes; the result stays available to get().
+    fn wait(&self, py: Python, timeout_secs: Option<f64>) -> PyResult<bool> {
+        if self.is_complete.load(Ordering::Acquire) {
             return Ok(true);
         }
 
-        if let Some(secs) = timeout_secs {
-            thread::sleep(Duration::from_secs_f64(secs));
-            Ok(*self.is_complete.lock())
-        } else {
-            // Wait indefinitely by trying to receive
-            let _ = self.receiver.lock().recv();
-            *self.is_complete.lock() = true;
-            Ok(true)
+        let is_complete = &self.is_complete;
+        let deadline = deadline_from_timeout(timeout_secs);
+        Ok(py.detach(|| {
+            wait_for_completion(|| is_complete.load(Ordering::Acquire), deadline)
+        }))
+    }
+
+    /// Block until the task reports new progress or finishes (timeout in seconds).
+    /// Returns True once the task has finished and False after a progress
+    /// update or timeout, so `while not h.wait_state_change(1.0):` sees each
+    /// update as it happens instead of polling get_progress().
+    #[pyo3(signature = (timeout=None))]
+    fn wait_state_change(&self, py: Python, timeout: Option<f64>) -> bool {
+        if self.is_complete.load(Ordering::Acquire) {
+            return true;
         }
+
+        self.progress_watched.store(true, Ordering::Relaxed);
+        let tasks = [(self.is_complete.clone(), self.task_id.clone())];
+        let deadline = deadline_from_timeout(timeout);
+        py.detach(|| wait_for_state_change(&tasks, deadline));
+        self.is_complete.load(Ordering::Acquire)
     }
 
     /// Cancel the operation (non-blocking - just sets the flag)
@@ -963,7 +1840,7 @@ impl AsyncHandle {
         self.cancel_token.store(true, Ordering::Release);
 
         // Mark as complete to prevent further waits
-        *self.is_complete.lock() = true;
+        mark_complete(&self.is_complete);
 
         // Don't join the thread - that would block!
         // The thread will check the flag and exit on its own
@@ -971,26 +1848,17 @@ impl AsyncHandle {
     }
 
     /// Cancel with timeout (in seconds)
-    fn cancel_with_timeout(&self, timeout_secs: f64) -> PyResult<bool> {
+    fn cancel_with_timeout(&self, py: Python, timeout_secs: f64) -> PyResult<bool> {
         self.cancel_token.store(true, Ordering::Release);
 
-        let mut handle = self.thread_handle.lock();
-        if let Some(h) = handle.take() {
-            let start = Instant::now();
-            let timeout = Duration::from_secs_f64(timeout_secs);
-
-            // Try to join with timeout
-            while start.elapsed() < timeout {
-                if h.is_finished() {
-                    let _ = h.join();
-                    return Ok(true);
-                }
-                thread::sleep(Duration::from_millis(10));
-            }
-
-            return Ok(false); // Timeout
-        }
-        Ok(true)
+        // The worker flags worker_exited as its last step, so block on the
+        // completion condvar for that (GIL released so the worker can run).
+        // False means it was still running at the deadline.
+        let worker_exited = self.worker_exited.clone();
+        let deadline = deadline_from_timeout(Some(timeout_secs));
+        Ok(py.detach(|| {
+            wait_for_completion(|| worker_exited.load(Ordering::Acquire), deadline)
+        }))
     }
 
     /// Check if task was cancelled
@@ -1019,6 +1887,12 @@ impl AsyncHandle {
         Ok(())
     }
 
+    /// Set several metadata entries at once (one call, one lock)
+    fn set_metadata_bulk(&self, metadata: HashMap<String, String>) -> PyResult<()> {
+        self.metadata.lock().extend(metadata);
+        Ok(())
+    }
+
     /// Get metadata
     fn get_metadata(&self, key: String) -> PyResult<Option<String>> {
         Ok(self.metadata.lock().get(&key).cloned())
@@ -1039,27 +1913,46 @@ impl AsyncHandle {
         Ok(self.timeout)
     }
 
-    /// Set completion callback
-    fn on_complete(&self, callback: Py<PyAny>) -> PyResult<()> {
-        *self.on_complete.lock() = Some(callback);
+    /// Set completion callback (runs immediately if the task already succeeded)
+    fn on_complete(&self, py: Python, callback: Py<PyAny>) -> PyResult<()> {
+        let mut state = self.callbacks.lock();
+        match state.outcome {
+            Some(Ok(ref val)) => {
+                let outcome = Ok(val.clone_ref(py));
+                drop(state);
+                invoke_terminal_callback(py, &callback, &outcome);
+            }
+            Some(Err(_)) => {}
+            None => state.on_complete = Some(callback),
+        }
         Ok(())
     }
 
-    /// Set error callback
-    fn on_error(&self, callback: Py<PyAny>) -> PyResult<()> {
-        *self.on_error.lock() = Some(callback);
+    /// Set error callback (runs immediately if the task already failed)
+    fn on_error(&self, py: Python, callback: Py<PyAny>) -> PyResult<()> {
+        let mut state = self.callbacks.lock();
+        match state.outcome {
+            Some(Err(ref msg)) => {
+                let outcome = Err(msg.clone());
+                drop(state);
+                invoke_terminal_callback(py, &callback, &outcome);
+            }
+            Some(Ok(_)) => {}
+            None => state.on_error = Some(callback),
+        }
         Ok(())
     }
 
     /// Set progress callback
-    fn on_progress(&self, py: Python, callback: Py<PyAny>) -> PyResult<()> {
-        *self.on_progress.lock() = Some(callback.clone_ref(py));
-        register_progress_callback(self.task_id.clone(), callback);
+    fn on_progress(&self, callback: Py<PyAny>) -> PyResult<()> {
+        self.progress_watched.store(true, Ordering::Relaxed);
+        *self.on_progress.lock() = Some(register_progress_callback(self.task_id.clone(), callback));
         Ok(())
     }
 
     /// Get current progress (0.0 to 1.0)
     fn get_progress(&self) -> PyResult<f64> {
+        self.progress_watched.store(true, Ordering::Relaxed);
         Ok(TASK_PROGRESS_MAP
             .get(&self.task_id)
             .map(|p| *p)
@@ -1067,130 +1960,111 @@ impl AsyncHandle {
     }
 }
 
-/// Parallel function wrapper that returns AsyncHandle
-#[pyclass]
-struct ParallelWrapper {
+/// Spawn a @parallel task on its own thread and build its AsyncHandle
+fn spawn_parallel_task(
+    py: Python,
     func: Py<PyAny>,
-}
-
-#[pymethods]
-impl ParallelWrapper {
-    #[pyo3(signature = (*args, timeout=None, **kwargs))]
-    fn __call__(
-        &self,
-        py: Python,
-        args: &Bound<'_, PyTuple>,
-        timeout: Option<f64>,
-        kwargs: Option<&Bound<'_, PyDict>>,
-    ) -> PyResult<Py<AsyncHandle>> {
-        // Check if shutdown is requested
-        if is_shutdown_requested() {
-            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                "Cannot start new tasks: shutdown in progress"
-            ));
-        }
-
-        // Wait for available slot (backpressure)
-        wait_for_slot();
-
-        // Check memory before starting
-        if !check_memory_ok() {
-            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                "Memory limit reached, cannot start new task"
-            ));
-        }
-
-        // Clone function reference for the thread
-        let func = self.func.clone_ref(py);
-
-        // Generate unique task ID
-        let task_id = format!("task_{}", TASK_ID_COUNTER.fetch_add(1, Ordering::Relaxed));
-        let task_id_clone = task_id.clone();
-
-        // Register task as active
-        register_task(task_id.clone());
-
-        // Get function name for profiling
-        let func_name = func
-            .bind(py)
-            .getattr("__name__")
-            .ok()
-            .and_then(|n| n.extract::<String>().ok())
-            .unwrap_or_else(|| "unknown".to_string());
+    func_name: String,
+    args_py: Py<PyTuple>,
+    kwargs_py: Option<Py<PyDict>>,
+    timeout: Option<f64>,
+    hooks: Option<&TaskHooks>,
+) -> PyResult<AsyncHandle> {
+    // Check if shutdown is requested
+    if is_shutdown_requested() {
+        return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+            "Cannot start new tasks: shutdown in progress"
+        ));
+    }
 
-        // Convert args and kwargs to owned Python objects
-        let args_py: Py<PyTuple> = args.clone().unbind();
-        let kwargs_py: Option<Py<PyDict>> = kwargs.map(|k| k.clone().unbind());
+    // Check memory before starting
+    if !check_memory_ok() {
+        return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+            "Memory limit reached, cannot start new task"
+        ));
+    }
 
-        // Create channel for communication
-        let (sender, receiver): (Sender<PyResult<Py<PyAny>>>, Receiver<PyResult<Py<PyAny>>>) =
-            channel();
+    // Generate unique task ID
+    let task_id = format!("task_{}", TASK_ID_COUNTER.fetch_add(1, Ordering::Relaxed));
+    let task_id_clone = task_id.clone();
 
-        let is_complete = Arc::new(Mutex::new(false));
-        let is_complete_clone = is_complete.clone();
+    // Wait for available slot (backpressure) and register task as active
+    acquire_slot(py, &task_id);
 
-        let cancel_token = Arc::new(AtomicBool::new(false));
-        let cancel_token_clone = cancel_token.clone();
+    // Create channel for communication
+    let (sender, receiver): (Sender<TaskOutcome>, Receiver<TaskOutcome>) =
+        channel();
 
-        let func_name_clone = func_name.clone();
-        let start_time = Instant::now();
+    let is_complete = Arc::new(AtomicBool::new(false));
+    let is_complete_clone = is_complete.clone();
 
-        // Setup timeout if specified
-        if let Some(timeout_secs) = timeout {
-            let cancel_token_timeout = cancel_token.clone();
-            thread::spawn(move || {
-                thread::sleep(Duration::from_secs_f64(timeout_secs));
-                cancel_token_timeout.store(true, Ordering::Release);
-            });
-        }
+    let cancel_token = Arc::new(AtomicBool::new(false));
+    let cancel_token_clone = cancel_token.clone();
 
-        // Spawn Rust thread - release GIL first, then spawn thread
-        let handle = py.detach(|| {
-            thread::spawn(move || {
-                // Acquire GIL inside the thread to call Python function
-                Python::attach(|py| {
-                    let exec_start = Instant::now();
+    let func_name_clone = func_name.clone();
+    let start_time = Instant::now();
 
-                    // Set task_id in thread-local storage for progress reporting
-                    set_current_task_id(Some(task_id_clone.clone()));
+    // Setup timeout if specified
+    if let Some(timeout_secs) = timeout {
+        schedule_timeout(&cancel_token, timeout_secs);
+    }
 
-                    // Check shutdown or cancellation before execution
-                    if is_shutdown_requested() || cancel_token_clone.load(Ordering::Acquire) {
-                        let reason = if is_shutdown_requested() {
-                            "Task cancelled: shutdown requested"
-                        } else {
-                            "Task was cancelled or timed out"
-                        };
+    let worker_exited = Arc::new(AtomicBool::new(false));
+    let worker_exited_clone = worker_exited.clone();
+
+    let callbacks = SharedCallbacks::default();
+    let callbacks_clone = callbacks.clone();
+
+    let mut progress_listener = None;
+    if let Some(hooks) = hooks {
+        let mut state = callbacks.lock();
+        state.on_complete = hooks.on_complete.as_ref().map(|cb| cb.clone_ref(py));
+        state.on_error = hooks.on_error.as_ref().map(|cb| cb.clone_ref(py));
+        progress_listener = hooks
+            .on_progress
+            .as_ref()
+            .map(|cb| register_progress_callback(task_id.clone(), cb.clone_ref(py)));
+    }
+    let progress_watched = Arc::new(AtomicBool::new(progress_listener.is_some()));
+    let progress_watched_clone = progress_watched.clone();
 
-                        let task_error = TaskError {
-                            task_name: func_name_clone.clone(),
-                            elapsed_time: exec_start.elapsed().as_secs_f64(),
-                            error_message: reason.to_string(),
-                            error_type: "CancellationError".to_string(),
-                            task_id: task_id_clone.clone(),
-                        };
+    // Hand the task to a task thread - release GIL first
+    py.detach(|| {
+        spawn_task_thread(Box::new(move || {
+            let exec_start = Instant::now();
+
+            // Set task_id in thread-local storage for progress reporting
+            set_current_task_id(Some(task_id_clone.clone()));
+            set_progress_watched(Some(progress_watched_clone));
+
+            // Hold the GIL only to run the function and its terminal callback;
+            // publishing the result and cleanup below don't need it
+            let outcome = Python::attach(|py| {
+                // Check shutdown or cancellation before execution
+                let outcome = if is_shutdown_requested() || cancel_token_clone.load(Ordering::Acquire) {
+                    let reason = if is_shutdown_requested() {
+                        "Task cancelled: shutdown requested"
+                    } else {
+                        "Task was cancelled or timed out"
+                    };
 
-                        // CRITICAL FIX: Handle channel send errors
-                        if let Err(e) = sender.send(Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                            task_error.__str__()
-                        ))) {
-                            error!("Failed to send cancellation error for task {}: {}", task_id_clone, e);
-                            store_task_error(task_id_clone.clone(), format!("Cancellation failed: {}", e));
-                        }
-                        *is_complete_clone.lock() = true;
-                        unregister_task(&task_id_clone);
-                        clear_task_progress(&task_id_clone);
-                        set_current_task_id(None);
-                        return;
-                    }
+                    let task_error = TaskError {
+                        task_name: func_name_clone.clone(),
+                        elapsed_time: exec_start.elapsed().as_secs_f64(),
+                        error_message: reason.to_string(),
+                        error_type: "CancellationError".to_string(),
+                        task_id: task_id_clone.clone(),
+                    };
 
+                    Err(task_error.__str__())
+                } else {
                     let result = func
                         .bind(py)
                         .call(args_py.bind(py), kwargs_py.as_ref().map(|k| k.bind(py)));
 
                     let exec_time = exec_start.elapsed().as_secs_f64() * 1000.0; // Convert to ms
 
-                    let to_send = match result {
+                    match result {
                         Ok(val) => {
                             record_task_execution(&func_name_clone, exec_time, true);
                             Ok(val.unbind())
@@ -1211,44 +2085,93 @@ impl ParallelWrapper {
                                 task_id: task_id_clone.clone(),
                             };
 
-                            Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                                task_error.__str__()
-                            ))
+                            Err(task_error.__str__())
                         }
-                    };
-
-                    // CRITICAL FIX: Handle channel send errors
-                    if let Err(e) = sender.send(to_send) {
-                        error!("Failed to send task result for task {}: {}", task_id_clone, e);
-                        store_task_error(task_id_clone.clone(), format!("Channel send failed: {}", e));
                     }
-                    *is_complete_clone.lock() = true;
+                };
 
-                    // Cleanup: unregister task and clear progress
-                    unregister_task(&task_id_clone);
-                    clear_task_progress(&task_id_clone);
-                    set_current_task_id(None);
-                });
-            })
-        });
+                fire_terminal_callbacks(py, &callbacks_clone, &outcome);
+                outcome
+            });
 
-        // Create AsyncHandle
-        let async_handle = AsyncHandle {
-            receiver: Arc::new(Mutex::new(receiver)),
-            thread_handle: Arc::new(Mutex::new(Some(handle))),
-            is_complete,
-            result_cache: Arc::new(Mutex::new(None)),
-            cancel_token,
+            // CRITICAL FIX: Handle channel send errors
+            if let Err(e) = sender.send(outcome) {
+                error!("Failed to send task result for task {}: {}", task_id_clone, e);
+                store_task_error(task_id_clone.clone(), format!("Channel send failed: {}", e));
+            }
+            mark_complete(&is_complete_clone);
+
+            // Cleanup: unregister task and clear progress
+            unregister_task(&task_id_clone);
+            clear_task_progress(&task_id_clone);
+            set_current_task_id(None);
+            set_progress_watched(None);
+            mark_complete(&worker_exited_clone);
+        }))
+    });
+
+    // Create AsyncHandle
+    let async_handle = AsyncHandle {
+        receiver: Mutex::new(receiver),
+        worker_exited,
+        is_complete,
+        result_cache: Mutex::new(None),
+        cancel_token,
+        func_name,
+        start_time,
+        task_id,
+        metadata: Mutex::new(HashMap::new()),
+        timeout,
+        callbacks,
+        on_progress: Mutex::new(progress_listener),
+        progress_watched,
+    };
+
+    Ok(async_handle)
+}
+
+/// Get a callable's __name__ for profiling
+fn get_func_name(py: Python, func: &Py<PyAny>) -> String {
+    func.bind(py)
+        .getattr("__name__")
+        .ok()
+        .and_then(|n| n.extract::<String>().ok())
+        .unwrap_or_else(|| "unknown".to_string())
+}
+
+/// Parallel function wrapper that returns AsyncHandle
+#[pyclass]
+struct ParallelWrapper {
+    func: Py<PyAny>,
+    hooks: Arc<TaskHooks>,
+}
+
+#[pymethods]
+impl ParallelWrapper {
+    #[pyo3(signature = (*args, timeout=None, **kwargs))]
+    fn __call__(
+        &self,
+        py: Python,
+        args: &Bound<'_, PyTuple>,
+        timeout: Option<f64>,
+        kwargs: Option<&Bound<'_, PyDict>>,
+    ) -> PyResult<Py<AsyncHandle>> {
+        let func = self.func.clone_ref(py);
+        let func_name = get_func_name(py, &func);
+
+        // Convert args and kwargs to owned Python objects
+        let args_py: Py<PyTuple> = args.clone().unbind();
+        let kwargs_py: Option<Py<PyDict>> = kwargs.map(|k| k.clone().unbind());
+
+        let async_handle = spawn_parallel_task(
+            py,
+            func,
             func_name,
-            start_time,
-            task_id,
-            metadata: Arc::new(Mutex::new(HashMap::new())),
+            args_py,
+            kwargs_py,
             timeout,
-            on_complete: Arc::new(Mutex::new(None)),
-            on_error: Arc::new(Mutex::new(None)),
-            on_progress: Arc::new(Mutex::new(None)),
-        };
-
+            Some(&self.hooks),
+        )?;
         Py::new(py, async_handle)
     }
 
@@ -1265,18 +2188,141 @@ impl ParallelWrapper {
         }
 
         // Bound method access - create a new ParallelWrapper with bound function
-        let functools = py.import("functools")?;
-        let partial = functools.getattr("partial")?;
+        let partial = functools_partial(py)?;
         let bound_func = partial.call1((slf.func.bind(py), obj))?.unbind();
 
-        Py::new(py, ParallelWrapper { func: bound_func }).map(|p| p.into())
+        let wrapper = ParallelWrapper {
+            func: bound_func,
+            hooks: slf.hooks.clone(),
+        };
+        Py::new(py, wrapper).map(|p| p.into())
+    }
+}
+
+/// A function compiled with numba.njit(nogil=True) for @parallel(jit=True).
+/// Falls back to the original function, with a warning, the first time
+/// numba can't compile it.
+#[pyclass]
+struct JitFunction {
+    kernel: Py<PyAny>,
+    original: Py<PyAny>,
+    numba_error: Py<PyAny>,
+    fallback: AtomicBool,
+}
+
+#[pymethods]
+impl JitFunction {
+    #[pyo3(signature = (*args, **kwargs))]
+    fn __call__(
+        &self,
+        py: Python,
+        args: &Bound<'_, PyTuple>,
+        kwargs: Option<&Bound<'_, PyDict>>,
+    ) -> PyResult<Py<PyAny>> {
+        if !self.fallback.load(Ordering::Relaxed) {
+            match self.kernel.bind(py).call(args, kwargs) {
+                Ok(result) => return Ok(result.unbind()),
+                Err(e) if e.is_instance(py, self.numba_error.bind(py)) => {
+                    if !self.fallback.swap(true, Ordering::Relaxed) {
+                        let message = CString::new(format!(
+                            "numba could not compile {}, running it as Python: {}",
+                            get_func_name(py, &self.original),
+                            e
+                        ))
+                        .unwrap_or_default();
+                        PyErr::warn(py, &py.get_type::<PyRuntimeWarning>(), &message, 1)?;
+                    }
+                }
+                Err(e) => return Err(e),
+            }
+        }
+        self.original
+            .bind(py)
+            .call(args, kwargs)
+            .map(|r| r.unbind())
+    }
+
+    /// Attributes like __name__ come from the original function
+    fn __getattr__(&self, py: Python, name: &str) -> PyResult<Py<PyAny>> {
+        self.original.getattr(py, name)
     }
 }
 
-/// Decorator to run functions in parallel Rust threads without GIL
+/// Compile func with numba for @parallel(jit=True), or return it unchanged
+/// (with a warning) when numba isn't installed
+fn jit_compile(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
+    let numba = match py.import("numba") {
+        Ok(numba) => numba,
+        Err(_) => {
+            PyErr::warn(
+                py,
+                &py.get_type::<PyRuntimeWarning>(),
+                c"@parallel(jit=True) needs numba; running the function as Python",
+                1,
+            )?;
+            return Ok(func);
+        }
+    };
+
+    let options = PyDict::new(py);
+    options.set_item("nogil", true)?;
+    options.set_item("cache", true)?;
+    let kernel = numba.call_method("njit", (), Some(&options))?.call1((func.bind(py),))?;
+    let numba_error = py.import("numba.core.errors")?.getattr("NumbaError")?;
+
+    let jit = JitFunction {
+        kernel: kernel.unbind(),
+        original: func,
+        numba_error: numba_error.unbind(),
+        fallback: AtomicBool::new(false),
+    };
+    Ok(Py::new(py, jit)?.into_any())
+}
+
+/// Decorator to run functions in parallel Rust threads without GIL.
+/// `@parallel(jit=True)` also compiles the function with numba.njit(nogil=True),
+/// so numeric kernels run compiled and without holding the GIL.
+/// on_complete / on_error / on_progress are attached to every call's handle
+/// before the task starts.
 #[pyfunction]
-fn parallel(py: Python, func: Py<PyAny>) -> PyResult<Py<ParallelWrapper>> {
-    Py::new(py, ParallelWrapper { func })
+#[pyo3(signature = (func=None, *, jit=false, on_complete=None, on_error=None, on_progress=None))]
+fn parallel(
+    py: Python,
+    func: Option<Py<PyAny>>,
+    jit: bool,
+    on_complete: Option<Py<PyAny>>,
+    on_error: Option<Py<PyAny>>,
+    on_progress: Option<Py<PyAny>>,
+) -> PyResult<Py<PyAny>> {
+    let hooks = Arc::new(TaskHooks {
+        on_complete,
+        on_error,
+        on_progress,
+    });
+    let wrap = move |py: Python, func: Py<PyAny>| -> PyResult<Py<PyAny>> {
+        let func = if jit { jit_compile(py, func)? } else { func };
+        let wrapper = ParallelWrapper {
+            func,
+            hooks: hooks.clone(),
+        };
+        Ok(Py::new(py, wrapper)?.into_any())
+    };
+
+    match func {
+        Some(func) => wrap(py, func),
+        // Called with options only, as @parallel(jit=True): return the decorator
+        None => {
+            let decorator = PyCFunction::new_closure(
+                py,
+                None,
+                None,
+                move |args: &Bound<'_, PyTuple>, _kwargs: Option<&Bound<'_, PyDict>>| -> PyResult<Py<PyAny>> {
+                    wrap(args.py(), args.get_item(0)?.unbind())
+                },
+            )?;
+            Ok(decorator.into_any().unbind())
+        }
+    }
 }
 
 // =============================================================================
@@ -1284,17 +2330,17 @@ fn parallel(py: Python, func: Py<PyAny>) -> PyResult<Py<ParallelWrapper>> {
 // =============================================================================
 
 /// Optimized AsyncHandle using crossbeam channels (lock-free, better performance)
-#[pyclass]
+#[pyclass(frozen, freelist = 256)]
 struct AsyncHandleFast {
     receiver: Arc<Mutex<CrossbeamReceiver<PyResult<Py<PyAny>>>>>,
-    is_complete: Arc<Mutex<bool>>,
+    is_complete: Arc<AtomicBool>,
     result_cache: Arc<Mutex<Option<PyResult<Py<PyAny>>>>>,
 }
 
 #[pymethods]
 impl AsyncHandleFast {
     fn is_ready(&self) -> PyResult<bool> {
-        Ok(*self.is_complete.lock())
+        Ok(self.is_complete.load(Ordering::Acquire))
     }
 
     fn try_get(&self, py: Python) -> PyResult<Option<Py<PyAny>>> {
@@ -1312,7 +2358,7 @@ impl AsyncHandleFast {
         let receiver = self.receiver.lock();
         match receiver.try_recv() {
             Ok(result) => {
-                *self.is_complete.lock() = true;
+                self.is_complete.store(true, Ordering::Release);
                 match result {
                     Ok(val) => {
                         *cache = Some(Ok(val.clone_ref(py)));
@@ -1351,7 +2397,7 @@ impl AsyncHandleFast {
             })
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
 
-        *self.is_complete.lock() = true;
+        self.is_complete.store(true, Ordering::Release);
 
         let mut cache = self.result_cache.lock();
         match result {
@@ -1374,52 +2420,127 @@ impl AsyncHandleFast {
 // TASK DEPENDENCY SYSTEM
 // =============================================================================
 
-/// Wait for dependencies to complete
-fn wait_for_dependencies(dependencies: &[String]) -> PyResult<Vec<Py<PyAny>>> {
-    let mut results = Vec::new();
+/// The body of a @parallel_with_deps task
+type DagTask = Box<dyn FnOnce() + Send>;
 
-    for dep_id in dependencies {
-        // Wait for dependency result to be available
-        let mut attempts = 0;
-        let max_attempts = 6000; // 10 minutes max wait
+/// A @parallel_with_deps task parked until all of its parents finish
+struct DagNode {
+    waiting_on: AtomicUsize,
+    task: Mutex<Option<DagTask>>,
+}
 
-        loop {
-            // CRITICAL FIX: Check shutdown flag
-            if is_shutdown_requested() {
-                warn!("Dependency wait cancelled: shutdown in progress");
-                return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                    "Dependency wait cancelled: shutdown in progress"
-                ));
-            }
+impl DagNode {
+    /// One parent finished; returns the task once the last one has
+    fn parent_done(&self) -> Option<DagTask> {
+        if self.waiting_on.fetch_sub(1, Ordering::AcqRel) == 1 {
+            self.task.lock().take()
+        } else {
+            None
+        }
+    }
+}
 
-            // CRITICAL FIX: Check for task failures via error storage
-            if let Some(error) = TASK_ERRORS.get(dep_id) {
-                error!("Dependency {} failed: {}", dep_id, error.value());
-                return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                    format!("Dependency {} failed: {}", dep_id, error.value())
-                ));
-            }
+thread_local! {
+    /// Dependents made ready by the task that just ran on this thread
+    static DAG_READY: RefCell<Vec<DagTask>> = RefCell::new(Vec::new());
+}
 
-            if let Some(result) = TASK_RESULTS.get(dep_id) {
-                Python::attach(|py| {
-                    results.push(result.clone_ref(py));
-                });
-                break;
-            }
+/// Take the dependents the finished task made ready: all but the first get
+/// their own thread, the first is returned to run inline on this one
+fn take_ready_dependents() -> Option<DagTask> {
+    let mut ready = DAG_READY.with(|r| std::mem::take(&mut *r.borrow_mut())).into_iter();
+    let inline = ready.next();
+    for task in ready {
+        spawn_dag_task(task);
+    }
+    inline
+}
 
-            if attempts >= max_attempts {
-                error!("Dependency {} timed out after 10 minutes", dep_id);
-                return Err(PyErr::new::<pyo3::exceptions::PyTimeoutError, _>(
-                    format!("Dependency {} timed out after 10 minutes", dep_id)
-                ));
-            }
+/// Run a dependency task on a task thread. That thread then keeps running
+/// whatever becomes ready next, so a linear chain runs start to finish on
+/// one thread with no hand-offs.
+fn spawn_dag_task(task: DagTask) {
+    spawn_task_thread(Box::new(move || {
+        let mut next = Some(task);
+        while let Some(task) = next.take() {
+            task();
+            next = take_ready_dependents();
+        }
+    }));
+}
+
+/// Unfinished @parallel_with_deps tasks and the tasks waiting on them.
+/// A task's entry is removed (and its dependents notified) only after its
+/// outcome is stored in TASK_RESULTS / TASK_ERRORS.
+static DAG_DEPENDENTS: Lazy<DashMap<String, Vec<Arc<DagNode>>>> = Lazy::new(DashMap::new);
+
+/// Check that every dependency is a @parallel_with_deps task (internal)
+fn check_dependencies(dependencies: &[String]) -> PyResult<()> {
+    for dep_id in dependencies {
+        let known = DAG_DEPENDENTS.contains_key(dep_id)
+            || TASK_RESULTS.contains_key(dep_id)
+            || TASK_ERRORS.contains_key(dep_id);
+        if !known {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Dependency {} is not a @parallel_with_deps task",
+                dep_id
+            )));
+        }
+    }
+    Ok(())
+}
 
-            thread::sleep(Duration::from_millis(100));
-            attempts += 1;
+/// Run `task` once every dependency has finished. No thread is held while
+/// waiting: the worker of the last parent to finish picks the task up.
+fn schedule_after_dependencies(dependencies: &[String], task: DagTask) {
+    // One extra count guards against launching before registration is done
+    let node = Arc::new(DagNode {
+        waiting_on: AtomicUsize::new(dependencies.len() + 1),
+        task: Mutex::new(Some(task)),
+    });
+
+    for dep_id in dependencies {
+        match DAG_DEPENDENTS.get_mut(dep_id) {
+            Some(mut dependents) => dependents.push(node.clone()),
+            None => {
+                // Already finished; the guard count keeps this from firing
+                let _ = node.parent_done();
+            }
         }
     }
+    if let Some(task) = node.parent_done() {
+        spawn_dag_task(task);
+    }
+}
+
+/// Record a dependency task's outcome and wake the tasks waiting on it
+fn finish_dependency(py: Python, task_id: &str, outcome: &TaskOutcome) {
+    match outcome {
+        Ok(val) => store_task_result(task_id.to_string(), val.clone_ref(py)),
+        Err(msg) => store_task_error(task_id.to_string(), msg.clone()),
+    }
+    // Ready dependents run on this worker once the current task is done
+    if let Some((_, dependents)) = DAG_DEPENDENTS.remove(task_id) {
+        let ready: Vec<DagTask> = dependents.iter().filter_map(|node| node.parent_done()).collect();
+        DAG_READY.with(|r| r.borrow_mut().extend(ready));
+    }
+}
 
-    Ok(results)
+/// Collect the results of finished dependencies, in order
+fn collect_dependency_results(py: Python, dependencies: &[String]) -> Result<Vec<Py<PyAny>>, String> {
+    dependencies
+        .iter()
+        .map(|dep_id| {
+            if let Some(error) = TASK_ERRORS.get(dep_id) {
+                error!("Dependency {} failed: {}", dep_id, error.value());
+                return Err(format!("Dependency {} failed: {}", dep_id, error.value()));
+            }
+            TASK_RESULTS
+                .get(dep_id)
+                .map(|result| result.clone_ref(py))
+                .ok_or_else(|| format!("Dependency {} finished without a result", dep_id))
+        })
+        .collect()
 }
 
 /// Store task result for dependencies
@@ -1442,6 +2563,83 @@ fn clear_task_error(task_id: &str) {
     TASK_ERRORS.remove(task_id);
 }
 
+/// Where a handle passed as an argument sits in the call (internal)
+enum ArgSlot {
+    Positional(usize),
+    Keyword(Py<PyAny>),
+}
+
+/// Handle arguments to replace with their task's result, and the task ids
+/// they wait on, in the same order
+#[derive(Default)]
+struct HandleArgs {
+    slots: Vec<ArgSlot>,
+    dep_ids: Vec<String>,
+}
+
+impl HandleArgs {
+    /// Find the handles among args and kwargs in one walk. Like depends_on,
+    /// they must come from @parallel_with_deps tasks; submit_with_deps checks
+    /// the task ids, and @parallel_fast handles are rejected here.
+    fn scan(args: &Bound<'_, PyTuple>, kwargs: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+        fn dependency_id(value: &Bound<'_, PyAny>) -> PyResult<Option<String>> {
+            if let Ok(handle) = value.extract::<PyRef<'_, AsyncHandle>>() {
+                return Ok(Some(handle.task_id.clone()));
+            }
+            if value.is_instance_of::<AsyncHandleFast>() {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "Handle arguments must come from @parallel_with_deps tasks"
+                ));
+            }
+            Ok(None)
+        }
+
+        let mut found = HandleArgs::default();
+        for (i, arg) in args.iter().enumerate() {
+            if let Some(dep_id) = dependency_id(&arg)? {
+                found.slots.push(ArgSlot::Positional(i));
+                found.dep_ids.push(dep_id);
+            }
+        }
+        if let Some(kwargs) = kwargs {
+            for (key, value) in kwargs.iter() {
+                if let Some(dep_id) = dependency_id(&value)? {
+                    found.slots.push(ArgSlot::Keyword(key.unbind()));
+                    found.dep_ids.push(dep_id);
+                }
+            }
+        }
+        Ok(found)
+    }
+
+    /// Build the call's args and kwargs with each handle replaced by its result
+    fn fill<'py>(
+        &self,
+        py: Python<'py>,
+        args: &Py<PyTuple>,
+        kwargs: Option<&Py<PyDict>>,
+        results: Vec<Py<PyAny>>,
+    ) -> PyResult<(Bound<'py, PyTuple>, Option<Bound<'py, PyDict>>)> {
+        if self.slots.is_empty() {
+            return Ok((args.bind(py).clone(), kwargs.map(|k| k.bind(py).clone())));
+        }
+
+        let mut positional: Vec<Bound<'py, PyAny>> = args.bind(py).iter().collect();
+        let keywords = kwargs.map(|k| k.bind(py).copy()).transpose()?;
+        for (slot, result) in self.slots.iter().zip(results) {
+            match slot {
+                ArgSlot::Positional(i) => positional[*i] = result.into_bound(py),
+                ArgSlot::Keyword(key) => {
+                    if let Some(keywords) = &keywords {
+                        keywords.set_item(key.bind(py), result)?;
+                    }
+                }
+            }
+        }
+        Ok((PyTuple::new(py, positional)?, keywords))
+    }
+}
+
 /// Parallel wrapper with dependency support
 #[pyclass]
 struct ParallelWithDeps {
@@ -1468,199 +2666,574 @@ impl ParallelWithDeps {
             Vec::new()
         };
 
-        // Check if shutdown is requested
-        if is_shutdown_requested() {
-            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                "Cannot start new tasks: shutdown in progress"
-            ));
-        }
+        // Handles passed as arguments are dependencies too, and are
+        // replaced by their results when the task starts
+        let handle_args = HandleArgs::scan(args, kwargs)?;
 
-        wait_for_slot();
+        submit_with_deps(
+            py,
+            self.func.clone_ref(py),
+            args.clone().unbind(),
+            kwargs.map(|k| k.clone().unbind()),
+            dep_ids,
+            handle_args,
+            timeout,
+        )
+    }
+}
 
-        if !check_memory_ok() {
-            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                "Memory limit reached, cannot start new task"
-            ));
-        }
+/// Start a dependency-aware task once every task in dep_ids and every
+/// handle argument has finished.
+/// Shared by @parallel_with_deps and TaskGraph.submit_all().
+fn submit_with_deps(
+    py: Python,
+    func: Py<PyAny>,
+    args_py: Py<PyTuple>,
+    kwargs_py: Option<Py<PyDict>>,
+    dep_ids: Vec<String>,
+    handle_args: HandleArgs,
+    timeout: Option<f64>,
+) -> PyResult<Py<AsyncHandle>> {
+    // Check if shutdown is requested
+    if is_shutdown_requested() {
+        return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+            "Cannot start new tasks: shutdown in progress"
+        ));
+    }
 
-        let func = self.func.clone_ref(py);
-        let task_id = format!("task_{}", TASK_ID_COUNTER.fetch_add(1, Ordering::Relaxed));
-        let task_id_clone = task_id.clone();
+    if !check_memory_ok() {
+        return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+            "Memory limit reached, cannot start new task"
+        ));
+    }
 
-        // Register dependencies
-        if !dep_ids.is_empty() {
-            TASK_DEPENDENCIES.insert(task_id.clone(), dep_ids.clone());
-        }
+    // depends_on results come first as a tuple; handle arguments' results
+    // are put back where the handles were
+    let depends_on_count = dep_ids.len();
+    let mut dep_ids = dep_ids;
+    dep_ids.extend(handle_args.dep_ids.iter().cloned());
 
-        register_task(task_id.clone());
+    check_dependencies(&dep_ids)?;
 
-        let func_name = func
-            .bind(py)
-            .getattr("__name__")
-            .ok()
-            .and_then(|n| n.extract::<String>().ok())
-            .unwrap_or_else(|| "unknown".to_string());
+    let task_id = format!("task_{}", TASK_ID_COUNTER.fetch_add(1, Ordering::Relaxed));
+    let task_id_clone = task_id.clone();
 
-        let args_py: Py<PyTuple> = args.clone().unbind();
-        let kwargs_py: Option<Py<PyDict>> = kwargs.map(|k| k.clone().unbind());
+    // Register dependencies, and this task as a possible parent
+    if !dep_ids.is_empty() {
+        TASK_DEPENDENCIES.insert(task_id.clone(), dep_ids.clone());
+    }
+    DAG_DEPENDENTS.insert(task_id.clone(), Vec::new());
 
-        let (sender, receiver): (Sender<PyResult<Py<PyAny>>>, Receiver<PyResult<Py<PyAny>>>) =
-            channel();
+    acquire_slot(py, &task_id);
 
-        let is_complete = Arc::new(Mutex::new(false));
-        let is_complete_clone = is_complete.clone();
+    let func_name = func
+        .bind(py)
+        .getattr("__name__")
+        .ok()
+        .and_then(|n| n.extract::<String>().ok())
+        .unwrap_or_else(|| "unknown".to_string());
 
-        let cancel_token = Arc::new(AtomicBool::new(false));
-        let cancel_token_clone = cancel_token.clone();
+    let (sender, receiver): (Sender<TaskOutcome>, Receiver<TaskOutcome>) =
+        channel();
 
-        let func_name_clone = func_name.clone();
-        let start_time = Instant::now();
+    let is_complete = Arc::new(AtomicBool::new(false));
+    let is_complete_clone = is_complete.clone();
 
-        if let Some(timeout_secs) = timeout {
-            let cancel_token_timeout = cancel_token.clone();
-            thread::spawn(move || {
-                thread::sleep(Duration::from_secs_f64(timeout_secs));
-                cancel_token_timeout.store(true, Ordering::Release);
-            });
-        }
+    let cancel_token = Arc::new(AtomicBool::new(false));
+    let cancel_token_clone = cancel_token.clone();
 
-        let handle = py.detach(|| {
-            thread::spawn(move || {
-                Python::attach(|py| {
-                    let exec_start = Instant::now();
-                    set_current_task_id(Some(task_id_clone.clone()));
+    let func_name_clone = func_name.clone();
+    let start_time = Instant::now();
 
-                    // Wait for dependencies first
-                    let dep_results = if !dep_ids.is_empty() {
-                        match wait_for_dependencies(&dep_ids) {
-                            Ok(results) => results,
-                            Err(e) => {
-                                // CRITICAL FIX: Handle channel send errors
-                                if let Err(send_err) = sender.send(Err(e)) {
-                                    error!("Failed to send dependency error for task {}: {}", task_id_clone, send_err);
-                                    store_task_error(task_id_clone.clone(), format!("Dependency wait failed: {}", send_err));
-                                }
-                                *is_complete_clone.lock() = true;
-                                unregister_task(&task_id_clone);
-                                clear_task_progress(&task_id_clone);
-                                set_current_task_id(None);
-                                return;
-                            }
-                        }
+    if let Some(timeout_secs) = timeout {
+        schedule_timeout(&cancel_token, timeout_secs);
+    }
+
+    let worker_exited = Arc::new(AtomicBool::new(false));
+    let worker_exited_clone = worker_exited.clone();
+
+    let callbacks = SharedCallbacks::default();
+    let callbacks_clone = callbacks.clone();
+
+    // Only launched once every dependency has finished, so the results
+    // are already stored when the worker starts
+    let progress_watched = Arc::new(AtomicBool::new(false));
+    let progress_watched_clone = progress_watched.clone();
+
+    let dep_ids_clone = dep_ids.clone();
+    let run = move || {
+        let exec_start = Instant::now();
+        set_current_task_id(Some(task_id_clone.clone()));
+        set_progress_watched(Some(progress_watched_clone));
+
+        // Hold the GIL only to run the function, record its outcome for
+        // dependents and fire its terminal callback
+        let outcome = Python::attach(|py| {
+            let outcome = match collect_dependency_results(py, &dep_ids_clone) {
+                Err(e) => Err(e),
+                Ok(_) if is_shutdown_requested() || cancel_token_clone.load(Ordering::Acquire) => {
+                    let reason = if is_shutdown_requested() {
+                        "Task cancelled: shutdown requested"
                     } else {
-                        Vec::new()
+                        "Task was cancelled or timed out"
+                    };
+
+                    let task_error = TaskError {
+                        task_name: func_name_clone.clone(),
+                        elapsed_time: exec_start.elapsed().as_secs_f64(),
+                        error_message: reason.to_string(),
+                        error_type: "CancellationError".to_string(),
+                        task_id: task_id_clone.clone(),
                     };
 
-                    if is_shutdown_requested() || cancel_token_clone.load(Ordering::Acquire) {
-                        let reason = if is_shutdown_requested() {
-                            "Task cancelled: shutdown requested"
-                        } else {
-                            "Task was cancelled or timed out"
-                        };
+                    Err(task_error.__str__())
+                }
+                Ok(mut dep_results) => {
+                    // If we have depends_on, pass their results as first argument.
+                    // The results are the parents' own objects (a refcount bump
+                    // each), so a parent feeding several dependents is never copied.
+                    let arg_results = dep_results.split_off(depends_on_count);
+                    let final_result = handle_args
+                        .fill(py, &args_py, kwargs_py.as_ref(), arg_results)
+                        .and_then(|(args, kwargs)| {
+                            if !dep_results.is_empty() {
+                                // Create new tuple with dependency results + original args
+                                let dep_tuple = PyTuple::new(py, dep_results)?.into_any();
+                                let combined_args: Vec<_> = std::iter::once(dep_tuple).chain(args.iter()).collect();
+                                let new_tuple = PyTuple::new(py, combined_args)?;
+                                func.bind(py).call(new_tuple, kwargs.as_ref())
+                            } else {
+                                func.bind(py).call(args, kwargs.as_ref())
+                            }
+                        });
+
+                    let exec_time = exec_start.elapsed().as_secs_f64() * 1000.0;
+
+                    match final_result {
+                        Ok(val) => {
+                            record_task_execution(&func_name_clone, exec_time, true);
+                            Ok(val.unbind())
+                        }
+                        Err(e) => {
+                            record_task_execution(&func_name_clone, exec_time, false);
+
+                            let error_type = e.get_type(py).name()
+                                .map(|n| n.to_string())
+                                .unwrap_or_else(|_| "UnknownError".to_string());
+
+                            let task_error = TaskError {
+                                task_name: func_name_clone.clone(),
+                                elapsed_time: exec_start.elapsed().as_secs_f64(),
+                                error_message: e.to_string(),
+                                error_type,
+                                task_id: task_id_clone.clone(),
+                            };
+
+                            Err(task_error.__str__())
+                        }
+                    }
+                }
+            };
+
+            finish_dependency(py, &task_id_clone, &outcome);
+            fire_terminal_callbacks(py, &callbacks_clone, &outcome);
+            outcome
+        });
+
+        // The handle may already be gone; dependents read the outcome
+        // finish_dependency stored, so a failed send changes nothing
+        let _ = sender.send(outcome);
+        mark_complete(&is_complete_clone);
+
+        unregister_task(&task_id_clone);
+        clear_task_progress(&task_id_clone);
+        TASK_DEPENDENCIES.remove(&task_id_clone);
+        set_current_task_id(None);
+        set_progress_watched(None);
+        mark_complete(&worker_exited_clone);
+    };
+
+    // Tasks still waiting on a parent hold no thread; the parent that
+    // finishes last picks them up
+    if dep_ids.is_empty() {
+        py.detach(|| spawn_dag_task(Box::new(run)));
+    } else {
+        schedule_after_dependencies(&dep_ids, Box::new(run));
+    }
+
+    let async_handle = AsyncHandle {
+        receiver: Mutex::new(receiver),
+        worker_exited,
+        is_complete,
+        result_cache: Mutex::new(None),
+        cancel_token,
+        func_name,
+        start_time,
+        task_id,
+        metadata: Mutex::new(HashMap::new()),
+        timeout,
+        callbacks,
+        on_progress: Mutex::new(None),
+        progress_watched,
+    };
+
+    Py::new(py, async_handle)
+}
+
+/// Decorator for parallel execution with dependency support
+#[pyfunction]
+fn parallel_with_deps(py: Python, func: Py<PyAny>) -> PyResult<Py<ParallelWithDeps>> {
+    Py::new(py, ParallelWithDeps { func })
+}
+
+/// A task added to a TaskGraph; refers to its AsyncHandle once the graph is submitted
+#[pyclass]
+struct TaskNode {
+    handle: Arc<OnceLock<Py<AsyncHandle>>>,
+}
+
+#[pymethods]
+impl TaskNode {
+    /// The task's AsyncHandle (available after submit_all())
+    #[getter]
+    fn handle(&self, py: Python) -> PyResult<Py<AsyncHandle>> {
+        self.handle
+            .get()
+            .map(|handle| handle.clone_ref(py))
+            .ok_or_else(|| {
+                PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                    "TaskGraph has not been submitted yet"
+                )
+            })
+    }
+
+    /// Wait for the task and return its result, like AsyncHandle.get()
+    fn get(&self, py: Python) -> PyResult<Py<PyAny>> {
+        self.handle(py)?.borrow(py).get(py)
+    }
+}
+
+/// A task recorded by TaskGraph.add(), waiting for submit_all()
+struct GraphTask {
+    func: Py<PyAny>,
+    args: Py<PyTuple>,
+    kwargs: Option<Py<PyDict>>,
+    deps: Vec<usize>,
+    timeout: Option<f64>,
+    handle: Arc<OnceLock<Py<AsyncHandle>>>,
+}
+
+/// Builder for a graph of dependent tasks, submitted in one call.
+/// Tasks take their dependency results first, like @parallel_with_deps, and
+/// can only depend on tasks added before them, so the graph is acyclic and
+/// insertion order is already a valid submission order.
+#[pyclass]
+struct TaskGraph {
+    tasks: Vec<GraphTask>,
+    submitted: bool,
+}
+
+#[pymethods]
+impl TaskGraph {
+    #[new]
+    fn new() -> Self {
+        TaskGraph {
+            tasks: Vec::new(),
+            submitted: false,
+        }
+    }
+
+    /// Add func(*args, **kwargs) to the graph, to run after depends_on
+    #[pyo3(signature = (func, *args, depends_on=None, timeout=None, **kwargs))]
+    fn add(
+        &mut self,
+        py: Python,
+        func: Py<PyAny>,
+        args: &Bound<'_, PyTuple>,
+        depends_on: Option<Vec<PyRef<'_, TaskNode>>>,
+        timeout: Option<f64>,
+        kwargs: Option<&Bound<'_, PyDict>>,
+    ) -> PyResult<Py<TaskNode>> {
+        if self.submitted {
+            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                "TaskGraph has already been submitted"
+            ));
+        }
+
+        let deps = depends_on
+            .unwrap_or_default()
+            .iter()
+            .map(|node| {
+                self.tasks
+                    .iter()
+                    .position(|task| Arc::ptr_eq(&task.handle, &node.handle))
+                    .ok_or_else(|| {
+                        PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                            "depends_on must contain tasks added to this graph"
+                        )
+                    })
+            })
+            .collect::<PyResult<Vec<usize>>>()?;
 
-                        let task_error = TaskError {
-                            task_name: func_name_clone.clone(),
-                            elapsed_time: exec_start.elapsed().as_secs_f64(),
-                            error_message: reason.to_string(),
-                            error_type: "CancellationError".to_string(),
-                            task_id: task_id_clone.clone(),
-                        };
+        // Decorated functions are called directly; the graph does the scheduling
+        let func = undecorated(py, func);
+        let func = match func.bind(py).extract::<PyRef<'_, ParallelWithDeps>>() {
+            Ok(wrapper) => wrapper.func.clone_ref(py),
+            Err(_) => func,
+        };
 
-                        // CRITICAL FIX: Handle channel send errors
-                        if let Err(e) = sender.send(Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                            task_error.__str__()
-                        ))) {
-                            error!("Failed to send cancellation error for task {}: {}", task_id_clone, e);
-                            store_task_error(task_id_clone.clone(), format!("Cancellation failed: {}", e));
-                        }
-                        *is_complete_clone.lock() = true;
-                        unregister_task(&task_id_clone);
-                        clear_task_progress(&task_id_clone);
-                        set_current_task_id(None);
-                        return;
-                    }
+        let handle = Arc::new(OnceLock::new());
+        self.tasks.push(GraphTask {
+            func,
+            args: args.clone().unbind(),
+            kwargs: kwargs.map(|k| k.clone().unbind()),
+            deps,
+            timeout,
+            handle: handle.clone(),
+        });
+        Py::new(py, TaskNode { handle })
+    }
 
-                    // If we have dependencies, pass their results as first argument
-                    let final_result = if !dep_results.is_empty() {
-                        // Create new tuple with dependency results + original args
-                        let dep_tuple = PyTuple::new(py, dep_results.iter().map(|r| r.bind(py))).unwrap();
-                        let mut combined_args = vec![dep_tuple.into_any().unbind()];
+    /// Submit every task, returning their handles in the order they were added.
+    /// Tasks without dependencies start immediately; the rest are started by
+    /// their last dependency to finish.
+    fn submit_all(&mut self, py: Python) -> PyResult<Vec<Py<AsyncHandle>>> {
+        if self.submitted {
+            return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                "TaskGraph has already been submitted"
+            ));
+        }
+        self.submitted = true;
+
+        let mut handles: Vec<Py<AsyncHandle>> = Vec::with_capacity(self.tasks.len());
+        for task in &self.tasks {
+            let dep_ids = task
+                .deps
+                .iter()
+                .map(|&dep| handles[dep].borrow(py).task_id.clone())
+                .collect();
+            let handle = submit_with_deps(
+                py,
+                task.func.clone_ref(py),
+                task.args.clone_ref(py),
+                task.kwargs.as_ref().map(|k| k.clone_ref(py)),
+                dep_ids,
+                HandleArgs::default(),
+                task.timeout,
+            )?;
+            let _ = task.handle.set(handle.clone_ref(py));
+            handles.push(handle);
+        }
+        Ok(handles)
+    }
 
-                        for arg in args_py.bind(py).iter() {
-                            combined_args.push(arg.unbind());
-                        }
+    fn __len__(&self) -> usize {
+        self.tasks.len()
+    }
+}
 
-                        let new_tuple = PyTuple::new(py, combined_args.iter().map(|a| a.bind(py))).unwrap();
-                        func.bind(py).call(new_tuple, kwargs_py.as_ref().map(|k| k.bind(py)))
-                    } else {
-                        func.bind(py).call(args_py.bind(py), kwargs_py.as_ref().map(|k| k.bind(py)))
-                    };
+/// A node of a compiled DAG: its function and the indices of its dependencies
+struct CompiledNode {
+    name: String,
+    func: Py<PyAny>,
+    deps: Vec<usize>,
+}
 
-                    let exec_time = exec_start.elapsed().as_secs_f64() * 1000.0;
+/// A dependency graph whose topology is resolved once by compile_dag.
+/// Nodes are grouped into waves that only depend on earlier waves, so each
+/// run() executes one wave at a time, in parallel, with no per-run graph
+/// construction or dependency bookkeeping.
+#[pyclass]
+struct CompiledDag {
+    nodes: Vec<CompiledNode>,
+    waves: Vec<Vec<usize>>,
+}
 
-                    let to_send = match final_result {
-                        Ok(val) => {
-                            record_task_execution(&func_name_clone, exec_time, true);
-                            let unbound = val.unbind();
-                            store_task_result(task_id_clone.clone(), unbound.clone_ref(py));
-                            Ok(unbound)
-                        }
-                        Err(e) => {
-                            record_task_execution(&func_name_clone, exec_time, false);
+impl CompiledDag {
+    /// Call one node with its dependency results (as the first argument, like
+    /// @parallel_with_deps) followed by its inputs
+    fn call_node(
+        &self,
+        py: Python,
+        idx: usize,
+        results: &[Option<Py<PyAny>>],
+        inputs: &[Py<PyAny>],
+    ) -> PyResult<Py<PyAny>> {
+        let node = &self.nodes[idx];
+        let mut call_args = Vec::with_capacity(inputs.len() + 1);
+        if !node.deps.is_empty() {
+            let deps = node.deps.iter().map(|&dep| {
+                results[dep]
+                    .as_ref()
+                    .expect("dependency runs in an earlier wave")
+                    .bind(py)
+            });
+            call_args.push(PyTuple::new(py, deps)?.into_any());
+        }
+        call_args.extend(inputs.iter().map(|input| input.bind(py).clone()));
+        node.func
+            .bind(py)
+            .call1(PyTuple::new(py, call_args)?)
+            .map(|r| r.unbind())
+    }
+}
 
-                            let error_type = e.get_type(py).name()
-                                .map(|n| n.to_string())
-                                .unwrap_or_else(|_| "UnknownError".to_string());
+#[pymethods]
+impl CompiledDag {
+    /// Run the graph once and return {name: result}.
+    /// inputs maps node names to extra positional arguments (a tuple, or a
+    /// single value), passed after the dependency results.
+    #[pyo3(signature = (inputs=None))]
+    fn run(&self, py: Python, inputs: Option<HashMap<String, Py<PyAny>>>) -> PyResult<Py<PyDict>> {
+        let mut inputs = inputs.unwrap_or_default();
+        let mut node_inputs: Vec<Vec<Py<PyAny>>> = Vec::with_capacity(self.nodes.len());
+        for node in &self.nodes {
+            let args = match inputs.remove(&node.name) {
+                Some(value) => {
+                    let tuple = value.bind(py).extract::<Bound<'_, PyTuple>>().ok();
+                    match tuple {
+                        Some(tuple) => tuple.iter().map(|item| item.unbind()).collect(),
+                        None => vec![value],
+                    }
+                }
+                None => Vec::new(),
+            };
+            node_inputs.push(args);
+        }
+        if let Some(name) = inputs.keys().next() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "inputs given for unknown node '{}'",
+                name
+            )));
+        }
 
-                            let task_error = TaskError {
-                                task_name: func_name_clone.clone(),
-                                elapsed_time: exec_start.elapsed().as_secs_f64(),
-                                error_message: e.to_string(),
-                                error_type,
-                                task_id: task_id_clone.clone(),
-                            };
+        let pool = configured_pool();
+        let mut results: Vec<Option<Py<PyAny>>> = self.nodes.iter().map(|_| None).collect();
+        for wave in &self.waves {
+            let wave_results: Vec<PyResult<Py<PyAny>>> = py.detach(|| {
+                let run = || {
+                    wave.par_iter()
+                        .map(|&idx| {
+                            Python::attach(|py| self.call_node(py, idx, &results, &node_inputs[idx]))
+                        })
+                        .collect()
+                };
+                match &pool {
+                    Some(pool) => pool.install(run),
+                    None => run(),
+                }
+            });
+            // A failed node stops the run before its dependents start
+            for (&idx, result) in wave.iter().zip(wave_results) {
+                results[idx] = Some(result?);
+            }
+        }
 
-                            Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                                task_error.__str__()
-                            ))
-                        }
-                    };
+        let output = PyDict::new(py);
+        for (node, result) in self.nodes.iter().zip(results) {
+            output.set_item(&node.name, result)?;
+        }
+        Ok(output.unbind())
+    }
 
-                    let _ = sender.send(to_send);
-                    *is_complete_clone.lock() = true;
+    /// Node names grouped by wave, in execution order
+    #[getter]
+    fn waves(&self) -> Vec<Vec<String>> {
+        self.waves
+            .iter()
+            .map(|wave| wave.iter().map(|&idx| self.nodes[idx].name.clone()).collect())
+            .collect()
+    }
 
-                    unregister_task(&task_id_clone);
-                    clear_task_progress(&task_id_clone);
-                    TASK_DEPENDENCIES.remove(&task_id_clone);
-                    set_current_task_id(None);
-                });
-            })
-        });
+    fn __len__(&self) -> usize {
+        self.nodes.len()
+    }
+}
 
-        let async_handle = AsyncHandle {
-            receiver: Arc::new(Mutex::new(receiver)),
-            thread_handle: Arc::new(Mutex::new(Some(handle))),
-            is_complete,
-            result_cache: Arc::new(Mutex::new(None)),
-            cancel_token,
-            func_name,
-            start_time,
-            task_id,
-            metadata: Arc::new(Mutex::new(HashMap::new())),
-            timeout,
-            on_complete: Arc::new(Mutex::new(None)),
-            on_error: Arc::new(Mutex::new(None)),
-            on_progress: Arc::new(Mutex::new(None)),
+/// Compile a static dependency graph once for repeated runs.
+/// spec maps each node name to a function, or to (function, [dependency names]).
+#[pyfunction]
+fn compile_dag(py: Python, spec: &Bound<'_, PyDict>) -> PyResult<Py<CompiledDag>> {
+    let mut entries = Vec::with_capacity(spec.len());
+    for (name, value) in spec.iter() {
+        let name: String = name.extract()?;
+        let (func, deps) = match value.extract::<(Py<PyAny>, Vec<String>)>() {
+            Ok(pair) => pair,
+            Err(_) => (value.unbind(), Vec::new()),
+        };
+        if !func.bind(py).is_callable() {
+            return Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(format!(
+                "node '{}' must be a function or (function, [dependencies])",
+                name
+            )));
+        }
+        // Decorated functions are called directly; the DAG does the scheduling
+        let func = undecorated(py, func);
+        let func = match func.bind(py).extract::<PyRef<'_, ParallelWithDeps>>() {
+            Ok(wrapper) => wrapper.func.clone_ref(py),
+            Err(_) => func,
         };
+        entries.push((name, func, deps));
+    }
 
-        Py::new(py, async_handle)
+    let index: HashMap<&str, usize> = entries
+        .iter()
+        .enumerate()
+        .map(|(idx, (name, _, _))| (name.as_str(), idx))
+        .collect();
+    let mut dep_indices = Vec::with_capacity(entries.len());
+    for (name, _, deps) in &entries {
+        let resolved = deps
+            .iter()
+            .map(|dep| {
+                index.get(dep.as_str()).copied().ok_or_else(|| {
+                    PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                        "node '{}' depends on unknown node '{}'",
+                        name, dep
+                    ))
+                })
+            })
+            .collect::<PyResult<Vec<usize>>>()?;
+        dep_indices.push(resolved);
     }
-}
 
-/// Decorator for parallel execution with dependency support
-#[pyfunction]
-fn parallel_with_deps(py: Python, func: Py<PyAny>) -> PyResult<Py<ParallelWithDeps>> {
-    Py::new(py, ParallelWithDeps { func })
+    // Topological sort into waves: a node joins the wave after its last dependency
+    let mut pending: Vec<usize> = dep_indices.iter().map(|deps| deps.len()).collect();
+    let mut dependents: Vec<Vec<usize>> = vec![Vec::new(); entries.len()];
+    for (idx, deps) in dep_indices.iter().enumerate() {
+        for &dep in deps {
+            dependents[dep].push(idx);
+        }
+    }
+    let mut waves = Vec::new();
+    let mut placed = 0;
+    let mut wave: Vec<usize> = (0..entries.len()).filter(|&idx| pending[idx] == 0).collect();
+    while !wave.is_empty() {
+        placed += wave.len();
+        let mut next = Vec::new();
+        for &idx in &wave {
+            for &dependent in &dependents[idx] {
+                pending[dependent] -= 1;
+                if pending[dependent] == 0 {
+                    next.push(dependent);
+                }
+            }
+        }
+        waves.push(wave);
+        wave = next;
+    }
+    if placed != entries.len() {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "DAG spec contains a dependency cycle"
+        ));
+    }
+
+    let nodes = entries
+        .into_iter()
+        .zip(dep_indices)
+        .map(|((name, func, _), deps)| CompiledNode { name, func, deps })
+        .collect();
+    Py::new(py, CompiledDag { nodes, waves })
 }
 
 /// Optimized parallel wrapper using crossbeam channels
@@ -1688,12 +3261,12 @@ impl ParallelFastWrapper {
             CrossbeamReceiver<PyResult<Py<PyAny>>>,
         ) = unbounded();
 
-        let is_complete = Arc::new(Mutex::new(false));
+        let is_complete = Arc::new(AtomicBool::new(false));
         let is_complete_clone = is_complete.clone();
 
-        // Spawn thread without GIL
+        // Hand off to a task thread without the GIL
         py.detach(|| {
-            thread::spawn(move || {
+            spawn_task_thread(Box::new(move || {
                 Python::attach(|py| {
                     let result = func
                         .bind(py)
@@ -1705,9 +3278,9 @@ impl ParallelFastWrapper {
                     };
 
                     let _ = sender.send(to_send);
-                    *is_complete_clone.lock() = true;
+                    mark_complete(&is_complete_clone);
                 });
-            })
+            }))
         });
 
         let async_handle = AsyncHandleFast {
@@ -1746,12 +3319,12 @@ impl ParallelPoolWrapper {
         let kwargs_py: Option<Py<PyDict>> = kwargs.map(|k| k.clone().unbind());
 
         let (sender, receiver) = unbounded();
-        let is_complete = Arc::new(Mutex::new(false));
+        let is_complete = Arc::new(AtomicBool::new(false));
         let is_complete_clone = is_complete.clone();
 
         // Use rayon thread pool - better resource management
         py.detach(|| {
-            rayon::spawn(move || {
+            spawn_on_pool(move || {
                 Python::attach(|py| {
                     let result = func
                         .bind(py)
@@ -1763,7 +3336,7 @@ impl ParallelPoolWrapper {
                     };
 
                     let _ = sender.send(to_send);
-                    *is_complete_clone.lock() = true;
+                    mark_complete(&is_complete_clone);
                 });
             });
         });
@@ -1787,8 +3360,9 @@ fn parallel_pool(py: Python, func: Py<PyAny>) -> PyResult<Py<ParallelPoolWrapper
 /// Optimized memoize using DashMap (lock-free concurrent hashmap)
 #[pyfunction]
 fn memoize_fast(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
-    // Use DashMap - lock-free concurrent hashmap
-    let cache: Arc<DashMap<String, Py<PyAny>>> = Arc::new(DashMap::new());
+    // Use DashMap - lock-free concurrent hashmap, hashed with aHash instead of SipHash
+    let cache: Arc<DashMap<String, Py<PyAny>, ahash::RandomState>> =
+        Arc::new(DashMap::with_hasher(ahash::RandomState::new()));
     let func_clone = func.clone_ref(py);
 
     let wrapper = move |args: &Bound<'_, PyTuple>,
@@ -1796,26 +3370,31 @@ fn memoize_fast(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
           -> PyResult<Py<PyAny>> {
         let py = args.py();
 
-        // Create cache key
-        let mut key_parts: Vec<String> = vec![];
+        // Create cache key in a single buffer
+        let mut key = String::new();
         for arg in args.iter() {
-            key_parts.push(arg.repr()?.to_str()?.to_string());
+            if !key.is_empty() {
+                key.push(',');
+            }
+            key.push_str(arg.repr()?.to_str()?);
         }
         if let Some(kwargs_dict) = kwargs {
-            for (key, val) in kwargs_dict.iter() {
-                key_parts.push(format!("{}={}", key, val.repr()?.to_str()?));
+            for (name, val) in kwargs_dict.iter() {
+                if !key.is_empty() {
+                    key.push(',');
+                }
+                key.push_str(&format!("{}={}", name, val.repr()?.to_str()?));
             }
         }
-        let key = key_parts.join(",");
 
         // Check cache (lock-free read)
         if let Some(cached) = cache.get(&key) {
-            println!("Cache hit for key: {}", key);
+            debug!("Cache hit for key: {}", key);
             return Ok(cached.clone_ref(py));
         }
 
         // Cache miss - compute result
-        println!("Cache miss for key: {}", key);
+        debug!("Cache miss for key: {}", key);
         let result = func_clone.bind(py).call(args, kwargs)?;
         let result_unbound = result.unbind();
 
@@ -1837,21 +3416,200 @@ fn memoize_fast(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
     Ok(method_wrapper.into())
 }
 
-/// Batch parallel processing - execute multiple functions in parallel
+/// Pack numeric results into a contiguous array.array ('q' = int64, 'd' = float64)
+fn dense_array(py: Python, typecode: &str, values: &[Py<PyAny>]) -> PyResult<Py<PyAny>> {
+    let mut bytes = Vec::with_capacity(values.len() * 8);
+    for value in values {
+        let value = value.bind(py);
+        match typecode {
+            "q" => bytes.extend_from_slice(&value.extract::<i64>()?.to_ne_bytes()),
+            _ => bytes.extend_from_slice(&value.extract::<f64>()?.to_ne_bytes()),
+        }
+    }
+
+    let array = py.import("array")?.getattr("array")?.call1((typecode,))?;
+    array.call_method1("frombytes", (PyBytes::new(py, &bytes),))?;
+    Ok(array.unbind())
+}
+
+/// Unwrap a function decorated with @parallel, @parallel_fast or @parallel_pool
+/// so batch APIs can call the plain function directly
+fn undecorated(py: Python, func: Py<PyAny>) -> Py<PyAny> {
+    let bound = func.bind(py);
+    if let Ok(wrapper) = bound.extract::<PyRef<'_, ParallelWrapper>>() {
+        return wrapper.func.clone_ref(py);
+    }
+    if let Ok(wrapper) = bound.extract::<PyRef<'_, ParallelFastWrapper>>() {
+        return wrapper.func.clone_ref(py);
+    }
+    if let Ok(wrapper) = bound.extract::<PyRef<'_, ParallelPoolWrapper>>() {
+        return wrapper.func.clone_ref(py);
+    }
+    func
+}
+
+/// Batch parallel processing - execute multiple functions in parallel.
+/// Items are processed in chunks (default: about 4 per worker thread) so each
+/// worker takes the GIL once per chunk rather than once per item.
+/// With dtype='q' or 'd', numeric results come back as one array.array buffer.
+/// Decorated functions are accepted and run directly, so a whole batch of a
+/// @parallel task costs one call instead of one handle per item. Decorator
+/// callbacks can't fire without handles, so they raise ValueError.
 #[pyfunction]
-fn parallel_map(py: Python, func: Py<PyAny>, items: Vec<Py<PyAny>>) -> PyResult<Vec<Py<PyAny>>> {
-    py.detach(|| {
-        // Use rayon for parallel iteration
-        let results: Vec<_> = items
-            .par_iter()
+#[pyo3(signature = (func, items, chunksize=None, dtype=None))]
+fn parallel_map(
+    py: Python,
+    func: Py<PyAny>,
+    items: Vec<Py<PyAny>>,
+    chunksize: Option<usize>,
+    dtype: Option<&str>,
+) -> PyResult<Py<PyAny>> {
+    if chunksize == Some(0) {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "chunksize must be at least 1"
+        ));
+    }
+    if let Some(code) = dtype {
+        if code != "q" && code != "d" {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "dtype must be 'q' (int64) or 'd' (float64), got '{}'",
+                code
+            )));
+        }
+    }
+
+    reject_decorator_hooks(py, &func, "parallel_map()")?;
+    let func = undecorated(py, func);
+    let pool = configured_pool();
+    let chunksize = chunksize.unwrap_or_else(|| {
+        let threads = pool
+            .as_ref()
+            .map(|p| p.current_num_threads())
+            .unwrap_or_else(rayon::current_num_threads);
+        (items.len() / (4 * threads.max(1))).max(1)
+    });
+
+    let results: Vec<Py<PyAny>> = py.detach(|| {
+        // Use rayon for parallel iteration, one GIL acquisition per chunk
+        let run = || -> Vec<_> {
+            items
+                .par_chunks(chunksize)
+                .map(|chunk| {
+                    Python::attach(|py| {
+                        chunk
+                            .iter()
+                            .map(|item| func.bind(py).call1((item.bind(py),)).map(|r| r.unbind()))
+                            .collect::<PyResult<Vec<_>>>()
+                    })
+                })
+                .collect()
+        };
+        let results = match pool {
+            Some(pool) => pool.install(run),
+            None => run(),
+        };
+
+        // Flatten chunk results, propagating the first error
+        let mut flat = Vec::with_capacity(items.len());
+        for chunk in results {
+            flat.extend(chunk?);
+        }
+        Ok::<_, PyErr>(flat)
+    })?;
+
+    match dtype {
+        Some(code) => dense_array(py, code, &results),
+        None => Ok(PyList::new(py, results)?.into_any().unbind()),
+    }
+}
+
+/// Batch submission - spawn one @parallel task per item (func(item)) in a single call.
+/// With chunksize > 1, each task runs func over a chunk of items and its handle
+/// returns the list of results for that chunk; decorator callbacks, which
+/// expect one item's outcome, are then rejected.
+#[pyfunction]
+#[pyo3(signature = (func, items, timeout=None, chunksize=1))]
+fn submit_batch(
+    py: Python,
+    func: Py<PyAny>,
+    items: Vec<Py<PyAny>>,
+    timeout: Option<f64>,
+    chunksize: usize,
+) -> PyResult<Vec<Py<AsyncHandle>>> {
+    if chunksize == 0 {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "chunksize must be at least 1"
+        ));
+    }
+
+    // Accept either a plain function or one already decorated with @parallel,
+    // whose decorator callbacks then apply to each item's handle
+    if chunksize > 1 {
+        reject_decorator_hooks(py, &func, "submit_batch() with chunksize > 1")?;
+    }
+    let hooks = func
+        .bind(py)
+        .extract::<PyRef<'_, ParallelWrapper>>()
+        .ok()
+        .map(|wrapper| wrapper.hooks.clone());
+    let func = undecorated(py, func);
+    let func_name = get_func_name(py, &func);
+
+    if chunksize == 1 {
+        return items
+            .into_iter()
             .map(|item| {
-                Python::attach(|py| func.bind(py).call1((item.bind(py),)).map(|r| r.unbind()))
+                let args_py = PyTuple::new(py, [item])?.unbind();
+                let async_handle = spawn_parallel_task(
+                    py,
+                    func.clone_ref(py),
+                    func_name.clone(),
+                    args_py,
+                    None,
+                    timeout,
+                    hooks.as_deref(),
+                )?;
+                Py::new(py, async_handle)
             })
             .collect();
+    }
 
-        // Convert results
-        results.into_iter().collect()
-    })
+    // One task per chunk: run func over the chunk and return the results as a list
+    let item_func = func.clone_ref(py);
+    let run_chunk = PyCFunction::new_closure(
+        py,
+        None,
+        None,
+        move |args: &Bound<'_, PyTuple>, _kwargs: Option<&Bound<'_, PyDict>>| -> PyResult<Py<PyAny>> {
+            let py = args.py();
+            let chunk = args.get_item(0)?;
+            let results = PyList::empty(py);
+            for item in chunk.try_iter()? {
+                results.append(item_func.bind(py).call1((item?,))?)?;
+            }
+            Ok(results.into_any().unbind())
+        },
+    )?
+    .into_any()
+    .unbind();
+
+    items
+        .chunks(chunksize)
+        .map(|chunk| {
+            let chunk_list = PyList::new(py, chunk.iter().map(|item| item.bind(py)))?;
+            let args_py = PyTuple::new(py, [chunk_list])?.unbind();
+            let async_handle = spawn_parallel_task(
+                py,
+                run_chunk.clone_ref(py),
+                func_name.clone(),
+                args_py,
+                None,
+                timeout,
+                None,
+            )?;
+            Py::new(py, async_handle)
+        })
+        .collect()
 }
 
 /// Priority parallel wrapper - tasks execute based on priority
@@ -1878,9 +3636,6 @@ impl PriorityParallelWrapper {
             ));
         }
 
-        // Wait for available slot (backpressure)
-        wait_for_slot();
-
         // Check memory before starting
         if !check_memory_ok() {
             return Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
@@ -1894,8 +3649,8 @@ impl PriorityParallelWrapper {
         let task_id = format!("task_{}", TASK_ID_COUNTER.fetch_add(1, Ordering::Relaxed));
         let task_id_clone = task_id.clone();
 
-        // Register task as active
-        register_task(task_id.clone());
+        // Wait for available slot (backpressure) and register task as active
+        acquire_slot(py, &task_id);
 
         // Get function name for profiling
         let func_name = func
@@ -1911,22 +3666,17 @@ impl PriorityParallelWrapper {
         // Use crossbeam channel for priority queue
         let (sender, receiver) = unbounded();
 
-        let is_complete = Arc::new(Mutex::new(false));
+        let is_complete = Arc::new(AtomicBool::new(false));
         let cancel_token = Arc::new(AtomicBool::new(false));
         let start_time = Instant::now();
 
         // Setup timeout if specified
         if let Some(timeout_secs) = timeout {
-            let cancel_token_timeout = cancel_token.clone();
-            thread::spawn(move || {
-                thread::sleep(Duration::from_secs_f64(timeout_secs));
-                cancel_token_timeout.store(true, Ordering::Release);
-            });
+            schedule_timeout(&cancel_token, timeout_secs);
         }
 
         // Create priority task
         let task = PriorityTask {
-            priority,
             func,
             args: args_py,
             kwargs: kwargs_py,
@@ -1934,52 +3684,62 @@ impl PriorityParallelWrapper {
         };
 
         // Push to priority queue
-        PRIORITY_QUEUE.lock().push(task);
+        push_priority_task(priority, task);
 
         // Ensure worker is running
         if !PRIORITY_WORKER_RUNNING.load(Ordering::SeqCst) {
             start_priority_worker(py)?;
         }
 
+        let callbacks = SharedCallbacks::default();
+        let callbacks_clone = callbacks.clone();
+
+        // The bridge below is this task's "worker" as far as the handle goes
+        let worker_exited = Arc::new(AtomicBool::new(false));
+        let worker_exited_clone = worker_exited.clone();
+
         // Create full AsyncHandle with all features
         let async_handle = AsyncHandle {
-            receiver: Arc::new(Mutex::new({
+            receiver: Mutex::new({
                 // Convert crossbeam receiver to std::sync::mpsc receiver
                 // We need to spawn a helper thread to bridge the two channel types
-                let (std_sender, std_receiver): (Sender<PyResult<Py<PyAny>>>, Receiver<PyResult<Py<PyAny>>>) = channel();
+                let (std_sender, std_receiver): (Sender<TaskOutcome>, Receiver<TaskOutcome>) = channel();
                 let is_complete_clone = is_complete.clone();
 
-                thread::spawn(move || {
+                spawn_task_thread(Box::new(move || {
                     match receiver.recv() {
                         Ok(result) => {
+                            Python::attach(|py| fire_terminal_callbacks(py, &callbacks_clone, &result));
                             let _ = std_sender.send(result);
-                            *is_complete_clone.lock() = true;
+                            mark_complete(&is_complete_clone);
                             unregister_task(&task_id_clone);
                         }
                         Err(_) => {
-                            let _ = std_sender.send(Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                                "Priority task channel closed unexpectedly"
-                            )));
-                            *is_complete_clone.lock() = true;
+                            let outcome: TaskOutcome =
+                                Err("Priority task channel closed unexpectedly".to_string());
+                            Python::attach(|py| fire_terminal_callbacks(py, &callbacks_clone, &outcome));
+                            let _ = std_sender.send(outcome);
+                            mark_complete(&is_complete_clone);
                             unregister_task(&task_id_clone);
                         }
                     }
-                });
+                    mark_complete(&worker_exited_clone);
+                }));
 
                 std_receiver
-            })),
-            thread_handle: Arc::new(Mutex::new(None)), // Priority tasks don't have individual thread handles
+            }),
+            worker_exited,
             is_complete,
-            result_cache: Arc::new(Mutex::new(None)),
+            result_cache: Mutex::new(None),
             cancel_token,
             func_name,
             start_time,
             task_id,
-            metadata: Arc::new(Mutex::new(HashMap::new())),
+            metadata: Mutex::new(HashMap::new()),
             timeout,
-            on_complete: Arc::new(Mutex::new(None)),
-            on_error: Arc::new(Mutex::new(None)),
-            on_progress: Arc::new(Mutex::new(None)),
+            callbacks,
+            on_progress: Mutex::new(None),
+            progress_watched: Arc::new(AtomicBool::new(true)),
         };
 
         Py::new(py, async_handle)
@@ -2040,28 +3800,284 @@ fn profiled(py: Python, func: Py<PyAny>) -> PyResult<Py<PyAny>> {
 // HELPER FUNCTIONS
 // =============================================================================
 
+/// Either kind of task handle, so gather() also accepts the handles
+/// returned by @parallel_fast and @parallel_pool
+#[derive(FromPyObject)]
+enum AnyHandle {
+    Full(Py<AsyncHandle>),
+    Fast(Py<AsyncHandleFast>),
+}
+
+impl AnyHandle {
+    fn completion_flag(&self, py: Python) -> Arc<AtomicBool> {
+        match self {
+            AnyHandle::Full(h) => h.borrow(py).is_complete.clone(),
+            AnyHandle::Fast(h) => h.borrow(py).is_complete.clone(),
+        }
+    }
+
+    fn get(&self, py: Python) -> PyResult<Py<PyAny>> {
+        match self {
+            AnyHandle::Full(h) => h.borrow(py).get(py),
+            AnyHandle::Fast(h) => h.borrow(py).get(py),
+        }
+    }
+}
+
 /// Gather results from multiple handles
+///
+/// Waits for completions on the shared condvar with the GIL released and
+/// collects each result as soon as its handle finishes, so "raise" mode
+/// fails on the first error to complete instead of draining the handles
+/// ahead of it.
 #[pyfunction]
 #[pyo3(signature = (handles, on_error="raise"))]
-fn gather(py: Python, handles: Vec<Py<AsyncHandle>>, on_error: &str) -> PyResult<Vec<Py<PyAny>>> {
-    let mut results = Vec::new();
-
-    for handle in handles {
-        let h = handle.bind(py);
-        match h.call_method0("get") {
-            Ok(result) => results.push(result.unbind()),
-            Err(e) => match on_error {
-                "raise" => return Err(e),
-                "skip" => continue,
-                "none" => results.push(py.None()),
-                _ => return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
-                    "on_error must be 'raise', 'skip', or 'none'"
-                )),
+fn gather(py: Python, handles: Vec<AnyHandle>, on_error: &str) -> PyResult<Vec<Py<PyAny>>> {
+    if !matches!(on_error, "raise" | "skip" | "none") {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "on_error must be 'raise', 'skip', or 'none'"
+        ));
+    }
+
+    let flags: Vec<_> = handles.iter().map(|h| h.completion_flag(py)).collect();
+    let mut collected = vec![false; handles.len()];
+    let mut results: Vec<Option<Py<PyAny>>> = handles.iter().map(|_| None).collect();
+    let mut remaining = handles.len();
+
+    while remaining > 0 {
+        py.detach(|| {
+            wait_for_completion(
+                || flags.iter().zip(&collected).any(|(f, &done)| !done && f.load(Ordering::Acquire)),
+                None,
+            )
+        });
+
+        for (i, handle) in handles.iter().enumerate() {
+            if collected[i] || !flags[i].load(Ordering::Acquire) {
+                continue;
+            }
+            collected[i] = true;
+            remaining -= 1;
+
+            match handle.get(py) {
+                Ok(result) => results[i] = Some(result),
+                Err(e) if on_error == "raise" => return Err(e),
+                Err(_) => {}
+            }
+        }
+    }
+
+    Ok(results
+        .into_iter()
+        .filter_map(|r| match (r, on_error) {
+            (Some(result), _) => Some(result),
+            (None, "none") => Some(py.None()),
+            (None, _) => None,
+        })
+        .collect())
+}
+
+/// Collect the completion flags of a list of handles (requires the GIL)
+fn completion_flags(py: Python, handles: &[Py<AsyncHandle>]) -> Vec<Arc<AtomicBool>> {
+    handles
+        .iter()
+        .map(|h| h.borrow(py).is_complete.clone())
+        .collect()
+}
+
+/// Block until every handle has completed (returns False on timeout)
+#[pyfunction]
+#[pyo3(signature = (handles, timeout=None))]
+fn wait_all(py: Python, handles: Vec<Py<AsyncHandle>>, timeout: Option<f64>) -> PyResult<bool> {
+    let flags = completion_flags(py, &handles);
+    let deadline = deadline_from_timeout(timeout);
+
+    Ok(py.detach(|| {
+        wait_for_completion(|| flags.iter().all(|f| f.load(Ordering::Acquire)), deadline)
+    }))
+}
+
+/// Block until any handle has completed and return its index (None on timeout)
+#[pyfunction]
+#[pyo3(signature = (handles, timeout=None))]
+fn wait_any(py: Python, handles: Vec<Py<AsyncHandle>>, timeout: Option<f64>) -> PyResult<Option<usize>> {
+    let flags = completion_flags(py, &handles);
+    if flags.is_empty() {
+        return Ok(None);
+    }
+    let deadline = deadline_from_timeout(timeout);
+
+    Ok(py.detach(|| {
+        let mut index = None;
+        wait_for_completion(
+            || {
+                index = flags.iter().position(|f| f.load(Ordering::Acquire));
+                index.is_some()
             },
+            deadline,
+        );
+        index
+    }))
+}
+
+/// Count how many handles have completed in a single call
+#[pyfunction]
+fn ready_count(py: Python, handles: Vec<Py<AsyncHandle>>) -> PyResult<usize> {
+    Ok(handles
+        .iter()
+        .filter(|h| h.borrow(py).is_complete.load(Ordering::Acquire))
+        .count())
+}
+
+/// Snapshot (is_ready, progress) for many handles in a single call.
+/// With a timeout, first block until an unfinished handle finishes or reports
+/// progress (like select), so a monitoring loop wakes only when there is
+/// something new to show.
+#[pyfunction]
+#[pyo3(signature = (handles, timeout=None))]
+fn poll_handles(py: Python, handles: Vec<Py<AsyncHandle>>, timeout: Option<f64>) -> PyResult<Vec<(bool, f64)>> {
+    if timeout.is_some() {
+        let pending: Vec<_> = handles
+            .iter()
+            .map(|h| h.borrow(py))
+            .filter(|h| !h.is_complete.load(Ordering::Acquire))
+            .map(|h| {
+                h.progress_watched.store(true, Ordering::Relaxed);
+                (h.is_complete.clone(), h.task_id.clone())
+            })
+            .collect();
+        if !pending.is_empty() {
+            let deadline = deadline_from_timeout(timeout);
+            py.detach(|| wait_for_state_change(&pending, deadline));
+        }
+    }
+
+    Ok(handles
+        .iter()
+        .map(|h| {
+            let h = h.borrow(py);
+            h.progress_watched.store(true, Ordering::Relaxed);
+            let ready = h.is_complete.load(Ordering::Acquire);
+            let progress = TASK_PROGRESS_MAP
+                .get(&h.task_id)
+                .map(|p| *p)
+                .unwrap_or(0.0);
+            (ready, progress)
+        })
+        .collect())
+}
+
+/// Iterator yielding handles in the order they complete
+#[pyclass]
+struct AsCompleted {
+    handles: Vec<Py<AsyncHandle>>,
+    flags: Vec<Arc<AtomicBool>>,
+    yielded: Vec<bool>,
+    remaining: usize,
+    deadline: Option<Instant>,
+}
+
+#[pymethods]
+impl AsCompleted {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python) -> PyResult<Option<Py<AsyncHandle>>> {
+        if self.remaining == 0 {
+            return Ok(None);
+        }
+
+        let flags = &self.flags;
+        let yielded = &self.yielded;
+        let deadline = self.deadline;
+        let mut index = None;
+
+        let ready = py.detach(|| {
+            wait_for_completion(
+                || {
+                    index = (0..flags.len()).find(|&i| !yielded[i] && flags[i].load(Ordering::Acquire));
+                    index.is_some()
+                },
+                deadline,
+            )
+        });
+
+        match index {
+            Some(i) if ready => {
+                self.yielded[i] = true;
+                self.remaining -= 1;
+                Ok(Some(self.handles[i].clone_ref(py)))
+            }
+            _ => Err(PyErr::new::<pyo3::exceptions::PyTimeoutError, _>(format!(
+                "{} (of {}) tasks are unfinished",
+                self.remaining,
+                self.handles.len()
+            ))),
+        }
+    }
+}
+
+/// Iterate over handles as they complete, like concurrent.futures.as_completed
+#[pyfunction]
+#[pyo3(signature = (handles, timeout=None))]
+fn as_completed(py: Python, handles: Vec<Py<AsyncHandle>>, timeout: Option<f64>) -> PyResult<Py<AsCompleted>> {
+    let flags = completion_flags(py, &handles);
+    let count = handles.len();
+    Py::new(
+        py,
+        AsCompleted {
+            handles,
+            flags,
+            yielded: vec![false; count],
+            remaining: count,
+            deadline: deadline_from_timeout(timeout),
+        },
+    )
+}
+
+/// A fixed set of handles whose completion can be counted cheaply.
+/// Completion flags are captured once; finished ones are dropped as they are
+/// seen, so repeated ready_count() calls only look at unfinished tasks.
+#[pyclass]
+struct HandleGroup {
+    pending: Vec<Arc<AtomicBool>>,
+    total: usize,
+}
+
+#[pymethods]
+impl HandleGroup {
+    #[new]
+    fn new(py: Python, handles: Vec<Py<AsyncHandle>>) -> Self {
+        HandleGroup {
+            total: handles.len(),
+            pending: completion_flags(py, &handles),
+        }
+    }
+
+    /// Number of finished handles
+    fn ready_count(&mut self) -> usize {
+        self.pending.retain(|f| !f.load(Ordering::Acquire));
+        self.total - self.pending.len()
+    }
+
+    /// Block until every handle has completed (returns False on timeout)
+    #[pyo3(signature = (timeout=None))]
+    fn wait(&mut self, py: Python, timeout: Option<f64>) -> bool {
+        let pending = &self.pending;
+        let deadline = deadline_from_timeout(timeout);
+        let done = py.detach(|| {
+            wait_for_completion(|| pending.iter().all(|f| f.load(Ordering::Acquire)), deadline)
+        });
+        if done {
+            self.pending.clear();
         }
+        done
     }
 
-    Ok(results)
+    fn __len__(&self) -> usize {
+        self.total
+    }
 }
 
 /// Context manager for parallel execution
@@ -2107,10 +4123,17 @@ impl ParallelContext {
         _exc_val: &Bound<'_, PyAny>,
         _exc_tb: &Bound<'_, PyAny>,
     ) -> PyResult<bool> {
-        // Wait for all tasks
-        let handles_guard = self.handles.lock();
-        for handle in handles_guard.iter() {
-            let _ = handle.bind(py).call_method0("get");
+        // Wait for all tasks in one GIL-free wait, then collect each result
+        // so callbacks fire and results are cached on the handles
+        let handles: Vec<Py<AsyncHandle>> =
+            self.handles.lock().iter().map(|h| h.clone_ref(py)).collect();
+        let flags = completion_flags(py, &handles);
+        py.detach(|| {
+            wait_for_completion(|| flags.iter().all(|f| f.load(Ordering::Acquire)), None)
+        });
+
+        for handle in &handles {
+            let _ = handle.borrow(py).get(py);
         }
         Ok(false)
     }
@@ -2126,9 +4149,13 @@ fn retry_backoff(
     initial_delay: f64,
     max_delay: f64,
 ) -> PyResult<Py<PyAny>> {
-    let backoff_owned = backoff.to_string();
+    // Resolve the backoff strategy once, not on every retry
+    let next_delay: fn(f64, f64) -> f64 = match backoff {
+        "exponential" => |delay, _initial| delay * 2.0,
+        "linear" => |delay, initial| delay + initial,
+        _ => |delay, _initial| delay,
+    };
     let factory = move |py: Python<'_>, func: Py<PyAny>| -> PyResult<Py<PyAny>> {
-        let backoff_clone = backoff_owned.clone();
         let wrapper = move |args: &Bound<'_, PyTuple>,
                             kwargs: Option<&Bound<'_, PyDict>>|
               -> PyResult<Py<PyAny>> {
@@ -2144,14 +4171,11 @@ fn retry_backoff(
                         last_err = Some(e);
 
                         if attempt < max_attempts - 1 {
-                            thread::sleep(Duration::from_secs_f64(delay));
+                            // Sleep with the GIL released so other threads keep running
+                            let wait = Duration::from_secs_f64(delay);
+                            py.detach(|| thread::sleep(wait));
 
-                            // Calculate next delay
-                            delay = match backoff_clone.as_str() {
-                                "exponential" => (delay * 2.0).min(max_delay),
-                                "linear" => (delay + initial_delay).min(max_delay),
-                                _ => delay,
-                            };
+                            delay = next_delay(delay, initial_delay).min(max_delay);
                         }
                     }
                 }
@@ -2242,7 +4266,8 @@ fn retry_cached(_py: Python<'_>, max_attempts: usize, cache_failures: bool) -> P
                         last_err = Some(e);
 
                         if attempt < max_attempts - 1 {
-                            thread::sleep(Duration::from_millis(100 * (attempt + 1) as u64));
+                            let wait = Duration::from_millis(100 * (attempt + 1) as u64);
+                            py.detach(|| thread::sleep(wait));
                         }
                     }
                 }
@@ -2548,6 +4573,13 @@ mod tests {
         assert_eq!(COMPLETED_COUNTER.load(Ordering::SeqCst), 1);
         assert_eq!(FAILED_COUNTER.load(Ordering::SeqCst), 1);
 
+        // Verify per-function stats
+        let metrics = get_metrics(func_name.to_string()).unwrap().unwrap();
+        assert_eq!(metrics.total_tasks, 2);
+        assert_eq!(metrics.completed_tasks, 1);
+        assert_eq!(metrics.failed_tasks, 1);
+        assert!((metrics.average_execution_time_ms - duration_ms).abs() < 1e-6);
+
         // Clean up
         reset_metrics().unwrap();
     }
@@ -2584,6 +4616,7 @@ fn makeparallel(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Original decorators
     m.add_function(wrap_pyfunction!(timer, m)?)?;
     m.add_class::<CallCounter>()?;
+    m.add_class::<Memoized>()?;
     m.add_function(wrap_pyfunction!(retry, m)?)?;
     m.add_function(wrap_pyfunction!(memoize, m)?)?;
     m.add_function(wrap_pyfunction!(parallel, m)?)?;
@@ -2594,6 +4627,7 @@ fn makeparallel(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(parallel_pool, m)?)?;
     m.add_function(wrap_pyfunction!(memoize_fast, m)?)?;
     m.add_function(wrap_pyfunction!(parallel_map, m)?)?;
+    m.add_function(wrap_pyfunction!(submit_batch, m)?)?;
     m.add_class::<AsyncHandleFast>()?;
 
     // Thread pool configuration
@@ -2617,17 +4651,33 @@ fn makeparallel(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(shutdown, m)?)?;
     m.add_function(wrap_pyfunction!(reset_shutdown, m)?)?;
     m.add_function(wrap_pyfunction!(get_active_task_count, m)?)?;
+    m.add_function(wrap_pyfunction!(wait_idle, m)?)?;
 
     // Backpressure and resource management
     m.add_function(wrap_pyfunction!(set_max_concurrent_tasks, m)?)?;
     m.add_function(wrap_pyfunction!(configure_memory_limit, m)?)?;
+    m.add_function(wrap_pyfunction!(configure, m)?)?;
 
     // Progress tracking
     m.add_function(wrap_pyfunction!(report_progress, m)?)?;
+    m.add_function(wrap_pyfunction!(set_progress_coalescing, m)?)?;
     m.add_function(wrap_pyfunction!(get_current_task_id, m)?)?;
+    m.add_function(wrap_pyfunction!(log_line, m)?)?;
+    m.add_function(wrap_pyfunction!(flush_log, m)?)?;
+    // Don't lose the last few buffered log lines when the interpreter exits
+    m.py()
+        .import("atexit")?
+        .call_method1("register", (m.getattr("flush_log")?,))?;
 
     // Helper functions
     m.add_function(wrap_pyfunction!(gather, m)?)?;
+    m.add_function(wrap_pyfunction!(wait_all, m)?)?;
+    m.add_function(wrap_pyfunction!(wait_any, m)?)?;
+    m.add_function(wrap_pyfunction!(poll_handles, m)?)?;
+    m.add_function(wrap_pyfunction!(ready_count, m)?)?;
+    m.add_function(wrap_pyfunction!(as_completed, m)?)?;
+    m.add_class::<AsCompleted>()?;
+    m.add_class::<HandleGroup>()?;
     m.add_class::<ParallelContext>()?;
     m.add_function(wrap_pyfunction!(retry_backoff, m)?)?;
     m.add_function(wrap_pyfunction!(retry_cached, m)?)?;
@@ -2635,6 +4685,10 @@ fn makeparallel(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Task dependencies
     m.add_function(wrap_pyfunction!(parallel_with_deps, m)?)?;
     m.add_class::<ParallelWithDeps>()?;
+    m.add_class::<TaskGraph>()?;
+    m.add_class::<TaskNode>()?;
+    m.add_function(wrap_pyfunction!(compile_dag, m)?)?;
+    m.add_class::<CompiledDag>()?;
 
     Ok(())
 }
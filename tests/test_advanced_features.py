@@ -117,11 +117,13 @@ def test_backpressure():
 
     # Monitor active tasks
     max_concurrent = 0
-    while not all(h.is_ready() for h in handles):
+    all_done = False
+    while not all_done:
         active = mp.get_active_task_count()
         max_concurrent = max(max_concurrent, active)
         print(f"Active tasks: {active}", end='\r')
-        time.sleep(0.05)
+        # Sample every 50ms, but return as soon as the last task finishes
+        all_done = mp.wait_all(handles, timeout=0.05)
 
     results = [h.get() for h in handles]
     elapsed = time.time() - start
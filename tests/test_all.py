@@ -4,8 +4,11 @@ Comprehensive Test Suite for makeParallel
 Tests all decorators and functions to ensure they work as expected
 """
 
+import itertools
+import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import makeparallel as mp
 
@@ -16,16 +19,23 @@ class TestRunner:
         self.failed = 0
         self.tests = []
 
-    def test(self, name):
-        """Decorator to mark test functions"""
+    def test(self, name, serial=False):
+        """Decorator to mark test functions.
+
+        Tests that touch global state (thread pool, metrics, priority worker,
+        shutdown) are marked serial and run one by one after the rest.
+        """
 
         def decorator(func):
-            self.tests.append((name, func))
+            self.tests.append((name, func, serial))
             return func
 
         return decorator
 
     def assert_equal(self, actual, expected, msg=""):
+        # Identity first, like list/dict equality: covers None, bools, small ints
+        if actual is expected:
+            return
         if actual != expected:
             raise AssertionError(f"{msg}\nExpected: {expected}\nGot: {actual}")
 
@@ -42,21 +52,45 @@ class TestRunner:
         except exception_type:
             pass
 
-    def run(self):
+    def _run_one(self, test):
+        """Run a single test, returning (name, error or None)"""
+        name, test_func, _ = test
+        try:
+            test_func(self)
+            return name, None
+        except Exception as e:
+            return name, e
+
+    def _report(self, name, error):
+        print(f"\n[TEST] {name}...", end=" ")
+        if error is None:
+            print(" PASSED")
+            self.passed += 1
+        else:
+            print(f" FAILED")
+            print(f"  Error: {error}")
+            self.failed += 1
+
+    def run(self, parallel=True):
         print("=" * 80)
         print("COMPREHENSIVE TEST SUITE - makeParallel")
         print("=" * 80)
 
-        for name, test_func in self.tests:
-            try:
-                print(f"\n[TEST] {name}...", end=" ")
-                test_func(self)
-                print(" PASSED")
-                self.passed += 1
-            except Exception as e:
-                print(f" FAILED")
-                print(f"  Error: {e}")
-                self.failed += 1
+        independent = [test for test in self.tests if parallel and not test[2]]
+        serial = [test for test in self.tests if not parallel or test[2]]
+
+        # Independent tests mostly sleep or wait on handles, so they overlap
+        # on plain threads (leaving the rayon pool to the tests themselves);
+        # results are reported as they finish
+        if independent:
+            workers = max(os.cpu_count() or 1, 8)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._run_one, test) for test in independent]
+                for future in as_completed(futures):
+                    self._report(*future.result())
+
+        for test in serial:
+            self._report(*self._run_one(test))
 
         print("\n" + "=" * 80)
         print(f"RESULTS: {self.passed} passed, {self.failed} failed")
@@ -69,6 +103,41 @@ class TestRunner:
 runner = TestRunner()
 
 
+# Scale every sleep and timing window, e.g. MP_TEST_SLEEP_SCALE=0.25 for a
+# quicker run on an idle machine; the ratios the tests rely on are preserved
+SLEEP_SCALE = float(os.environ.get("MP_TEST_SLEEP_SCALE", "1.0"))
+
+
+def scaled(seconds):
+    return seconds * SLEEP_SCALE
+
+
+# Expected results shared by several tests, built once at import
+SQUARES_10 = [i**2 for i in range(10)]
+
+
+# Task functions shared by several tests, decorated once at import
+@mp.parallel
+def identity(x):
+    return x
+
+
+@mp.parallel
+def square(x):
+    return x**2
+
+
+@mp.parallel_fast
+def fast_square(x):
+    return x**2
+
+
+@mp.parallel
+def sleepy(seconds):
+    time.sleep(scaled(seconds))
+    return seconds
+
+
 # =============================================================================
 # TEST 1: Timer Decorator
 # =============================================================================
@@ -76,7 +145,7 @@ runner = TestRunner()
 def test_timer_basic(t):
     @mp.timer
     def slow_func():
-        time.sleep(0.1)
+        time.sleep(scaled(0.1))
         return 42
 
     result = slow_func()
@@ -140,23 +209,56 @@ def test_callcounter_args(t):
     t.assert_equal(add.call_count, 2)
 
 
+@runner.test("CallCounter - Recursive calls")
+def test_callcounter_recursive(t):
+    @mp.CallCounter
+    def countdown(n):
+        return 0 if n == 0 else countdown(n - 1)
+
+    countdown(4)
+    t.assert_equal(countdown.call_count, 5)
+
+
+@runner.test("Log - Lines from tasks reach stdout", serial=True)
+def test_log_from_tasks(t):
+    @mp.parallel
+    def worker(i):
+        mp.log(f"log-test {i}")
+        return i
+
+    # Capture fd 1 directly: the writer thread bypasses sys.stdout
+    read_fd, write_fd = os.pipe()
+    saved_fd = os.dup(1)
+    sys.stdout.flush()
+    os.dup2(write_fd, 1)
+    try:
+        t.assert_equal([h.get() for h in [worker(i) for i in range(4)]], [0, 1, 2, 3])
+        mp.flush_log()
+    finally:
+        os.dup2(saved_fd, 1)
+        os.close(saved_fd)
+        os.close(write_fd)
+    with os.fdopen(read_fd) as captured:
+        lines = captured.read().splitlines()
+    t.assert_equal(sorted(lines), [f"log-test {i}" for i in range(4)])
+
+
 # =============================================================================
 # TEST 4: Retry Decorator
 # =============================================================================
 @runner.test("Retry - Successful after retries")
 def test_retry_success(t):
-    attempts = [0]
+    attempts = itertools.count(1)
 
     @mp.retry(max_retries=3)
     def flaky():
-        attempts[0] += 1
-        if attempts[0] < 3:
+        if next(attempts) < 3:
             raise ValueError("Not yet!")
         return "success"
 
     result = flaky()
     t.assert_equal(result, "success")
-    t.assert_equal(attempts[0], 3)
+    t.assert_equal(next(attempts), 4)  # Exactly 3 attempts were made
 
 
 @runner.test("Retry - Fails after max retries")
@@ -181,29 +283,40 @@ def test_retry_immediate(t):
 # =============================================================================
 # TEST 5: Memoize Decorator
 # =============================================================================
-@runner.test("Memoize - Caching works")
-def test_memoize_caching(t):
-    call_count = [0]
+def memoize_caching_test(decorator):
+    """Build the caching test for one memoize variant"""
 
-    @mp.memoize
-    def expensive(x):
-        call_count[0] += 1
-        return x**2
+    def test_memoize_caching(t):
+        computed = []
 
-    # First call - cache miss
-    result1 = expensive(5)
-    t.assert_equal(result1, 25)
-    t.assert_equal(call_count[0], 1)
+        @decorator
+        def expensive(x):
+            computed.append(x)
+            return x**2
 
-    # Second call - cache hit
-    result2 = expensive(5)
-    t.assert_equal(result2, 25)
-    t.assert_equal(call_count[0], 1)  # No additional call
+        # First call - cache miss
+        result1 = expensive(5)
+        t.assert_equal(result1, 25)
+        t.assert_equal(computed, [5])
+
+        # Second call - cache hit
+        result2 = expensive(5)
+        t.assert_equal(result2, 25)
+        t.assert_equal(computed, [5])  # No additional call
 
-    # Different argument - cache miss
-    result3 = expensive(6)
-    t.assert_equal(result3, 36)
-    t.assert_equal(call_count[0], 2)
+        # Different argument - cache miss
+        result3 = expensive(6)
+        t.assert_equal(result3, 36)
+        t.assert_equal(computed, [5, 6])
+
+    return test_memoize_caching
+
+
+for name, decorator in [
+    ("Memoize - Caching works", mp.memoize),
+    ("Memoize Fast - Caching works", mp.memoize_fast),
+]:
+    runner.test(name)(memoize_caching_test(decorator))
 
 
 @runner.test("Memoize - With kwargs")
@@ -221,25 +334,83 @@ def test_memoize_kwargs(t):
     t.assert_equal(result3, 4)
 
 
+@runner.test("Memoize - Keys are typed and keep args apart from kwargs")
+def test_memoize_key_collisions(t):
+    @mp.memoize
+    def kind(x):
+        return type(x).__name__
+
+    # 1, 1.0 and True compare equal but are cached apart
+    t.assert_equal([kind(1), kind(1.0), kind(True)], ["int", "float", "bool"])
+    t.assert_equal([kind(True), kind(1.0), kind(1)], ["bool", "float", "int"])
+
+    @mp.memoize
+    def describe(*args, **kwargs):
+        return (args, kwargs)
+
+    # Keyword items can't be mistaken for positional tuples
+    t.assert_equal(describe(1, 2, a=1), ((1, 2), {"a": 1}))
+    t.assert_equal(describe((1, 2), (("a", 1),)), (((1, 2), (("a", 1),)), {}))
+
+    # Errors from an argument's __hash__ are not swallowed
+    class BadHash:
+        def __hash__(self):
+            raise ValueError("no hashing")
+
+    t.assert_raises(ValueError, lambda: kind(BadHash()))
+
+
+@runner.test("Memoize - cache_info and unhashable args")
+def test_memoize_cache_info(t):
+    @mp.memoize
+    def total(values):
+        return sum(values)
+
+    t.assert_equal(total((1, 2, 3)), 6)
+    t.assert_equal(total((1, 2, 3)), 6)
+    t.assert_equal(total([4, 5]), 9)  # Unhashable - repr key
+    t.assert_equal(total([4, 5]), 9)
+
+    info = total.cache_info()
+    t.assert_equal(info["hits"], 2)
+    t.assert_equal(info["misses"], 2)
+    t.assert_equal(info["currsize"], 2)
+
+    total.cache_clear()
+    t.assert_equal(total.cache_info()["currsize"], 0)
+
+
 # =============================================================================
 # TEST 6: Parallel Decorator
 # =============================================================================
-@runner.test("Parallel - Basic functionality")
-def test_parallel_basic(t):
-    @mp.parallel
-    def compute(x):
-        return x * 2
+def parallel_basic_test(decorator):
+    """Build the basic round-trip test for one parallel decorator"""
 
-    handle = compute(21)
-    result = handle.get()
-    t.assert_equal(result, 42)
+    def test_parallel_basic(t):
+        @decorator
+        def compute(x):
+            return x * 2
+
+        handle = compute(21)
+        result = handle.get()
+        t.assert_equal(result, 42)
+
+    return test_parallel_basic
+
+
+for name, decorator in [
+    ("Parallel - Basic functionality", mp.parallel),
+    ("Parallel Fast - Basic functionality", mp.parallel_fast),
+    ("Parallel Pool - Basic functionality", mp.parallel_pool),
+]:
+    runner.test(name)(parallel_basic_test(decorator))
 
 
 @runner.test("Parallel - is_ready() check")
 def test_parallel_ready(t):
     @mp.parallel
     def slow_task():
-        time.sleep(0.2)
+        time.sleep(scaled(0.2))
         return "done"
 
     handle = slow_task()
@@ -258,14 +429,19 @@ def test_parallel_ready(t):
     t.assert_equal(ready_after, True)
 
 
+@runner.test("Parallel - wait() keeps the result for get()")
+def test_parallel_wait(t):
+    handle = sleepy(0.2)
+
+    t.assert_equal(handle.wait(scaled(0.01)), False)
+    t.assert_equal(handle.wait(), True)
+    t.assert_equal(handle.get(), 0.2)
+
+
 @runner.test("Parallel - try_get() non-blocking")
 def test_parallel_try_get(t):
-    @mp.parallel
-    def instant():
-        return 123
-
-    handle = instant()
-    time.sleep(0.1)  # Give it time to complete
+    handle = identity(123)
+    time.sleep(scaled(0.1))  # Give it time to complete
 
     result = handle.try_get()
     t.assert_equal(result, 123)
@@ -273,16 +449,15 @@ def test_parallel_try_get(t):
 
 @runner.test("Parallel - Multiple tasks")
 def test_parallel_multiple(t):
-    @mp.parallel
-    def square(x):
-        return x**2
-
     handles = [square(i) for i in range(5)]
     results = [h.get() for h in handles]
 
     expected = [0, 1, 4, 9, 16]
     t.assert_equal(results, expected)
 
+    # One call collects every result, in submission order
+    t.assert_equal(mp.gather([square(i) for i in range(5)]), expected)
+
 
 @runner.test("Parallel - Error handling")
 def test_parallel_error(t):
@@ -294,6 +469,226 @@ def test_parallel_error(t):
     t.assert_raises(Exception, handle.get)
 
 
+@runner.test("Parallel - on_complete/on_error fire without get()")
+def test_parallel_terminal_callbacks(t):
+    completed = []
+    handle = sleepy(0.1)
+    handle.on_complete(completed.append)
+    handle.on_error(completed.append)
+    handle.wait()
+    t.assert_equal(completed, [0.1])
+
+    # Registered after completion: runs immediately
+    late = []
+    handle.on_complete(late.append)
+    t.assert_equal(late, [0.1])
+
+
+@runner.test("Parallel - Decorator callbacks")
+def test_parallel_decorator_callbacks(t):
+    completed, failed, progress = [], [], []
+
+    @mp.parallel(on_complete=completed.append, on_error=failed.append, on_progress=progress.append)
+    def job(value):
+        mp.report_progress(1.0)  # Before any handle-level registration could happen
+        if value < 0:
+            raise ValueError("negative")
+        return value
+
+    t.assert_equal(job(5).get(), 5)
+    t.assert_raises(Exception, job(-1).get)
+
+    t.assert_equal(completed, [5])
+    t.assert_equal(len(failed), 1)
+    t.assert_equal(progress, [1.0, 1.0])
+
+    # Batches that don't give each item its own handle can't run them
+    t.assert_equal([h.get() for h in mp.submit_batch(job, [1, 2])], [1, 2])
+    t.assert_raises(ValueError, lambda: mp.submit_batch(job, [1, 2, 3, 4], chunksize=2))
+    t.assert_raises(ValueError, lambda: mp.parallel_map(job, [1, 2]))
+
+
+@runner.test("Parallel - @mp.parallel(jit=True)")
+def test_parallel_jit(t):
+    @mp.parallel(jit=True)
+    def kernel(x):
+        return x * x + 1
+
+    @mp.parallel(jit=True)
+    def uncompilable(x):
+        return {"value": object(), "x": x}["x"]
+
+    # Compiled with numba when it's installed, plain Python otherwise
+    t.assert_equal(kernel(7).get(), 50)
+    t.assert_equal(uncompilable(3).get(), 3)
+
+
+@runner.test("Parallel - on_progress coalesces rapid updates")
+def test_parallel_progress_coalescing(t):
+    @mp.parallel
+    def chatty(steps):
+        time.sleep(scaled(0.1))  # Let on_progress register first
+        for i in range(steps):
+            mp.report_progress((i + 1) / steps)
+        return steps
+
+    updates = []
+    handle = chatty(10000)
+    handle.on_progress(updates.append)
+    t.assert_equal(handle.get(), 10000)
+
+    # get() delivers the final value; intermediate ones collapse
+    t.assert_equal(updates[-1], 1.0)
+    t.assert_true(len(updates) < 10000, f"{len(updates)} callbacks for 10000 updates")
+
+
+@runner.test("Parallel - report_progress drops near-duplicate updates", serial=True)
+def test_parallel_progress_threshold(t):
+    @mp.parallel
+    def nudging():
+        time.sleep(scaled(0.1))  # Let get_progress() start watching first
+        mp.report_progress(0.5)
+        mp.report_progress(0.501)  # Too close to 0.5 to publish
+        time.sleep(scaled(0.3))
+
+    mp.set_progress_coalescing(min_delta=0.01, min_interval_ms=60_000)
+    try:
+        handle = nudging()
+        t.assert_equal(handle.get_progress(), 0.0)
+        time.sleep(scaled(0.25))
+        t.assert_equal(handle.get_progress(), 0.5)
+        handle.get()
+    finally:
+        mp.set_progress_coalescing()
+
+    t.assert_raises(ValueError, lambda: mp.set_progress_coalescing(min_delta=-1))
+
+
+@runner.test("Parallel - report_progress is skipped until progress is observed")
+def test_parallel_progress_unwatched(t):
+    @mp.parallel
+    def quiet():
+        mp.report_progress(0.5)
+        time.sleep(scaled(0.2))
+        mp.report_progress(0.75)
+        time.sleep(scaled(0.2))
+
+    handle = quiet()
+    time.sleep(scaled(0.1))
+    t.assert_equal(handle.get_progress(), 0.0)  # 0.5 was reported unobserved
+    time.sleep(scaled(0.2))
+    t.assert_equal(handle.get_progress(), 0.75)
+    handle.get()
+
+
+@runner.test("Parallel - wait_state_change() wakes on progress")
+def test_parallel_wait_state_change(t):
+    @mp.parallel
+    def stepped(steps):
+        for i in range(steps):
+            time.sleep(scaled(0.1))
+            mp.report_progress((i + 1) / steps)
+        time.sleep(scaled(0.1))
+        return steps
+
+    handle = stepped(3)
+    wakeups = 0
+    while not handle.wait_state_change(timeout=scaled(5.0)):
+        wakeups += 1
+        t.assert_true(wakeups <= 3, "woke without a progress change")
+
+    # One wakeup per progress report, then True once finished
+    t.assert_equal(wakeups, 3)
+    t.assert_equal(handle.wait_state_change(), True)
+    t.assert_equal(handle.get(), 3)
+
+
+@runner.test("Parallel - wait_all() blocks until done")
+def test_parallel_wait_all(t):
+    handles = [sleepy(0.1 * i) for i in range(3)]
+
+    t.assert_equal(mp.wait_all(handles, timeout=scaled(0.01)), False)
+    t.assert_equal(mp.wait_all(handles), True)
+    t.assert_true(all(h.is_ready() for h in handles))
+
+
+@runner.test("Parallel - wait_any() and as_completed()")
+def test_parallel_wait_any_as_completed(t):
+    handles = [sleepy(0.3), sleepy(0.01), sleepy(0.2)]
+
+    t.assert_equal(mp.wait_any(handles), 1)
+
+    order = [h.get() for h in mp.as_completed(handles)]
+    t.assert_equal(order, [0.01, 0.2, 0.3])
+
+
+@runner.test("Parallel - gather() keeps order and error modes")
+def test_parallel_gather(t):
+    @mp.parallel
+    def task(x):
+        time.sleep(scaled(0.05 * (3 - x)))
+        if x == 1:
+            raise ValueError("boom")
+        return x
+
+    t.assert_equal(mp.gather([task(i) for i in range(3)], on_error="none"), [0, None, 2])
+    t.assert_equal(mp.gather([task(i) for i in range(3)], on_error="skip"), [0, 2])
+
+    try:
+        mp.gather([task(i) for i in range(3)])
+        t.assert_true(False, "gather() should raise in 'raise' mode")
+    except RuntimeError:
+        pass
+
+
+@runner.test("Parallel - poll_handles(), ready_count() and HandleGroup")
+def test_parallel_poll_handles(t):
+    handles = [identity(i) for i in range(3)]
+    mp.wait_all(handles)
+
+    snapshot = mp.poll_handles(handles)
+    t.assert_equal(len(snapshot), 3)
+    t.assert_true(all(ready for ready, _ in snapshot))
+    t.assert_equal(mp.ready_count(handles), 3)
+
+    group = mp.HandleGroup(handles)
+    t.assert_equal(len(group), 3)
+    t.assert_equal(group.wait(timeout=1.0), True)
+    t.assert_equal(group.ready_count(), 3)
+
+    # With a timeout, poll_handles() waits for the next progress report
+    @mp.parallel
+    def halfway():
+        time.sleep(scaled(0.1))
+        mp.report_progress(0.5)
+        time.sleep(scaled(0.3))
+
+    handle = halfway()
+    start = time.time()
+    t.assert_equal(mp.poll_handles([handle], timeout=scaled(5.0)), [(False, 0.5)])
+    t.assert_true(time.time() - start < scaled(0.35), "poll_handles waited past the update")
+    handle.get()
+
+
+@runner.test("Parallel - submit_batch()")
+def test_parallel_submit_batch(t):
+    def square(x):
+        return x**2
+
+    handles = mp.submit_batch(square, list(range(5)))
+    results = [h.get() for h in handles]
+    t.assert_equal(results, [0, 1, 4, 9, 16])
+
+    # Already-decorated functions are accepted too
+    handles = mp.submit_batch(mp.parallel(square), [3])
+    t.assert_equal(handles[0].get(), 9)
+
+    # chunksize groups items: one handle (and thread) per chunk
+    handles = mp.submit_batch(square, list(range(5)), chunksize=2)
+    t.assert_equal(len(handles), 3)
+    t.assert_equal([h.get() for h in handles], [[0, 1], [4, 9], [16]])
+
+
 @runner.test("Parallel - With args and kwargs")
 def test_parallel_args_kwargs(t):
     @mp.parallel
@@ -308,44 +703,17 @@ def test_parallel_args_kwargs(t):
 # =============================================================================
 # TEST 7: Parallel Fast (Crossbeam)
 # =============================================================================
-@runner.test("Parallel Fast - Basic functionality")
-def test_parallel_fast_basic(t):
-    @mp.parallel_fast
-    def compute(x):
-        return x * 3
-
-    handle = compute(7)
-    result = handle.get()
-    t.assert_equal(result, 21)
-
-
 @runner.test("Parallel Fast - Multiple concurrent tasks")
 def test_parallel_fast_concurrent(t):
-    @mp.parallel_fast
-    def task(x):
-        return x**2
-
-    handles = [task(i) for i in range(10)]
+    handles = [fast_square(i) for i in range(10)]
     results = [h.get() for h in handles]
 
-    expected = [i**2 for i in range(10)]
-    t.assert_equal(results, expected)
+    t.assert_equal(results, SQUARES_10)
 
 
 # =============================================================================
 # TEST 8: Parallel Pool (Rayon)
 # =============================================================================
-@runner.test("Parallel Pool - Basic functionality")
-def test_parallel_pool_basic(t):
-    @mp.parallel_pool
-    def compute(x):
-        return x + 10
-
-    handle = compute(5)
-    result = handle.get()
-    t.assert_equal(result, 15)
-
-
 @runner.test("Parallel Pool - Many small tasks")
 def test_parallel_pool_many(t):
     @mp.parallel_pool
@@ -359,27 +727,11 @@ def test_parallel_pool_many(t):
     expected = [i * 2 for i in range(50)]
     t.assert_equal(results, expected)
 
+    # gather() accepts pool handles and collects them in one call
+    t.assert_equal(mp.gather([small_task(i) for i in range(50)]), expected)
 
-# =============================================================================
-# TEST 9: Memoize Fast (DashMap)
-# =============================================================================
-@runner.test("Memoize Fast - Caching works")
-def test_memoize_fast_caching(t):
-    call_count = [0]
-
-    @mp.memoize_fast
-    def expensive(x):
-        call_count[0] += 1
-        return x**3
-
-    result1 = expensive(3)
-    result2 = expensive(3)
-    result3 = expensive(4)
-
-    t.assert_equal(result1, 27)
-    t.assert_equal(result2, 27)
-    t.assert_equal(result3, 64)
-    t.assert_equal(call_count[0], 2)  # Only 2 actual calls
+    # The same decorated function in bulk: one call, chunked across workers
+    t.assert_equal(mp.parallel_map(small_task, list(range(50))), expected)
 
 
 # =============================================================================
@@ -393,8 +745,7 @@ def test_parallel_map_basic(t):
     items = list(range(10))
     results = mp.parallel_map(square, items)
 
-    expected = [i**2 for i in range(10)]
-    t.assert_equal(results, expected)
+    t.assert_equal(results, SQUARES_10)
 
 
 @runner.test("Parallel Map - Large batch")
@@ -407,6 +758,12 @@ def test_parallel_map_large(t):
 
     expected = [i * 2 for i in range(100)]
     t.assert_equal(results, expected)
+    t.assert_equal(mp.parallel_map(double, items, chunksize=25), expected)
+    t.assert_equal(mp.parallel_map(double, items, chunksize=1000), expected)
+
+    dense = mp.parallel_map(double, items, dtype="q")
+    t.assert_equal(dense.typecode, "q")
+    t.assert_equal(dense.tolist(), expected)
 
 
 # =============================================================================
@@ -516,11 +873,11 @@ def test_edge_large_data(t):
 def test_advanced_cancel(t):
     @mp.parallel
     def long_running_task():
-        time.sleep(2)
+        time.sleep(scaled(2))
         return "should not complete"
 
     handle = long_running_task()
-    time.sleep(0.1)
+    time.sleep(scaled(0.1))
     handle.cancel()
 
     t.assert_true(handle.is_cancelled(), "handle.is_cancelled() should be True.")
@@ -533,29 +890,169 @@ def test_advanced_cancel(t):
 def test_advanced_timeout(t):
     @mp.parallel
     def task_that_will_timeout():
-        time.sleep(1)
+        time.sleep(scaled(1))
         return "should have timed out"
 
-    handle = task_that_will_timeout(timeout=0.5)
+    handle = task_that_will_timeout(timeout=scaled(0.5))
     t.assert_raises(Exception, handle.get)
 
 
 @runner.test("Advanced - Task metadata")
 def test_advanced_metadata(t):
-    @mp.parallel
-    def task_with_metadata(x):
-        return x
-
-    handle = task_with_metadata(123)
+    handle = identity(123)
     handle.set_metadata("user_id", "user-abc")
     handle.set_metadata("request_id", "req-123")
+    handle.set_metadata_bulk({"stage": "ingest", "request_id": "req-456"})
     metadata = handle.get_all_metadata()
 
     t.assert_equal(metadata.get("user_id"), "user-abc")
-    t.assert_equal(metadata.get("request_id"), "req-123")
+    t.assert_equal(metadata.get("request_id"), "req-456")
+    t.assert_equal(metadata.get("stage"), "ingest")
+
+
+@runner.test("Advanced - @mp.parallel_with_deps diamond and failures")
+def test_advanced_dependencies(t):
+    @mp.parallel_with_deps
+    def source():
+        time.sleep(scaled(0.05))
+        return 2
+
+    @mp.parallel_with_deps
+    def double(deps):
+        return deps[0] * 2
+
+    @mp.parallel_with_deps
+    def merge(deps):
+        return sum(deps)
+
+    h_source = source()
+    h_left = double(depends_on=[h_source])
+    h_right = double(depends_on=[h_source])
+    t.assert_equal(merge(depends_on=[h_left, h_right]).get(), 8)
+
+    @mp.parallel_with_deps
+    def broken():
+        raise ValueError("boom")
+
+    # A failed parent fails its dependents instead of leaving them waiting
+    t.assert_raises(Exception, double(depends_on=[broken()]).get)
+
+    # Parents must come from @parallel_with_deps
+    t.assert_raises(ValueError, lambda: double(depends_on=[identity(1)]))
+
+
+@runner.test("Advanced - @mp.parallel_with_deps handle arguments")
+def test_advanced_handle_arguments(t):
+    @mp.parallel_with_deps
+    def source(value):
+        time.sleep(scaled(0.05))
+        return value
+
+    @mp.parallel_with_deps
+    def add(a, b=0):
+        return a + b
+
+    # Handles passed as arguments are waited on and replaced by their results
+    h_a = source(2)
+    h_b = source(3)
+    t.assert_equal(add(h_a, b=h_b).get(), 5)
+    t.assert_equal(add(add(h_a, 1), b=10).get(), 13)
+
+    # depends_on still passes its results first
+    @mp.parallel_with_deps
+    def scale(deps, value):
+        return deps[0] * value
+
+    t.assert_equal(scale(h_a, depends_on=[h_b]).get(), 6)
+
+    # A failed argument fails the task
+    @mp.parallel_with_deps
+    def broken():
+        raise ValueError("boom")
+
+    t.assert_raises(Exception, add(broken(), 1).get)
+
+    # As with depends_on, handles must come from @parallel_with_deps
+    t.assert_raises(ValueError, lambda: add(identity(7), 1))
+    t.assert_raises(ValueError, lambda: add(1, b=identity(7)))
 
 
-@runner.test("Advanced - Thread pool configuration")
+@runner.test("Advanced - mp.TaskGraph builds and submits a diamond")
+def test_advanced_task_graph(t):
+    def source(value):
+        return value
+
+    def double(deps):
+        return deps[0] * 2
+
+    def merge(deps):
+        return sum(deps)
+
+    g = mp.TaskGraph()
+    root = g.add(source, 2)
+    left = g.add(double, depends_on=[root])
+    right = g.add(double, depends_on=[root])
+    last = g.add(merge, depends_on=[left, right])
+    t.assert_equal(len(g), 4)
+
+    # Nothing runs before submission
+    t.assert_raises(RuntimeError, lambda: last.get())
+
+    handles = g.submit_all()
+    t.assert_equal(last.get(), 8)
+    t.assert_equal([h.get() for h in handles], [2, 4, 4, 8])
+
+    t.assert_raises(RuntimeError, g.submit_all)
+    t.assert_raises(ValueError, lambda: mp.TaskGraph().add(double, depends_on=[root]))
+
+
+@runner.test("Advanced - mp.compile_dag reusable diamond")
+def test_advanced_compile_dag(t):
+    def source(value):
+        return value
+
+    def double(deps):
+        return deps[0] * 2
+
+    def merge(deps, offset=0):
+        return sum(deps) + offset
+
+    dag = mp.compile_dag({
+        "source": source,
+        "left": (double, ["source"]),
+        "right": (double, ["source"]),
+        "merge": (merge, ["left", "right"]),
+    })
+    t.assert_equal(dag.waves, [["source"], ["left", "right"], ["merge"]])
+
+    # The compiled graph is reused across runs with different inputs
+    t.assert_equal(dag.run({"source": 2})["merge"], 8)
+    t.assert_equal(dag.run({"source": (3,), "merge": (1,)})["merge"], 13)
+
+    t.assert_raises(ValueError, lambda: mp.compile_dag({"a": (identity, ["missing"])}))
+    t.assert_raises(ValueError, lambda: mp.compile_dag({
+        "a": (double, ["b"]),
+        "b": (double, ["a"]),
+    }))
+
+    def broken(deps):
+        raise RuntimeError("boom")
+
+    failing = mp.compile_dag({"source": source, "broken": (broken, ["source"])})
+    t.assert_raises(RuntimeError, lambda: failing.run({"source": 1}))
+
+
+@runner.test("Advanced - mp.configure() sets limits together", serial=True)
+def test_advanced_configure(t):
+    mp.configure(max_concurrent_tasks=10_000, max_memory_percent=100.0)
+    t.assert_equal(identity(1).get(), 1)
+
+    # An invalid value rejects the whole call
+    t.assert_raises(ValueError, lambda: mp.configure(max_concurrent_tasks=1, max_memory_percent=0.0))
+    t.assert_equal([h.get() for h in [identity(i) for i in range(4)]], [0, 1, 2, 3])
+
+
+@runner.test("Advanced - Thread pool configuration", serial=True)
 def test_advanced_threadpool_config(t):
     mp.configure_thread_pool(num_threads=4)
     info = mp.get_thread_pool_info()
@@ -563,14 +1060,14 @@ def test_advanced_threadpool_config(t):
     # Note: num_threads info may vary based on implementation
 
 
-@runner.test("Advanced - @mp.parallel_priority")
+@runner.test("Advanced - @mp.parallel_priority", serial=True)
 def test_advanced_priority(t):
     # Start the priority worker
     mp.start_priority_worker()
 
     @mp.parallel_priority
     def priority_task(value):
-        time.sleep(0.1)
+        time.sleep(scaled(0.1))
         return value
 
     # Submit tasks with different priorities
@@ -593,13 +1090,13 @@ def test_advanced_priority(t):
     mp.stop_priority_worker()
 
 
-@runner.test("Advanced - @profiled and metrics")
+@runner.test("Advanced - @profiled and metrics", serial=True)
 def test_advanced_profiling(t):
     mp.reset_metrics()
 
     @mp.profiled
     def profiled_func(n):
-        time.sleep(0.05)
+        time.sleep(scaled(0.05))
         return n * 2
 
     for i in range(3):
@@ -614,23 +1111,27 @@ def test_advanced_profiling(t):
 
 
 # This test is last as it can interfere with other tests
-@runner.test("Advanced - Graceful shutdown")
+@runner.test("Advanced - Graceful shutdown", serial=True)
 def test_advanced_shutdown(t):
     # Reset shutdown flag for this test
     mp.reset_shutdown()
 
     @mp.parallel
     def task_for_shutdown():
-        time.sleep(1)
+        time.sleep(scaled(1))
         return "done"
 
     handles = [task_for_shutdown() for _ in range(3)]
-    time.sleep(0.1)
-    shutdown_success = mp.shutdown(timeout_secs=0.5, cancel_pending=True)
+    time.sleep(scaled(0.1))
+    shutdown_success = mp.shutdown(timeout_secs=scaled(0.5), cancel_pending=True)
 
     # Shutdown with 0.5s timeout should timeout (tasks need 1s)
     t.assert_equal(shutdown_success, False)
 
+    # The running tasks still finish; wait_idle() blocks until they do
+    t.assert_equal(mp.wait_idle(timeout=5.0), True)
+    t.assert_equal(mp.get_active_task_count(), 0)
+
     # Reset shutdown flag after test
     mp.reset_shutdown()
 
@@ -639,5 +1140,5 @@ def test_advanced_shutdown(t):
 # Run all tests
 # =============================================================================
 if __name__ == "__main__":
-    success = runner.run()
+    success = runner.run(parallel="--serial" not in sys.argv)
     sys.exit(0 if success else 1)
@@ -29,7 +29,6 @@ handle = task_with_completion(5)
 handle.on_complete(lambda result: complete_results.append(f"Completed with: {result}"))
 
 result = handle.get()
-time.sleep(0.1)  # Give callback time to execute
 
 print(f"Result: {result}")
 print(f"Callback received: {complete_results}")
@@ -60,7 +59,6 @@ try:
 except Exception as e:
     print(f"Caught exception: {e}")
 
-time.sleep(0.1)  # Give callback time to execute
 
 print(f"Error callback received: {error_messages}")
 assert len(error_messages) > 0, "Error callback should have been triggered"
@@ -88,7 +86,6 @@ handle = task_with_progress_callback()
 handle.on_progress(lambda p: progress_updates.append(p))
 
 result = handle.get()
-time.sleep(0.2)  # Give callbacks time to execute
 
 print(f"Progress updates received: {progress_updates}")
 print(f"Number of updates: {len(progress_updates)}")
@@ -116,7 +113,6 @@ handle.on_progress(lambda p: all_progress.append(p))
 handle.on_complete(lambda r: all_complete.append(r))
 
 result = handle.get()
-time.sleep(0.1)
 
 print(f"Progress: {all_progress}")
 print(f"Completion: {all_complete}")
@@ -133,12 +129,12 @@ print("-" * 70)
 @mp.parallel_with_deps
 def first_task():
     time.sleep(0.2)
-    print("  First task executing")
+    mp.log("  First task executing")
     return "Result from first task"
 
 @mp.parallel_with_deps
 def second_task(deps):
-    print(f"  Second task received: {deps}")
+    mp.log(f"  Second task received: {deps}")
     return f"Processed: {deps[0]}"
 
 # Start first task
@@ -166,18 +162,18 @@ print("-" * 70)
 @mp.parallel_with_deps
 def task_a():
     time.sleep(0.1)
-    print("  Task A complete")
+    mp.log("  Task A complete")
     return "A"
 
 @mp.parallel_with_deps
 def task_b():
     time.sleep(0.15)
-    print("  Task B complete")
+    mp.log("  Task B complete")
     return "B"
 
 @mp.parallel_with_deps
 def task_c(deps):
-    print(f"  Task C received dependencies: {deps}")
+    mp.log(f"  Task C received dependencies: {deps}")
     return f"Combined: {deps[0]} + {deps[1]}"
 
 h_a = task_a()
@@ -260,7 +256,6 @@ h_producer.on_complete(lambda r: dep_complete.append(r))
 h_consumer = consumer(depends_on=[h_producer])
 
 result = h_consumer.get()
-time.sleep(0.1)
 
 print(f"Producer progress: {dep_progress}")
 print(f"Producer completion: {dep_complete}")
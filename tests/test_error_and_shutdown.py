@@ -115,11 +115,12 @@ for i in range(5):
 print(f"Active tasks: {mp.get_active_task_count()}")
 
 # Wait for completion
-while not all(h.is_ready() for h in handles):
+all_done = False
+while not all_done:
     active = mp.get_active_task_count()
-    completed = sum(1 for h in handles if h.is_ready())
+    completed = mp.ready_count(handles)
     print(f"  Active: {active}, Completed: {completed}/5", end='\r')
-    time.sleep(0.1)
+    all_done = mp.wait_all(handles, timeout=0.1)
 
 print(f"\n  All tasks completed!")
 print(f"  Active tasks now: {mp.get_active_task_count()}")
@@ -187,8 +188,7 @@ def comprehensive_task(task_num, should_fail=False):
 handles = []
 for i in range(5):
     h = comprehensive_task(i, should_fail=(i == 2))  # Task 2 will fail
-    h.set_metadata("task_num", str(i))
-    h.set_metadata("test_group", "comprehensive")
+    h.set_metadata_bulk({"task_num": str(i), "test_group": "comprehensive"})
     handles.append(h)
 
 print(f"Started {len(handles)} tasks")
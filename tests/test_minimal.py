@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
 """Minimal test for @parallel"""
 
-from makeParallel import parallel
+from makeParallel import parallel, log
 import time
 
 print("Testing minimal parallel decorator...")
 
 @parallel
 def simple_add(a, b):
-    print(f"  In thread: adding {a} + {b}")
+    log(f"  In thread: adding {a} + {b}")
     return a + b
 
 print("1. Calling function...")
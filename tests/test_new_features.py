@@ -190,10 +190,8 @@ for i in range(3):
     print(f"Started task {i}: {h.get_name()}")
 
 # Monitor progress
-while not all(h.is_ready() for h in handles):
-    ready_count = sum(1 for h in handles if h.is_ready())
-    print(f"  Progress: {ready_count}/{len(handles)} tasks completed", end='\r')
-    time.sleep(0.1)
+while not mp.wait_all(handles, timeout=0.1):
+    print(f"  Progress: {mp.ready_count(handles)}/{len(handles)} tasks completed", end='\r')
 
 print(f"\n  All tasks completed!")
 
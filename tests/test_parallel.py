@@ -213,7 +213,7 @@ while True:
         print(f"Got result after {poll_count} polls: {result}")
         break
     print(f"Poll {poll_count}: Not ready yet...")
-    time.sleep(0.15)
+    handle.wait(0.15)  # Returns early if the task finishes
 
 print("\n" + "=" * 70)
 print("All @parallel decorator tests completed successfully!")
@@ -17,7 +17,7 @@ def long_task_with_progress(duration):
         progress = (i + 1) / steps
         # Call report_progress without task_id - should use thread-local storage
         mp.report_progress(progress)
-        print(f"  Progress: {progress * 100:.0f}%")
+        mp.log(f"  Progress: {progress * 100:.0f}%")
     return f"Completed after {duration}s"
 
 
@@ -31,7 +31,7 @@ def task_with_explicit_progress(duration, custom_id):
         progress = (i + 1) / steps
         # Call report_progress with explicit task_id
         mp.report_progress(progress, task_id=custom_id)
-        print(f"  Custom task {custom_id} progress: {progress * 100:.0f}%")
+        mp.log(f"  Custom task {custom_id} progress: {progress * 100:.0f}%")
     return f"Custom task {custom_id} completed"
 
 
@@ -40,7 +40,7 @@ def task_with_explicit_progress(duration, custom_id):
 def task_that_checks_id():
     """A task that retrieves its own task_id."""
     task_id = mp.get_current_task_id()
-    print(f"  My task_id is: {task_id}")
+    mp.log(f"  My task_id is: {task_id}")
 
     # Report progress using the retrieved task_id
     for i in range(3):
@@ -61,10 +61,10 @@ def main():
     handle1 = long_task_with_progress(1.0)
 
     # Monitor progress
-    while not handle1.is_ready():
+    # Wakes on each progress update and returns True once the task finishes
+    while not handle1.wait_state_change(timeout=1.0):
         progress = handle1.get_progress()
         print(f"Main thread sees progress: {progress * 100:.0f}%")
-        time.sleep(0.15)
 
     result1 = handle1.get()
     print(f"Result: {result1}")
@@ -75,8 +75,7 @@ def main():
     print("-" * 60)
     handle2 = task_with_explicit_progress(0.5, "my-custom-task")
 
-    while not handle2.is_ready():
-        time.sleep(0.15)
+    handle2.wait()
 
     result2 = handle2.get()
     print(f"Result: {result2}")
@@ -86,10 +85,10 @@ def main():
     print("-" * 60)
     handle3 = task_that_checks_id()
 
-    while not handle3.is_ready():
+    # Wakes on each progress update and returns True once the task finishes
+    while not handle3.wait_state_change(timeout=1.0):
         progress = handle3.get_progress()
         print(f"Main thread sees progress: {progress * 100:.0f}%")
-        time.sleep(0.15)
 
     result3 = handle3.get()
     print(f"Task reported its ID as: {result3}")
@@ -118,18 +117,16 @@ def main():
 
     handles = [multi_task(i) for i in range(3)]
 
-    # Monitor all tasks
-    all_done = False
-    while not all_done:
-        all_done = True
-        for i, h in enumerate(handles):
-            if not h.is_ready():
-                all_done = False
-                progress = h.get_progress()
+    # Monitor all tasks: one call per wakeup, and it only wakes when a task
+    # reports progress or finishes
+    while True:
+        states = mp.poll_handles(handles, timeout=1.0)
+        if all(ready for ready, _ in states):
+            break
+        for i, (ready, progress) in enumerate(states):
+            if not ready:
                 print(f"  Task {i}: {progress * 100:.0f}%", end="  ")
-        if not all_done:
-            print()
-            time.sleep(0.15)
+        print()
 
     results = [h.get() for h in handles]
     print(f"\nAll results: {results}")
@@ -12,26 +12,26 @@ print("Testing callbacks...")
 print("\n[TEST 1] on_complete")
 complete_results = []
 
-@mp.parallel
+# Registered by the decorator, so it is attached before the task starts
+@mp.parallel(on_complete=complete_results.append)
 def task1():
     time.sleep(0.2)
     return "done"
 
 handle = task1()
-handle.on_complete(lambda r: complete_results.append(r))
 result = handle.get()
-time.sleep(0.1)
 
 print(f"Result: {result}")
 print(f"Callback got: {complete_results}")
 assert result == "done"
+assert complete_results == ["done"]
 print("✓ PASSED")
 
 # Test 2: on_progress
 print("\n[TEST 2] on_progress")
 progress_updates = []
 
-@mp.parallel
+@mp.parallel(on_progress=progress_updates.append)
 def task2():
     for i in range(3):
         mp.report_progress((i+1)/3)
@@ -39,9 +39,7 @@ def task2():
     return "finished"
 
 handle = task2()
-handle.on_progress(lambda p: progress_updates.append(p))
 result = handle.get()
-time.sleep(0.1)
 
 print(f"Progress: {progress_updates}")
 print(f"Result: {result}")
@@ -64,7 +62,7 @@ try:
 except:
     pass
 
-time.sleep(0.1)
+# A callback registered after the task failed runs immediately
 print(f"Errors: {errors}")
 assert len(errors) > 0
 print("✓ PASSED")
@@ -13,13 +13,13 @@ print("\n[TEST 1] Basic dependency")
 
 @mp.parallel_with_deps
 def first():
-    print("  Executing first task")
+    mp.log("  Executing first task")
     time.sleep(0.2)
     return "result_from_first"
 
 @mp.parallel_with_deps
 def second(deps):
-    print(f"  Executing second task with deps: {deps}")
+    mp.log(f"  Executing second task with deps: {deps}")
     return f"processed_{deps[0]}"
 
 h1 = first()
@@ -40,17 +40,17 @@ print("\n[TEST 2] Multiple dependencies")
 
 @mp.parallel_with_deps
 def task_a():
-    print("  Task A")
+    mp.log("  Task A")
     return "A"
 
 @mp.parallel_with_deps
 def task_b():
-    print("  Task B")
+    mp.log("  Task B")
     return "B"
 
 @mp.parallel_with_deps
 def task_c(deps):
-    print(f"  Task C got: {deps}")
+    mp.log(f"  Task C got: {deps}")
     return f"{deps[0]}+{deps[1]}"
 
 ha = task_a()
@@ -80,11 +80,14 @@ def step2(deps):
 def step3(deps):
     return deps[0] + 1
 
-h1 = step1()
-h2 = step2(depends_on=[h1])
-h3 = step3(depends_on=[h2])
+# Build the whole chain, then submit it in one call
+g = mp.TaskGraph()
+a = g.add(step1)
+b = g.add(step2, depends_on=[a])
+c = g.add(step3, depends_on=[b])
+g.submit_all()
 
-result = h3.get()
+result = c.get()
 
 print(f"Chain result: {result}")
 assert result == 3
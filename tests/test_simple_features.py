@@ -10,7 +10,7 @@ print("Testing basic features...")
 
 # Test 1: Basic parallel execution
 print("\n1. Testing basic @parallel...")
-@mp.parallel
+@mp.parallel(jit=True)
 def simple_task(x):
     return x * 2
 
@@ -46,7 +46,7 @@ time.sleep(0.2)  # Wait for callback
 
 # Test 5: gather()
 print("\n5. Testing gather()...")
-@mp.parallel
+@mp.parallel(jit=True)
 def gather_task(x):
     return x ** 2
 